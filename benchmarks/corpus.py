@@ -0,0 +1,99 @@
+"""
+Corpus of canonical machines run by the benchmark suite
+
+Every case builds a fresh machine on a given tape backend through
+the public API, so building is not timed. Cases halting on their
+own are capped by max_steps, so step mode finishes in seconds and
+every run mode of a case makes the same amount of steps.
+"""
+
+from collections import namedtuple
+
+from turingmachine.machine import TuringMachine
+from turingmachine.macro import Macro
+from turingmachine.tape import Tape, RunTape, PagedTape, StreamTape, MmapTape
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+BB5 = '0::0:A:0 A -> 1 B R,1 A -> 1 C L,0 B -> 1 C R,1 B -> 1 B R,0 C -> 1 D R,' \
+      '1 C -> 0 E L,0 D -> 1 A L,1 D -> 1 D L,0 E -> 1 STOP,1 E -> 0 A L'
+BINARY_INCREMENT = '0::_:right:0 right -> 0 right R,1 right -> 1 right R,_ right -> _ inc L,' \
+                   '1 inc -> 0 inc L,0 inc -> 1 back L,_ inc -> 1 back L,' \
+                   '0 back -> 0 back L,1 back -> 1 back L,_ back -> _ right R'
+UNARY_ADDITION = '{}::_:a:1 a -> 1 a R,+ a -> 1 a R,_ a -> _ b L,1 b -> _ STOP'
+
+# amount of cells of inputs of unary addition
+ADDITION_CELLS = 100000
+
+# amount of repeated '1,0,1,1' groups copied and moved by macro programs
+RANGE_GROUPS = 40
+
+# tape backends, fast run modes need an array tape
+TAPES = {
+    'Tape': Tape,
+    'RunTape': RunTape,
+    'PagedTape': PagedTape,
+    'StreamTape': StreamTape,
+    'MmapTape': MmapTape,
+    }
+FAST_TAPES = ('Tape', 'MmapTape')
+
+MODES = ('step', 'compiled', 'python', 'macro')
+
+# block size of macro mode runs
+BLOCK_SIZE = 4
+
+
+class Case(namedtuple('Case', ['name', 'build', 'max_steps'])):
+    """Benchmark case
+
+    Attributes:
+        name: name of the case
+        build: function building the machine from a tape class
+        max_steps: cap of steps of a run, None to run until it halts
+    """
+    __slots__ = ()
+
+
+def from_str(src):
+    def build(tape_cls):
+        return TuringMachine.from_str(src, log_size=0, tape_cls=tape_cls)
+    return build
+
+
+def unary_addition(tape_cls):
+    cells = ','.join(['1'] * ADDITION_CELLS + ['+'] + ['1'] * ADDITION_CELLS)
+    return TuringMachine.from_str(UNARY_ADDITION.format(cells), log_size=0, tape_cls=tape_cls)
+
+
+def range_program(function_name):
+    """Get builder of the program Macro.copy_range or
+    Macro.move_range generates for RANGE_GROUPS groups"""
+    def build(tape_cls):
+        src = 'a' + ',1,0,1,1' * RANGE_GROUPS + ',b,2,3,2,2,c:::q1:'
+        tm = TuringMachine.from_str(src, log_size=0, tape_cls=tape_cls)
+        tmac = Macro(tm)
+        getattr(tmac, function_name)(['1', '0'], 'b', ['2', '3'], 'c', [tm.default], 'R')
+        tmac.stop()
+        return tm
+    return build
+
+
+CASES = [
+    Case('bb4', from_str(BB4), None),
+    Case('bb5', from_str(BB5), 500000),
+    Case('binary_increment', from_str(BINARY_INCREMENT), 500000),
+    Case('unary_addition', unary_addition, None),
+    Case('copy_range', range_program('copy_range'), None),
+    Case('move_range', range_program('move_range'), None),
+    ]
+
+
+def combinations():
+    """Get (case, mode, tape name) of every benchmark, fast modes
+    run only on array tapes"""
+    for case in CASES:
+        for mode in MODES:
+            for tape in TAPES:
+                if mode == 'step' or tape in FAST_TAPES:
+                    yield case, mode, tape
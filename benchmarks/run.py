@@ -0,0 +1,155 @@
+"""
+Benchmark suite of TuringMachine runs
+
+Every case of the corpus(see corpus module) is run in every run mode
+on every tape backend it supports, reporting steps per second, peak
+tape cells and peak RSS. Every benchmark runs in a fresh process, so
+peak RSS is its own. Results could be saved as a JSON baseline and
+compared against one, benchmarks slower than the baseline beyond
+tolerance are reported as regressions and exit with status 1.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --filter bb5 --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks import corpus
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# minimum timed seconds of a benchmark, short cases are repeated
+MIN_SECONDS = 0.5
+
+# allowed slowdown against the baseline
+TOLERANCE = 0.25
+
+
+def peak_rss_kb():
+    """Get peak resident set size of this process in KiB, None if unknown"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def benchmark_name(case, mode, tape):
+    return f'{case.name}/{mode}/{tape}'
+
+
+def measure(case_name, mode, tape, min_seconds=MIN_SECONDS):
+    """Run the case at least once and repeatedly until min_seconds of runs
+    are timed, steps per second of the fastest run are reported as they are
+    the least disturbed by the rest of the system
+    Returns:
+        dict of steps, seconds, steps_per_sec, tape_cells and peak_rss_kb"""
+    case = next(case for case in corpus.CASES if case.name == case_name)
+    kwargs = {'block_size': corpus.BLOCK_SIZE} if mode == 'macro' else {}
+    steps = seconds = tape_cells = best = 0
+    while not seconds or seconds < min_seconds:
+        tm = case.build(corpus.TAPES[tape])
+        start = time.perf_counter()
+        result = tm.run(max_steps=case.max_steps, mode=mode, **kwargs)
+        elapsed = time.perf_counter() - start
+        seconds += elapsed
+        steps += result.steps
+        best = max(best, result.steps / elapsed)
+        tape_cells = max(tape_cells, len(tm.tape))
+        if hasattr(tm.tape, 'close'):
+            tm.tape.close()
+
+    return {
+        'steps': steps,
+        'seconds': seconds,
+        'steps_per_sec': best,
+        'tape_cells': tape_cells,
+        'peak_rss_kb': peak_rss_kb(),
+        }
+
+
+def run_all(pattern='', min_seconds=MIN_SECONDS, file=sys.stdout):
+    """Run benchmarks whose names contain pattern, each in a fresh process
+    Returns:
+        dict of results of every benchmark name"""
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for case, mode, tape in corpus.combinations():
+        name = benchmark_name(case, mode, tape)
+        if pattern not in name:
+            continue
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            results[name] = pool.submit(measure, case.name, mode, tape, min_seconds).result()
+        if file is not None:
+            print(format_row(name, results[name]), file=file, flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Get (name, ratio) of benchmarks, which steps per second
+    dropped below 1 - tolerance of the baseline"""
+    regressions = []
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['steps_per_sec'] / baseline[name]['steps_per_sec']
+            if ratio < 1 - tolerance:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def format_row(name, result, baseline=None):
+    rss = '-' if result['peak_rss_kb'] is None else result['peak_rss_kb']
+    row = '{:<36} {:>14,.0f} {:>12} {:>10}'.format(name, result['steps_per_sec'], result['tape_cells'], rss)
+    if baseline is not None and name in baseline:
+        row += ' {:>7.2f}x'.format(result['steps_per_sec'] / baseline[name]['steps_per_sec'])
+    return row
+
+
+def format_table(results, baseline=None):
+    """Get report of results as a text table, with speed relative
+    to the baseline if it is given"""
+    header = '{:<36} {:>14} {:>12} {:>10}'.format('benchmark', 'steps/sec', 'tape cells', 'rss KiB')
+    if baseline is not None:
+        header += ' {:>8}'.format('baseline')
+    return '\n'.join([header] + [format_row(name, result, baseline) for name, result in results.items()])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark suite of turing machine runs')
+    parser.add_argument('--filter', default='', help='run only benchmarks whose names contain it')
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS, help='minimum timed seconds of a benchmark')
+    parser.add_argument('--save', help='save results as a JSON baseline')
+    parser.add_argument('--compare', help='compare results against a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results = run_all(args.filter, args.min_seconds, file=None)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print(format_table(results, baseline))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print(f'regression: {name} runs at {ratio:.2f}x of the baseline')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ setup(
     name='turingmachine',
     version='0.1',
     packages=find_packages(),
+    extras_require={'numpy': ['numpy']},
     url='https://github.com/B1Z0N/turingmachine',
     license='MIT',
     author='b1zon',
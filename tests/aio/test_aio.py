@@ -0,0 +1,138 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from turingmachine.machine import TuringMachine, TuringMachineError, RuleNotFoundError, RunResult, RunStatus
+from turingmachine.blocks import MacroRunResult
+from turingmachine.tape import StreamTape
+from turingmachine import aio
+
+INCREMENT = '1,1,1,1,1,1,1,1:::right:1 right -> 1 right R,B right -> x back L,' \
+            '1 back -> 0 back L,B back -> 1 STOP'
+# counts forever, so it is stopped only by budgets and cancellation
+COUNTER = '0::_:right:0 right -> 0 right R,1 right -> 1 right R,_ right -> _ inc L,' \
+          '1 inc -> 0 inc L,0 inc -> 1 back L,_ inc -> 1 back L,' \
+          '0 back -> 0 back L,1 back -> 1 back L,_ back -> _ right R'
+
+
+def configuration(tm):
+    return list(tm.tape), tm.index, tm.condition, tm.steps, tm.stopped
+
+
+class TestAio:
+    def test_run(self):
+        expected = TuringMachine.from_str(INCREMENT)
+        expected_result = expected.run()
+        for mode, executor in (('step', None), ('compiled', None), ('python', ThreadPoolExecutor(1))):
+            tm = TuringMachine.from_str(INCREMENT)
+            progress = []
+            result = asyncio.run(tm.run_async(
+                slice_steps=5, mode=mode, executor=executor,
+                progress=lambda tm, steps: progress.append(steps)
+                ))
+            assert result == expected_result
+            assert progress == [5, 10, 15, 18]
+            assert configuration(tm) == configuration(expected)
+            assert list(tm._log) == list(expected._log)
+
+    def test_budgets(self):
+        tm = TuringMachine.from_str(COUNTER, log_size=0)
+        assert asyncio.run(tm.run_async(slice_steps=7, max_steps=100)) == RunResult(RunStatus.max_steps, 100)
+        assert tm.steps == 100
+        result = asyncio.run(tm.run_async(slice_steps=1000, max_seconds=0.05, mode='compiled'))
+        assert result.status is RunStatus.max_seconds and tm.steps == 100 + result.steps
+
+        tm = TuringMachine.from_str(COUNTER, log_size=0)
+        result = asyncio.run(tm.run_async(slice_steps=1000, max_tape_cells=20, mode='compiled'))
+        assert result.status is RunStatus.max_tape_cells
+
+    def test_macro(self):
+        tm = TuringMachine.from_str(INCREMENT, log_size=0)
+        result = asyncio.run(tm.run_async(slice_steps=6, mode='macro', block_size=2))
+        assert isinstance(result, MacroRunResult) and result.halted and result.steps == 18
+
+    def test_interleave(self):
+        """Machines running in one loop take turns between slices"""
+        order = []
+
+        async def main():
+            machines = [TuringMachine.from_str(COUNTER, log_size=0) for _ in range(2)]
+            return await asyncio.gather(*(
+                tm.run_async(slice_steps=10, max_steps=30, progress=lambda tm, steps, i=i: order.append(i))
+                for i, tm in enumerate(machines)
+                ))
+
+        assert asyncio.run(main()) == [RunResult(RunStatus.max_steps, 30)] * 2
+        assert order == [0, 1, 0, 1, 0, 1]
+
+    def test_cancel(self):
+        for executor in (None, ThreadPoolExecutor(1), ProcessPoolExecutor(1)):
+            tm = TuringMachine.from_str(COUNTER, log_size=0)
+
+            async def main():
+                task = asyncio.ensure_future(tm.run_async(slice_steps=1000, executor=executor, mode='compiled'))
+                while tm.steps < 3000:
+                    await asyncio.sleep(0.001)
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                else:
+                    raise AssertionError('run is not cancelled')
+
+            asyncio.run(main())
+            assert tm.steps % 1000 == 0 and not tm.stopped
+            expected = TuringMachine.from_str(COUNTER, log_size=0)
+            expected.run(max_steps=tm.steps)
+            assert configuration(tm) == configuration(expected)
+            if executor is not None:
+                executor.shutdown()
+
+    def test_process(self):
+        expected = TuringMachine.from_str(INCREMENT)
+        expected_result = expected.run()
+        tm = TuringMachine.from_str(INCREMENT)
+        events = []
+        tm.subscribe('condition', lambda tm, event: events.append(event), 'back')
+        tm.subscribe('steps', lambda tm, event: events.append(event), 4)
+        tm.subscribe('halt', lambda tm, event: events.append(event))
+        with ProcessPoolExecutor(1) as executor:
+            result = asyncio.run(tm.run_async(slice_steps=10, executor=executor, mode='compiled'))
+        assert result == expected_result
+        assert configuration(tm) == configuration(expected)
+        assert 'x' in tm.tape.symbols
+        assert list(tm._log) == list(expected._log)
+        assert [(event.name, event.steps) for event in events] == [
+            ('steps', 4), ('steps', 8), ('condition', 9), ('steps', 12), ('steps', 16), ('halt', 18)
+            ]
+
+    def test_process_missing(self):
+        tm = TuringMachine.from_str('1,1:::a:1 a -> 1 a R')
+        missing = []
+        tm.subscribe('missing', lambda tm, event: missing.append(event.rule))
+        with ProcessPoolExecutor(1) as executor:
+            try:
+                asyncio.run(tm.run_async(executor=executor))
+            except RuleNotFoundError:
+                pass
+            else:
+                raise AssertionError('missing rule is not raised')
+        assert tm.steps == 2 and missing == [('', 'a')]
+
+        tm = TuringMachine(iter('11'), 'a', tape_cls=StreamTape)
+        with ProcessPoolExecutor(1) as executor:
+            try:
+                asyncio.run(aio.run_async(tm, executor=executor))
+            except TuringMachineError as error:
+                assert 'StreamTape' in str(error)
+            else:
+                raise AssertionError('StreamTape machine is sent to a process')
+
+    def test_slice_steps(self):
+        tm = TuringMachine.from_str(INCREMENT)
+        try:
+            asyncio.run(tm.run_async(slice_steps=0))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('slice_steps 0 is accepted')
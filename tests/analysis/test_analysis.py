@@ -0,0 +1,79 @@
+import random
+
+from turingmachine.machine import TuringMachine, TuringMachineError, RuleNotFoundError
+from turingmachine.nondeterministic import NondeterministicTuringMachine
+from turingmachine.tape import StreamTape
+from turingmachine import analysis
+
+
+def random_machine(rng, conditions, symbols):
+    tm = TuringMachine([rng.choice(symbols) for _ in range(6)], 'c0')
+    for cond in range(conditions):
+        for val in symbols + ['']:
+            if rng.random() < 0.7:
+                move = rng.choice('RRLLS') if rng.random() < 0.9 else 'STOP'
+                tm.set_rule(val, f'c{cond}', rng.choice(symbols), f'c{rng.randrange(conditions)}', move)
+    return tm
+
+
+class TestAnalysis:
+    def test_stay(self):
+        """Conditions entered by staying see only the written symbol"""
+        tm = TuringMachine.from_str('1,0:::a:1 a -> 2 b S,2 b -> 2 c R,0 c -> 0 STOP,1 c -> 1 a R,3 d -> 3 a R')
+        result = tm.analyze()
+        assert result.conditions == ['a', 'b', 'c']
+        assert result.sees['b'] == {'2'}
+        assert result.missing == [('', 'a'), ('0', 'a'), ('2', 'a'), ('', 'c'), ('2', 'c')]
+        assert result.halting == ['c']
+        assert result.unused == [('3', 'd')]
+        assert result.writes == {'a': {'2'}, 'b': {'2'}, 'c': {'0', '1'}}
+        assert result.graph == {'a': ['b'], 'b': ['c'], 'c': ['a']}
+        assert result.components == [['a', 'b', 'c']]
+
+    def test_components(self):
+        tm = TuringMachine.from_str(
+            '1:::a:1 a -> 1 b R,B a -> 1 c R,1 b -> 1 a L,B b -> 1 d R,'
+            'B c -> 1 d R,1 c -> 1 c R,B d -> 1 e R,1 d -> 1 d R,B e -> 1 STOP,1 e -> 1 d L'
+            )
+        result = tm.analyze(symbols=['1'])
+        assert result.components == [['a', 'b'], ['c'], ['d', 'e']]
+        assert result.missing == []
+        assert tm.run().halted
+
+    def test_symbols(self):
+        tm = TuringMachine.from_str('1:::a:1 a -> 1 a R,B a -> 1 STOP')
+        assert tm.analyze().missing == []
+        assert tm.analyze(symbols=['1', 'x']).missing == [('x', 'a')]
+
+        tm = TuringMachine(iter(['1', 'x']), 'a', tape_cls=StreamTape)
+        tm.rule_str('1 a -> 1 a R,B a -> 1 STOP,x b -> 1 a R')
+        assert tm.analyze().missing == [('x', 'a')]
+
+    def test_random(self):
+        """Every rule a run reaches is found and every missing rule it hits is reported"""
+        rng = random.Random(5)
+        for _ in range(300):
+            tm = random_machine(rng, rng.randrange(1, 8), ['0', '1', '2'][:rng.randrange(1, 4)])
+            result = tm.analyze()
+            try:
+                tm.run(max_steps=300)
+            except RuleNotFoundError:
+                assert (tm.current, tm.condition) in result.missing
+            for rule_id in tm._log:
+                val, cond = tm._rule_keys[rule_id]
+                assert val in result.sees[cond]
+                assert (val, cond) not in result.unused
+
+    def test_nondeterministic(self):
+        tm = NondeterministicTuringMachine.from_str('1:::a:1 a -> 1 a R,1 a -> 0 a R')
+        try:
+            tm.analyze()
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError('nondeterministic machine is analyzed')
+
+    def test_report(self):
+        tm = TuringMachine.from_str('1:::a:1 a -> 1 b R,B b -> 1 STOP,1 b -> 1 STOP')
+        assert tm.analyze().report() == 'conditions: 2, rules: 3 of 3, halting: b\ncomponents:\na\nb'
+        assert analysis.analyze(tm).components == [['a'], ['b']]
@@ -0,0 +1,49 @@
+import itertools
+
+from turingmachine.machine import TuringMachine, TuringMachineError, RunStatus
+from turingmachine.tape import RunTape
+from turingmachine.batch import run_many
+
+INCREMENT = ':3::q1:1 q1 -> 0 q1 L,0 q1 -> 1 q2 S,B q1 -> 1 q2 S,0 q2 -> 0 STOP,1 q2 -> 1 STOP'
+
+
+def inputs(amount):
+    return (format(i, 'b').zfill(4) for i in range(amount))
+
+
+class TestRunMany:
+    def test_same_as_run(self):
+        tm = TuringMachine.from_str(INCREMENT)
+        results = sorted(run_many(tm, inputs(100), workers=2, chunksize=7))
+        assert [result.id for result in results] == list(range(100))
+        for result, vals in zip(results, inputs(100)):
+            single = TuringMachine.from_str(','.join(vals) + INCREMENT)
+            assert single.run() == (result.status, result.steps)
+            assert result.tape == list(single.tape) and result.halted
+
+    def test_in_process(self):
+        tm = TuringMachine.from_str(INCREMENT)
+        results = list(run_many(tm, inputs(20), workers=0, chunksize=3))
+        assert results == sorted(run_many(tm, inputs(20), workers=1))
+
+    def test_budget(self):
+        tm = TuringMachine.from_str(':::q1:1 q1 -> 1 q1 R,B q1 -> 1 q1 R', tape_cls=RunTape)
+        results = list(run_many(tm, ['1', '', '2'], workers=0, max_steps=10, mode='step'))
+        assert [result.status for result in results] == [RunStatus.max_steps, RunStatus.max_steps, None]
+        assert results[0].tape == ['1'] * 10 + [''] and results[2].steps == 0
+
+    def test_lazy(self):
+        tm = TuringMachine.from_str(INCREMENT)
+        results = run_many(tm, inputs(10 ** 9), workers=2, chunksize=10)
+        assert len(list(itertools.islice(results, 50))) == 50
+        results.close()
+
+    def test_custom_move(self):
+        tm = TuringMachine.from_str(INCREMENT)
+        tm._rules[('0', 'q2')] = ('0', 'q2', print)
+        try:
+            next(run_many(tm, ['1'], workers=0))
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
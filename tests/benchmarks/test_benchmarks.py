@@ -0,0 +1,33 @@
+from benchmarks import corpus
+from benchmarks.run import measure, compare, format_table
+
+
+class TestBenchmarks:
+    def test_corpus(self):
+        names = [case.name for case in corpus.CASES]
+        assert len(set(names)) == len(names)
+        combinations = list(corpus.combinations())
+        assert {mode for _, mode, _ in combinations} == set(corpus.MODES)
+        assert {tape for _, _, tape in combinations} == set(corpus.TAPES)
+        for case in corpus.CASES:
+            tm = case.build(corpus.TAPES['Tape'])
+            result = tm.run(max_steps=case.max_steps, mode='compiled')
+            assert result.steps > 0
+            assert result.halted == (case.max_steps is None)
+
+    def test_measure(self):
+        for mode in ('step', 'macro'):
+            result = measure('bb4', mode, 'RunTape' if mode == 'step' else 'MmapTape', min_seconds=0)
+            assert result['steps'] == 107 and result['tape_cells'] == 14
+            assert result['steps_per_sec'] > 0
+
+    def test_compare(self):
+        baseline = {'a': {'steps_per_sec': 100.0}, 'b': {'steps_per_sec': 100.0}}
+        results = {
+            'a': {'steps_per_sec': 80.0, 'tape_cells': 1, 'peak_rss_kb': None},
+            'b': {'steps_per_sec': 50.0, 'tape_cells': 1, 'peak_rss_kb': 10},
+            'c': {'steps_per_sec': 1.0, 'tape_cells': 1, 'peak_rss_kb': 10},
+            }
+        assert compare(results, baseline, tolerance=0.25) == [('b', 0.5)]
+        table = format_table(results, baseline).splitlines()
+        assert table[0].split()[-1] == 'baseline' and table[2].endswith('0.50x')
@@ -0,0 +1,130 @@
+import copy
+
+from turingmachine.machine import TuringMachine, RuleNotFoundError, RunStatus
+from turingmachine.blocks import BlockMachine, InfiniteLoopError
+
+BB3 = '0::0:a:0 a -> 1 b R,1 a -> 1 STOP,0 b -> 0 c R,1 b -> 1 b R,0 c -> 1 c L,1 c -> 1 a L'
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+BB5 = '0::0:A:0 A -> 1 B R,1 A -> 1 C L,0 B -> 1 C R,1 B -> 1 B R,0 C -> 1 D R,' \
+      '1 C -> 0 E L,0 D -> 1 A L,1 D -> 1 D L,0 E -> 1 H R,1 E -> 0 A L,0 H -> 0 STOP'
+
+
+def state(tm):
+    return (
+        tm.index, tm.condition, tm.steps, tm.stopped,
+        tm.tape._start - tm.tape._zero, list(tm.tape)
+        )
+
+
+def run_both(src, block_size, **kwargs):
+    tm1 = TuringMachine.from_str(src, log_size=0)
+    tm2 = copy.deepcopy(tm1)
+    result1 = tm1.run(mode='compiled', **kwargs)
+    result2 = tm2.run(mode='macro', block_size=block_size, **kwargs)
+    assert result1.status == result2.status and result1.steps == result2.steps
+    assert state(tm1) == state(tm2)
+    return result2
+
+
+class TestBlockMachine:
+    def test_busy_beavers(self):
+        for block_size in (1, 2, 3, 5):
+            assert run_both(BB3, block_size).steps == 14
+            assert run_both(BB4, block_size).steps == 107
+
+    def test_macro_steps(self):
+        result = run_both(BB4, 3)
+        assert result.macro_steps < result.steps
+
+    def test_max_steps(self):
+        for block_size in (2, 3, 4):
+            for max_steps in (0, 1, 7, 50, 106):
+                run_both(BB4, block_size, max_steps=max_steps)
+
+    def test_blank_sweep(self):
+        result = run_both('0::0:a:0 a -> 1 a R', 4, max_steps=100000)
+        assert result.status == RunStatus.max_steps
+        assert result.macro_steps < 1000
+
+    def test_bb5(self):
+        tm = TuringMachine.from_str(BB5, log_size=0)
+        result = tm.run(mode='macro', block_size=3)
+        assert result.halted and result.steps == 47176871
+        assert list(tm.tape).count('1') == 4098
+
+    def test_cache(self):
+        tm = TuringMachine.from_str(BB4)
+        machine = BlockMachine(tm, 2)
+        machine.run()
+        assert machine.transitions
+        assert BlockMachine(copy.deepcopy(tm), 2).transitions == machine.transitions
+
+    def test_rule_not_found(self):
+        src = '0,0,0,1::0:a:0 a -> 1 a R'
+        tm1 = TuringMachine.from_str(src, log_size=0)
+        tm2 = copy.deepcopy(tm1)
+        for tm, kwargs in ((tm1, {'mode': 'compiled'}), (tm2, {'mode': 'macro', 'block_size': 2})):
+            try:
+                tm.run(**kwargs)
+            except RuleNotFoundError:
+                pass
+            else:
+                raise AssertionError
+        assert state(tm1) == state(tm2)
+
+    def test_rule_not_found_budget(self):
+        """Budget exhausted right at a missing rule stops the run as in compiled mode"""
+        for src in ('1,2:::a:1 a -> 1 a R', '0,0,0,1::0:a:0 a -> 1 a R'):
+            for block_size in (1, 2, 3):
+                for max_steps in range(5):
+                    results = []
+                    for mode, kwargs in (('compiled', {}), ('macro', {'block_size': block_size})):
+                        tm = TuringMachine.from_str(src, log_size=0)
+                        try:
+                            result = tm.run(max_steps=max_steps, mode=mode, **kwargs)
+                        except RuleNotFoundError:
+                            result = None
+                        results.append((result and (result.status, result.steps), state(tm)))
+                    assert results[0] == results[1]
+
+    def test_infinite_loop(self):
+        tm = TuringMachine.from_str('0,0::0:b:0 b -> 0 c S,0 c -> 0 b S')
+        try:
+            tm.run(mode='macro', block_size=4)
+        except InfiniteLoopError:
+            pass
+        else:
+            raise AssertionError
+        assert list(tm.tape) == ['0', '0']
+        assert tm.steps == 0
+
+    def test_infinite_loop_budget(self):
+        run_both('0,0::0:b:0 b -> 1 b R,1 b -> 1 c S,1 c -> 1 b S', 4, max_steps=1000)
+        tm = TuringMachine.from_str('0,0::0:b:0 b -> 0 c S,0 c -> 0 b S')
+        result = tm.run(mode='macro', block_size=4, max_seconds=0.01)
+        assert result.status == RunStatus.max_seconds and tm.steps == result.steps
+
+    def test_log(self):
+        tm1 = TuringMachine.from_str(BB4)
+        tm2 = copy.deepcopy(tm1)
+        tm1.run(mode='compiled')
+        tm2.run(mode='macro', block_size=3)
+        assert tm1.log == tm2.log
+        tm1 = TuringMachine.from_str('0::0:a:0 a -> 1 a R', log_size=5)
+        tm2 = copy.deepcopy(tm1)
+        tm1.run(mode='compiled', max_steps=10000)
+        tm2.run(mode='macro', block_size=2, max_steps=10000)
+        assert tm1.log == tm2.log and len(tm2._log) == 5
+
+    def test_block_size(self):
+        tm = TuringMachine.from_str(BB3)
+        for kwargs in ({'mode': 'macro'}, {'mode': 'macro', 'block_size': 0},
+                       {'mode': 'compiled', 'block_size': 2}, {'block_size': 1}):
+            try:
+                tm.run(**kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError
+        assert tm.steps == 0
@@ -0,0 +1,100 @@
+import copy
+import os
+import tempfile
+
+from turingmachine.machine import TuringMachine, TuringMachineError
+from turingmachine.tape import RunTape
+from turingmachine.checkpoint import CheckpointError
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+
+
+def state(tm):
+    return tm.index, tm.condition, tm.steps, tm.stopped, tm._center, list(tm.tape), tm.log
+
+
+def checkpoint_path():
+    return os.path.join(tempfile.mkdtemp(), 'tm.ckpt')
+
+
+class TestSnapshot:
+    def test_restore(self):
+        for tape_cls in (None, RunTape):
+            kwargs = {} if tape_cls is None else {'tape_cls': tape_cls}
+            tm = TuringMachine.from_str(BB4, log_size=0, **kwargs)
+            tm.run(max_steps=40)
+            before = state(tm)
+            snapshot = tm.snapshot()
+            tm.run()
+            assert tm.stopped
+            tm.restore(snapshot)
+            assert state(tm) == before
+            tm.run()
+            tm.restore(snapshot)
+            assert state(tm) == before
+
+
+class TestCheckpoint:
+    def test_continue(self):
+        for tape_cls in (None, RunTape):
+            kwargs = {} if tape_cls is None else {'tape_cls': tape_cls}
+            tm1 = TuringMachine.from_str(BB4, log_size=5, **kwargs)
+            tm1.run(max_steps=50)
+            path = checkpoint_path()
+            tm1.save_checkpoint(path)
+            tm2 = TuringMachine.load_checkpoint(path)
+            assert type(tm2.tape) is type(tm1.tape)
+            assert state(tm2)[:-1] == state(tm1)[:-1] and tm2.log == ''
+            assert tm2._log.size == 5 and tm2._rule_keys == tm1._rule_keys
+            tm1.run()
+            tm2.run()
+            assert state(tm2) == state(tm1) and repr(tm2) == repr(tm1)
+
+    def test_large_tape(self):
+        tm = TuringMachine.from_str('0::0:a:0 a -> 1 a L', log_size=0)
+        tm.run(mode='compiled', max_steps=10 ** 6)
+        tm.tape.write(5, 'x')
+        path = checkpoint_path()
+        tm.save_checkpoint(path)
+        assert os.path.getsize(path) < 10 ** 6 + 1000
+        loaded = TuringMachine.load_checkpoint(path)
+        assert loaded.tape == tm.tape and loaded._center == tm._center
+        assert loaded.index == -10 ** 6 and loaded.tape.read(5) == 'x'
+
+    def test_wide_symbols(self):
+        tm = TuringMachine([str(i) for i in range(300)], 'q1', index=5, default='_')
+        tm.set_rule('5', 'q1', 'x', 'q2', 'L')
+        tm.move()
+        path = checkpoint_path()
+        tm.save_checkpoint(path)
+        loaded = TuringMachine.load_checkpoint(path)
+        assert loaded.tape._buf.typecode == 'H'
+        assert state(loaded) == state(copy.deepcopy(tm))[:-1] + ('',)
+        assert loaded.default == '_'
+
+    def test_damaged(self):
+        tm = TuringMachine.from_str(BB4)
+        path = checkpoint_path()
+        tm.save_checkpoint(path)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for damaged in (data[:10], b'XXXX' + data[4:], data[:-3]):
+            with open(path, 'wb') as file:
+                file.write(damaged)
+            try:
+                TuringMachine.load_checkpoint(path)
+            except CheckpointError:
+                pass
+            else:
+                raise AssertionError
+
+    def test_custom_move(self):
+        tm = TuringMachine.from_str(BB4)
+        tm._rules[('0', 'd')] = ('1', 'd', print)
+        try:
+            tm.save_checkpoint(checkpoint_path())
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
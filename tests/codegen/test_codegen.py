@@ -0,0 +1,94 @@
+import copy
+import linecache
+
+from turingmachine.machine import TuringMachine, RuleNotFoundError, TuringMachineError, RunStatus
+from turingmachine.tape import RunTape
+from turingmachine.macro import Macro
+from turingmachine import codegen
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+
+
+def run_both(tm, **kwargs):
+    tm2 = copy.deepcopy(tm)
+    result1 = tm.run(**kwargs)
+    result2 = tm2.run(mode='python', **kwargs)
+    assert result1 == result2
+    assert tm.tape == tm2.tape and tm._center == tm2._center
+    assert tm.index == tm2.index and tm.condition == tm2.condition
+    assert tm.stopped == tm2.stopped and tm.steps == tm2.steps
+    assert tm.log == tm2.log
+    return tm2
+
+
+class TestCompileToPython:
+    def test_same_as_run(self):
+        run_both(TuringMachine.from_str(BB4))
+        run_both(TuringMachine.from_str(
+            '1,0,1,1:3::q1:1 q1 -> 0 q1 L,0 q1 -> 1 q2 S,B q1 -> 1 q2 S,0 q2 -> 0 STOP,1 q2 -> 1 STOP'
+            ))
+        tmac = Macro(TuringMachine.from_str('a' + ',1,0,1,1' * 20 + ',b,2,3,2,2,c:::q1:'))
+        tmac.copy_range(['1', '0'], 'b', ['2', '3'], 'c', [tmac.tm.default], 'R')
+        tmac.stop()
+        run_both(tmac.tm)
+
+    def test_budgets(self):
+        tm = TuringMachine.from_str('1:::q1:1 q1 -> 0 q1 L,B q1 -> x q1 L', log_size=0)
+        tm = run_both(tm, max_steps=10000)
+        assert tm.index == -10000
+        tm = TuringMachine.from_str(BB4, log_size=3)
+        run_both(tm, max_steps=50)
+        result = tm.run(mode='python')
+        assert result == (RunStatus.halted, 57) and tm.steps == 107
+
+    def test_rule_not_found(self):
+        for src in ('0,0,1::0:a:0 a -> 0 a R', '0::0:a:'):
+            tm = TuringMachine.from_str(src)
+            try:
+                tm.run(mode='python')
+            except RuleNotFoundError:
+                pass
+            else:
+                raise AssertionError
+            assert tm.index == src.count(',')
+
+    def test_cache(self):
+        tm1 = TuringMachine.from_str(BB4)
+        tm2 = TuringMachine.from_str(BB4)
+        generated = codegen.compile_to_python(tm1)
+        assert codegen.compile_to_python(tm2) is generated
+        assert codegen.compile_to_python(tm1, logged=True) is not generated
+        assert 'record(' in codegen.compile_to_python(tm1, logged=True).source
+        tm3 = TuringMachine.from_str(BB4.replace('0 c -> 1 STOP', '0 c -> 0 STOP'))
+        assert codegen.compile_to_python(tm3).key != generated.key
+        filename = generated.function.__code__.co_filename
+        assert linecache.getline(filename, 1).startswith('def run(')
+
+    def test_cache_size(self):
+        first = codegen.compile_to_python(TuringMachine.from_str('1:::q0:1 q0 -> 0 STOP'))
+        for i in range(1, codegen.CACHE_SIZE + 10):
+            tm = TuringMachine.from_str(f'1:::q0:1 q0 -> {i} STOP')
+            generated = codegen.compile_to_python(tm)
+            assert codegen.compile_to_python(tm) is generated
+            assert tm._compiled.generated[False, 1] is generated
+        assert len(codegen._cache) == codegen.CACHE_SIZE
+        assert first.key not in codegen._cache
+        assert not linecache.getlines(first.function.__code__.co_filename)
+        tm.run(mode='python')
+        assert tm.tape[0] == str(i)
+
+    def test_symbols(self):
+        tm = TuringMachine(['a\nb', 'c'], 'q\n1')
+        tm.set_rule('a\nb', 'q\n1', '#', 'q\n1', 'R')
+        tm.set_rule('c', 'q\n1', '#', 'q2', 'STOP')
+        run_both(tm)
+
+    def test_tape(self):
+        tm = TuringMachine.from_str(BB4, tape_cls=RunTape)
+        try:
+            tm.run(mode='python')
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
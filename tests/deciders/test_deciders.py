@@ -0,0 +1,55 @@
+from turingmachine.machine import TuringMachine, RunStatus
+from turingmachine.tape import RunTape
+from turingmachine import deciders
+from turingmachine.deciders import Verdict
+
+BB3 = '0::0:a:0 a -> 1 b R,1 a -> 1 STOP,0 b -> 0 c R,1 b -> 1 b R,0 c -> 1 c L,1 c -> 1 a L'
+CYCLER = '0::0:a:0 a -> 1 b R,0 b -> 0 a L,1 a -> 1 b R'
+TRANSLATED = '0::0:a:0 a -> 1 b R,0 b -> 0 c L,1 c -> 1 d R,0 d -> 0 a R'
+BOUNCER = '0::0:a:1 a -> 1 a R,0 a -> 1 b L,1 b -> 1 b L,0 b -> 1 a R'
+
+
+class TestDeciders:
+    def test_cycler(self):
+        decision = deciders.cycler(TuringMachine.from_str(CYCLER))
+        assert decision == (Verdict.non_halting, 'cycler', 3)
+        assert deciders.cycler(TuringMachine.from_str(BOUNCER), 1000).verdict is Verdict.undecided
+
+    def test_translated_cycler(self):
+        tm = TuringMachine.from_str(TRANSLATED)
+        decision = deciders.translated_cycler(tm)
+        assert decision.non_halting and decision.decider == 'translated_cycler'
+        assert not deciders.cycler(tm, 1000).non_halting
+        result = tm.run(mode='compiled', max_steps=decision.steps * 10)
+        assert result.status == RunStatus.max_steps
+
+    def test_bouncer(self):
+        tm = TuringMachine.from_str(BOUNCER)
+        decision = deciders.bouncer(tm)
+        assert decision.non_halting and decision.decider == 'bouncer'
+        assert not deciders.translated_cycler(tm, 1000).non_halting
+        assert deciders.decide(tm) == decision
+        assert tm.steps == 0 and list(tm.tape) == ['0']
+
+    def test_halted(self):
+        assert deciders.decide(TuringMachine.from_str(BB3)) == (Verdict.halted, None, 14)
+        decision = deciders.decide(TuringMachine.from_str('0,0,1::0:a:0 a -> 0 a R'))
+        assert decision == (Verdict.rule_not_found, None, 2)
+        decision = deciders.bouncer(TuringMachine.from_str(BB3))
+        assert decision.verdict is Verdict.undecided
+
+    def test_deciders(self):
+        tm = TuringMachine.from_str(BOUNCER)
+        decision = deciders.decide(tm, max_steps=500, deciders=('cycler', 'translated_cycler'))
+        assert decision == (Verdict.undecided, None, 500)
+        try:
+            deciders.decide(tm, deciders=('kek',))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_run_tape(self):
+        for src in (CYCLER, TRANSLATED, BOUNCER):
+            tm = TuringMachine.from_str(src, tape_cls=RunTape)
+            assert deciders.decide(tm) == deciders.decide(TuringMachine.from_str(src))
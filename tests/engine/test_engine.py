@@ -0,0 +1,161 @@
+import copy
+
+from turingmachine.machine import TuringMachine, RuleNotFoundError, TuringMachineError, RunStatus
+from turingmachine.macro import Macro
+
+
+def run_both(state):
+    tm1 = TuringMachine.from_str(state)
+    tm2 = copy.deepcopy(tm1)
+    tm1.run()
+    tm2.run(mode='compiled')
+    return tm1, tm2
+
+
+def tm_equal(tm1, tm2):
+    assert tm1.tape == tm2.tape
+    assert tm1.index == tm2.index
+    assert tm1._center == tm2._center
+    assert tm1.condition == tm2.condition
+    assert tm1.stopped == tm2.stopped
+    assert tm1.log == tm2.log
+
+
+class TestExecute:
+    def test_forward(self):
+        tm_equal(*run_both('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> B STOP'))
+
+    def test_back(self):
+        tm_equal(*run_both('1,1,1:2::q1:1 q1 -> 0 q1 L,B q1 -> x q2 L,B q2 -> y STOP'))
+
+    def test_both_sides(self):
+        tm_equal(*run_both(
+            'a,b:1::q1:'
+            'b q1 -> b q1 L,a q1 -> a q1 L,B q1 -> x q2 R,'
+            'a q2 -> a q2 R,b q2 -> b q2 R,x q2 -> x q2 R,B q2 -> y q3 S,y q3 -> z STOP'
+            ))
+
+    def test_binary_increment(self):
+        tm1, tm2 = run_both(
+            '1,0,1,1:3::q1:1 q1 -> 0 q1 L,0 q1 -> 1 q2 S,B q1 -> 1 q2 S,0 q2 -> 0 STOP,1 q2 -> 1 STOP'
+            )
+        tm_equal(tm1, tm2)
+        assert list(tm2.tape) == ['1', '1', '0', '0']
+
+    def test_stopped(self):
+        tm = TuringMachine.from_str('1:::q1:1 q1 -> 0 STOP')
+        tm.run(mode='compiled')
+        tm.run(mode='compiled')
+        assert list(tm.tape) == ['0']
+
+    def test_rule_not_found(self):
+        tm1 = TuringMachine.from_str('1,1,2:::q1:1 q1 -> 0 q1 R')
+        tm2 = copy.deepcopy(tm1)
+        for tm, mode in ((tm1, 'step'), (tm2, 'compiled')):
+            try:
+                tm.run(mode=mode)
+            except RuleNotFoundError:
+                pass
+            else:
+                raise AssertionError
+        tm_equal(tm1, tm2)
+
+    def test_recompile(self):
+        tm = TuringMachine.from_str('1,1:::q1:1 q1 -> 0 q1 R')
+        try:
+            tm.run(mode='compiled')
+        except RuleNotFoundError:
+            pass
+        tm.rule_str('B q1 -> 1 STOP')
+        tm.run(mode='compiled')
+        assert list(tm.tape) == ['0', '0', '1']
+
+    def test_custom_move(self):
+        tm = TuringMachine.from_str('1:::q1:')
+        tm._rules[('1', 'q1')] = ('0', 'q1', print)
+        try:
+            tm.run(mode='compiled')
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_wrong_mode(self):
+        tm = TuringMachine.from_str('1:::q1:1 q1 -> 0 STOP')
+        try:
+            tm.run(mode='kek')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_budgets(self):
+        tm1 = TuringMachine.from_str('1:::q1:1 q1 -> 1 q1 R,B q1 -> 1 q1 L')
+        tm2 = copy.deepcopy(tm1)
+        result1 = tm1.run(max_steps=1000)
+        result2 = tm2.run(max_steps=1000, mode='compiled')
+        assert result1 == result2 == (RunStatus.max_steps, 1000)
+        tm_equal(tm1, tm2)
+        assert tm1.steps == tm2.steps == 1000
+
+        result = tm2.run(max_tape_cells=50, mode='compiled')
+        assert result.status == RunStatus.max_tape_cells
+
+
+class TestSweep:
+    def run_both(self, tm, **kwargs):
+        tm2 = copy.deepcopy(tm)
+        result1 = tm.run(**kwargs)
+        result2 = tm2.run(mode='compiled', **kwargs)
+        assert result1 == result2
+        tm_equal(tm, tm2)
+        assert tm.steps == tm2.steps
+        return tm2
+
+    def test_move_by_val(self):
+        tmac = Macro(TuringMachine.from_str('a' + ',1,0' * 100 + ',b:::q1:'))
+        tmac.move_by_val.single_move(['1', '0', 'a'], 'b', 'R')
+        tmac.move_by_val.single_move(['1', '0'], 'a', 'L')
+        tmac.stop()
+        self.run_both(tmac.tm)
+
+    def test_clean_range(self):
+        tmac = Macro(TuringMachine.from_str('1,0,' * 100 + 'b,1:::q1:'))
+        tmac.clean_range.single_move(['1', '0'], 'b', 'R', include_end=True)
+        tmac.stop()
+        tm = self.run_both(tmac.tm)
+        assert list(tm.tape) == [''] * 201 + ['1']
+
+    def test_copy_range(self):
+        tmac = Macro(TuringMachine.from_str('a' + ',1,0,1,1' * 20 + ',b,2,3,2,2,c:::q1:'))
+        tmac.copy_range(['1', '0'], 'b', ['2', '3'], 'c', [tmac.tm.default], 'R')
+        tmac.stop()
+        self.run_both(tmac.tm)
+
+    def test_blank(self):
+        tm = TuringMachine.from_str('1:::q1:1 q1 -> 0 q1 L,B q1 -> x q1 L', log_size=0)
+        tm = self.run_both(tm, max_steps=100000)
+        assert tm.index == -100000 and len(tm.tape) == 100001
+
+    def test_ring_log(self):
+        tm = TuringMachine.from_str('1,1,1,1,1,2:::q1:1 q1 -> 0 q1 R,2 q1 -> 2 STOP', log_size=3)
+        self.run_both(tm)
+
+    def test_wide_tape(self):
+        tm = TuringMachine([str(i) for i in range(300)] + ['1'] * 10, 'q1')
+        tm.rule_str('1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+        tm.index = 300
+        tm = self.run_both(tm)
+        assert not tm._compiled.sweeps
+
+    def test_log_large_rule_ids(self):
+        tm = TuringMachine.from_str('1,1,1,0,0,1,2:::q1:', log_size=None)
+        for i in range(300):
+            tm.set_rule('1', f'x{i}', '1', f'x{i}', 'R')
+        tm.rule_str('1 q1 -> 0 q1 L,0 q1 -> 1 q1 L,B q1 -> 1 back R,1 back -> 1 back R,0 back -> 0 back R,2 back -> 2 STOP')
+        tm.index = 5
+        tm = self.run_both(tm)
+        rules = tm._compiled
+        for cond, shift in (('q1', -1), ('back', 1)):
+            assert rules.sweeps[(rules.condition_codes[cond], shift)][2] is None
+        assert rules.sweeps[(rules.condition_codes['x0'], 1)][2] is not None
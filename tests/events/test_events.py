@@ -0,0 +1,104 @@
+from turingmachine.machine import TuringMachine, RuleNotFoundError
+from turingmachine.events import STEPS, CONDITION, SYMBOL, HALT, MISSING
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+MODES = (('step', {}), ('compiled', {}), ('python', {}))
+
+
+def recorded(src, subscriptions, mode='step', log_size=0, **kwargs):
+    tm = TuringMachine.from_str(src, log_size=log_size)
+    events = []
+    for name, value in subscriptions:
+        tm.subscribe(name, lambda tm, event: events.append(event), value)
+    result = tm.run(mode=mode, **kwargs)
+    return tm, result, events
+
+
+class TestEvents:
+    def test_steps(self):
+        for mode, kwargs in MODES + (('compiled', {'max_seconds': 10}),):
+            tm, result, events = recorded(BB4, [(STEPS, 25)], mode, **kwargs)
+            assert [event.steps for event in events] == [25, 50, 75, 100]
+            assert {event.name for event in events} == {STEPS}
+
+    def test_steps_continued(self):
+        tm = TuringMachine.from_str(BB4)
+        steps = []
+        tm.subscribe(STEPS, lambda tm, event: steps.append(tm.steps), 10)
+        tm.run(max_steps=15)
+        tm.run(max_steps=3)
+        tm.run(mode='compiled', max_steps=12)
+        assert steps == [10, 20, 30]
+
+    def test_macro_steps(self):
+        tm, result, events = recorded(BB4, [(STEPS, 25), (HALT, None)], 'macro', block_size=2)
+        assert [event.name for event in events] == [STEPS, HALT]
+        assert events[0].steps == events[1].steps == 107
+
+    def test_rule_events(self):
+        subscriptions = [(CONDITION, 'c'), (SYMBOL, '0')]
+        tm, _, expected = recorded(BB4, subscriptions)
+        assert expected and all(event.steps <= 107 for event in expected)
+        for event in expected:
+            val, cond, next_val, next_cond = event.rule
+            if event.name == CONDITION:
+                assert next_cond == 'c' != cond
+            else:
+                assert next_val == '0'
+        for mode, kwargs in MODES[1:] + (('macro', {'block_size': 3}),):
+            assert recorded(BB4, subscriptions, mode, **kwargs)[2] == expected
+
+    def test_log_kept(self):
+        tm, _, events = recorded(BB4, [(CONDITION, 'd')], 'compiled', log_size=2)
+        assert events and tm.log == '1 b -> 0 c L\n0 c -> 1 c STOP\n'
+
+    def test_halt(self):
+        tm, result, events = recorded(BB4, [(HALT, None)], max_steps=100)
+        assert not result.halted and events == []
+        tm.run()
+        tm.run()
+        assert tm.stopped and len(tm._events.subscriptions) == 1
+
+    def test_missing(self):
+        tm = TuringMachine.from_str('1,1::0:a:1 a -> 0 a R')
+        events = []
+        tm.subscribe(MISSING, lambda tm, event: events.append(event))
+        try:
+            tm.run(mode='compiled')
+        except RuleNotFoundError:
+            pass
+        else:
+            raise AssertionError
+        assert len(events) == 1 and events[0].rule == ('0', 'a') and events[0].steps == 2
+
+    def test_unsubscribe(self):
+        tm = TuringMachine.from_str(BB4)
+        log = tm._log
+        events = []
+        subscription = tm.subscribe(SYMBOL, lambda tm, event: events.append(event), '1')
+        assert tm._log is not log
+        tm.run(max_steps=5)
+        tm.unsubscribe(subscription)
+        assert tm._log is log and tm._events is None
+        tm.run()
+        assert len(events) == 5 and len(tm.log.splitlines()) == 107
+
+    def test_fork(self):
+        tm = TuringMachine.from_str(BB4)
+        events = []
+        tm.subscribe(SYMBOL, lambda tm, event: events.append(event), '1')
+        child = tm.fork()
+        child.run()
+        assert events == [] and child._events is None
+
+    def test_wrong(self):
+        tm = TuringMachine.from_str(BB4)
+        for name, value in (('step', 1), (STEPS, 0), (STEPS, None), (CONDITION, None), (HALT, 'a')):
+            try:
+                tm.subscribe(name, print, value)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError
+        assert tm._events.subscriptions == []
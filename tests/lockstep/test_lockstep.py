@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from turingmachine.machine import TuringMachine
+from turingmachine.batch import run_many
+
+numpy = pytest.importorskip('numpy')
+
+from turingmachine.lockstep import Lockstep, run_lockstep, HALTED, MISSING  # noqa: E402
+
+INCREMENT = ':3::q1:1 q1 -> 0 q1 L,0 q1 -> 1 q2 S,B q1 -> 1 q2 S,0 q2 -> 0 STOP,1 q2 -> 1 STOP'
+# accepts words of the form a^n b^n by writing y, rejects them by writing n
+ANBN = ':::q0:a q0 -> x q1 R,B q0 -> y STOP,b q0 -> n STOP,x q0 -> n STOP,' \
+       'a q1 -> a q1 R,x q1 -> x q1 R,b q1 -> x q2 L,B q1 -> n STOP,' \
+       'a q2 -> a q2 L,x q2 -> x q2 L,B q2 -> B q3 R,' \
+       'x q3 -> x q3 R,a q3 -> x q1 R,b q3 -> n STOP,B q3 -> y STOP'
+
+
+def words(amount):
+    random.seed(0)
+    return [''.join(random.choice('ab') for _ in range(random.randint(0, 8))) for _ in range(amount)]
+
+
+class TestLockstep:
+    def test_same_as_run(self):
+        for src, inputs in ((INCREMENT, [format(i, 'b') for i in range(64)]), (ANBN, words(200))):
+            tm = TuringMachine.from_str(src)
+            assert run_lockstep(tm, inputs) == list(run_many(tm, inputs, workers=0))
+
+    def test_grow(self):
+        tm = TuringMachine.from_str('::0:a:0 a -> 1 b L,0 b -> 1 c R,1 c -> 1 c R,0 c -> 1 STOP')
+        inputs = ['0' * n for n in range(10)]
+        assert run_lockstep(tm, inputs) == list(run_many(tm, inputs, workers=0))
+
+    def test_grow_both_ends(self):
+        """Heads of some tapes leave the left end and heads of others the right end in the same step"""
+        tm = TuringMachine.from_str(':::a:1 a -> 1 l L,B l -> 1 l L,2 a -> 2 r R,B r -> 2 r R')
+        for inputs in (['1', '2'], ['2', '1', '21', '12']):
+            for max_steps in (1, 2, 5, 40):
+                assert run_lockstep(tm, inputs, max_steps=max_steps) == \
+                    list(run_many(tm, inputs, workers=0, max_steps=max_steps))
+
+    def test_max_steps(self):
+        tm = TuringMachine.from_str(ANBN)
+        inputs = words(50)
+        lockstep = Lockstep(tm, inputs)
+        assert lockstep.run(5) == 5
+        lockstep.run()
+        assert list(lockstep.results()) == list(run_many(tm, inputs, workers=0))
+        assert run_lockstep(tm, inputs, max_steps=3) == list(run_many(tm, inputs, workers=0, max_steps=3))
+
+    def test_status(self):
+        tm = TuringMachine.from_str(':::q1:1 q1 -> 1 q1 R,B q1 -> B STOP')
+        lockstep = Lockstep(tm, ['11', '121'])
+        lockstep.run()
+        assert lockstep.status.tolist() == [HALTED, MISSING]
+        assert lockstep.index(0) == 2 and lockstep.index(1) == 1
+        assert lockstep.condition(1) == 'q1'
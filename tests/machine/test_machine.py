@@ -1,6 +1,7 @@
 import copy
 
-from turingmachine.machine import TuringMachine, RuleNotFoundError, TuringMachineStop
+from turingmachine.machine import TuringMachine, RuleNotFoundError, TuringMachineStop, RunStatus
+from turingmachine.tape import RunTape, PagedTape
 
 
 class TestTuringMachine:
@@ -121,3 +122,120 @@ class TestTuringMachine:
         s5 = str(self.tm5)
         print(s1, s2, s3, s4)
         assert s1 == s2 == s3 == s4 == s5
+
+
+class TestRunBudgets:
+    loop = '1:::q1:1 q1 -> 1 q1 R,B q1 -> 1 q1 R'
+
+    def test_halted(self):
+        tm = TuringMachine.from_str('1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+        result = tm.run()
+        assert result.halted and result.status == RunStatus.halted
+        assert result.steps == tm.steps == 3
+
+    def test_max_steps(self):
+        tm = TuringMachine.from_str(self.loop)
+        result = tm.run(max_steps=10)
+        assert result == (RunStatus.max_steps, 10)
+        assert tm.steps == 10 and tm.index == 10
+        result = tm.run(max_steps=5)
+        assert result.steps == 5 and tm.steps == 15
+
+    def test_max_tape_cells(self):
+        tm = TuringMachine.from_str(self.loop)
+        result = tm.run(max_tape_cells=100)
+        assert result.status == RunStatus.max_tape_cells
+        assert len(tm.tape) > 100
+        assert result.steps <= 100 + TuringMachine.CHECK_EVERY
+
+    def test_max_seconds(self):
+        tm = TuringMachine.from_str(self.loop)
+        result = tm.run(max_seconds=0.05)
+        assert result.status == RunStatus.max_seconds
+        assert not tm.stopped
+
+
+class TestExecutionLog:
+    state = '1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP'
+
+    def test_render(self):
+        tm = TuringMachine.from_str(self.state)
+        tm.run()
+        assert tm.log == '1 q1 -> 0 q1 R\n' * 3 + ' q1 -> 1 q1 STOP\n'
+        assert list(tm._log) == [0, 0, 0, 1]
+
+    def test_ring_buffer(self):
+        tm = TuringMachine.from_str(self.state, log_size=2)
+        tm.run()
+        assert tm.log == '1 q1 -> 0 q1 R\n q1 -> 1 q1 STOP\n'
+
+    def test_disabled(self):
+        tm = TuringMachine.from_str(self.state, log_size=0)
+        tm.run()
+        assert tm.log == '' and len(tm._log) == 0
+        assert tm.stopped
+
+    def test_clear(self):
+        tm = TuringMachine.from_str(self.state)
+        tm.move()
+        tm.log = ''
+        tm.move()
+        assert tm.log == '1 q1 -> 0 q1 R\n'
+
+    def test_log_func(self):
+        tm = TuringMachine.from_str(self.state, log_func=lambda *args: args[0])
+        tm.run()
+        assert tm.log == '1\n1\n1\n\n'
+
+
+class TestFork:
+    bb3 = '0::0:a:0 a -> 1 b R,1 a -> 1 STOP,0 b -> 0 c R,1 b -> 1 b R,0 c -> 1 c L,1 c -> 1 a L'
+
+    def test_fork(self):
+        for tape_cls in (PagedTape, RunTape, None):
+            kwargs = {} if tape_cls is None else {'tape_cls': tape_cls}
+            tm = TuringMachine.from_str(self.bb3, **kwargs)
+            tm.run(max_steps=5)
+            tape, log = list(tm.tape), tm.log
+            child = tm.fork()
+            assert child.steps == 5 and child.log == '' and list(child.tape) == tape
+            child[child.index] = '1'
+            child.run()
+            assert list(tm.tape) == tape and tm.log == log and tm.steps == 5
+            assert not tm.stopped and child.stopped
+            tm.run()
+            assert repr(tm) != repr(child)
+            assert child.log.endswith('1 a -> 1 a STOP\n')
+
+    def test_rules(self):
+        tm = TuringMachine.from_str(self.bb3, tape_cls=PagedTape)
+        child = tm.fork()
+        assert child._rules is tm._rules and child._rule_keys is tm._rule_keys
+        assert child._moves['R'].__self__ is child
+        child.rule_str('0 d -> 1 d L')
+        assert ('0', 'd') not in tm._rules and len(tm._rule_keys) == 6
+        assert child.rule_table() == tm.rule_table() + [('0', 'd', '1', 'd', 'L')]
+        child.move()
+        assert child.log == '0 a -> 1 b R\n' and tm.log == '' and tm.steps == 0
+
+    def test_rules_parent(self):
+        """Rules added to the parent after forking are not seen by children"""
+        tm = TuringMachine.from_str(self.bb3, tape_cls=PagedTape)
+        children = [tm.fork(), tm.fork()]
+        tm.rule_str('0 d -> 1 d L')
+        assert all(len(child._rule_keys) == 6 and ('0', 'd') not in child._rules for child in children)
+        assert children[0]._rules is children[1]._rules
+        children[0].rule_str('0 e -> 1 e L')
+        assert ('0', 'e') not in children[1]._rules and ('0', 'e') not in tm._rules
+        for child in children:
+            child.run()
+            assert child.stopped and child.steps == 14
+
+    def test_many_forks(self):
+        tm = TuringMachine.from_str('0::0:a:0 a -> 1 a R', tape_cls=PagedTape, log_size=0)
+        tm.run(max_steps=100000)
+        children = [tm.fork() for _ in range(1000)]
+        for i, child in enumerate(children):
+            child[i] = 'x'
+        assert all(child.tape.shared_pages() == len(tm.tape._pages) - 1 for child in children)
+        assert tm.tape.read(5) == '1' and children[5][5] == 'x' and children[6][5] == '1'
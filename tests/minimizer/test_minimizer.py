@@ -0,0 +1,119 @@
+import random
+
+from turingmachine.machine import TuringMachine, TuringMachineError
+from turingmachine.macro import Macro
+from turingmachine.multitape import MultiTapeTuringMachine
+from turingmachine.nondeterministic import NondeterministicTuringMachine
+from turingmachine import minimizer
+
+
+def moore(tm):
+    """Count classes of reachable conditions by naive refinement"""
+    transitions = minimizer._transitions(tm)
+    order = minimizer.reachable(tm)
+    classes = {cond: 0 for cond in order}
+    while True:
+        signatures = {
+            cond: (classes[cond], frozenset(
+                (val, next_val, move, None if next_cond is None else classes[next_cond])
+                for val, next_val, next_cond, move in transitions.get(cond, ())
+                ))
+            for cond in order
+            }
+        numbers = {}
+        refined = {cond: numbers.setdefault(signature, len(numbers)) for cond, signature in signatures.items()}
+        if len(numbers) == len(set(classes.values())):
+            return len(numbers)
+        classes = refined
+
+
+def random_machine(rng, conditions, symbols):
+    tm = TuringMachine([rng.choice(symbols) for _ in range(8)], 'c0', log_size=0)
+    for cond in range(conditions):
+        for val in symbols:
+            if rng.random() < 0.8:
+                move = rng.choice('RRLLS') if rng.random() < 0.9 else 'STOP'
+                tm.set_rule(val, f'c{cond}', rng.choice(symbols[:2]), f'c{rng.randrange(conditions)}', move)
+    return tm
+
+
+def configuration(tm):
+    return list(tm.tape), tm.index, tm.stopped
+
+
+class TestMinimizer:
+    def test_cycle(self):
+        rules = ','.join(f'1 a{i} -> 1 a{(i + 1) % 6} R,B a{i} -> 0 STOP' for i in range(6))
+        tm = TuringMachine.from_str(f'1,1,1,1,1:::a0:{rules}')
+        result = tm.minimize()
+        assert result == minimizer.Minimization({f'a{i}': 'q0' for i in range(6)}, 2, 10)
+        assert tm.rule_table() == [('1', 'q0', '1', 'q0', 'R'), ('', 'q0', '0', 'q0', 'STOP')]
+        assert tm.run().steps == 6 and list(tm.tape) == ['1'] * 5 + ['0']
+
+    def test_chain(self):
+        """Conditions of a chain differ by the distance to its end"""
+        rules = ','.join(f'1 a{i} -> 1 a{i + 1} R' for i in range(6)) + ',1 a6 -> 0 STOP'
+        tm = TuringMachine.from_str(f'1,1,1,1,1,1,1:::a0:{rules}')
+        result = tm.minimize(prefix=None)
+        assert result.conditions == {f'a{i}': f'a{i}' for i in range(7)}
+        assert result.dropped == 0
+        assert tm.run().steps == 7 and tm.tape[6] == '0'
+
+    def test_current_condition(self):
+        tm = TuringMachine.from_str('1,1,1:::a:1 a -> 1 b R,1 b -> 1 b R,B b -> 1 STOP')
+        tm.move()
+        tm.minimize()
+        assert tm.condition == 'q0'
+        assert tm.rule_table() == [('1', 'q0', '1', 'q0', 'R'), ('', 'q0', '1', 'q0', 'STOP')]
+        assert not tm.log
+        tm.run()
+        assert list(tm.tape) == ['1'] * 4 and tm.steps == 4
+
+    def test_random(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            tm = random_machine(rng, rng.randrange(1, 12), ['0', '1', '2'][:rng.randrange(2, 4)])
+            expected = tm.fork()
+            classes = moore(tm)
+            result = tm.minimize()
+            assert len(set(result.conditions.values())) == classes
+            assert len({cond for _, cond in tm._rules}) <= classes
+
+            for machine in (tm, expected):
+                try:
+                    machine.run(max_steps=200)
+                except Exception as error:
+                    machine.error = type(error)
+                else:
+                    machine.error = None
+            assert tm.error == expected.error
+            assert configuration(tm) == configuration(expected)
+            assert expected.stopped or tm.condition == result.conditions[expected.condition]
+
+    def test_macro(self):
+        tm = TuringMachine.from_str('a' + ',1,0,1,1' * 4 + ',b,2,3,2,2,c:::q1:', log_size=0)
+        tmac = Macro(tm)
+        tmac.copy_range(['1', '0'], 'b', ['2', '3'], 'c', [tm.default], 'R')
+        tmac.stop()
+        expected = tm.fork()
+        result = tm.minimize()
+        assert result.rules < len(expected._rules)
+        assert tm.run(mode='compiled') == expected.run(mode='compiled')
+        assert configuration(tm) == configuration(expected)
+
+    def test_multitape(self):
+        tm = MultiTapeTuringMachine.from_str(
+            '1,1,1|0::0:a:1|0 a -> 1|1 b R|R,1|0 b -> 1|1 a R|R,0|0 a -> 0|0 STOP,0|0 b -> 0|0 STOP'
+            )
+        assert tm.minimize().rules == 2
+        tm.run()
+        assert tm.tapes[1][:3] == ['1', '1', '1']
+
+    def test_nondeterministic(self):
+        tm = NondeterministicTuringMachine.from_str('1:::a:1 a -> 1 a R,1 a -> 0 a R')
+        try:
+            tm.minimize()
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError('nondeterministic machine is minimized')
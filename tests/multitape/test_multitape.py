@@ -0,0 +1,95 @@
+from turingmachine.machine import RuleExistsError, RuleNotFoundError, RunStatus, TuringMachineError
+from turingmachine.multitape import MultiTapeTuringMachine
+from turingmachine.tape import PagedTape
+
+# copies the first tape to the second one, goes back on the first
+# tape and compares it with the second one read backwards
+PALINDROME = ','.join([
+    '0|0 copy -> 0|0 back L|S',
+    'a|0 copy -> a|a copy R|R',
+    'b|0 copy -> b|b copy R|R',
+    'a|0 back -> a|0 back L|S',
+    'b|0 back -> b|0 back L|S',
+    '0|0 back -> 0|0 cmp R|L',
+    'a|a cmp -> a|a cmp R|L',
+    'b|b cmp -> b|b cmp R|L',
+    '0|0 cmp -> 0|0 yes S|S',
+    'a|b cmp -> a|b no S|S',
+    'b|a cmp -> b|a no S|S',
+    '0|0 yes -> 0|0 STOP',
+    'a|b no -> a|b STOP',
+    'b|a no -> b|a STOP',
+    ])
+
+
+def palindrome(word, **kwargs):
+    return MultiTapeTuringMachine.from_str(','.join(word) + '|0::0:copy:' + PALINDROME, **kwargs)
+
+
+class TestMultiTape:
+    def test_palindrome(self):
+        for word, condition in (('abba', 'yes'), ('abab', 'no'), ('aba' * 100, 'yes')):
+            tm = palindrome(word)
+            result = tm.run()
+            assert result.halted and tm.condition == condition
+        # linear amount of steps, single tape needs quadratic
+        assert tm.steps == 3 * 300 + 4
+        assert [tm.tapes[1].read(i) for i in range(300)] == list('aba' * 100)
+
+    def test_from_str(self):
+        tm = MultiTapeTuringMachine.from_str('1,2|3|:1|0|-2::q1:')
+        assert len(tm.tapes) == 3 and tm.indexes == [1, 0, -2]
+        assert tm.current == ('2', '3', '') and tm.index == 1
+        assert tm.tape is tm.tapes[0]
+        tm = MultiTapeTuringMachine([[1], [2]], 'q1', index=3)
+        assert tm.indexes == [3, 3]
+
+    def test_rules(self):
+        tm = palindrome('ab')
+        assert tm.rule_table()[1] == (('a', '0'), 'copy', ('a', 'a'), 'copy', ('R', 'R'))
+        assert '0|0 yes -> 0|0 yes STOP\n' in repr(tm)
+        for rule in ('a cmp -> a cmp R', 'a|b q -> a|b q R', 'a|b q -> a|b q R|X'):
+            try:
+                tm.rule_str(rule)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError
+        try:
+            tm.rule_str('a|0 copy -> a|a copy R|S')
+        except RuleExistsError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_errors(self):
+        tm = palindrome('ac')
+        try:
+            tm.run()
+        except RuleNotFoundError:
+            pass
+        else:
+            raise AssertionError
+        try:
+            palindrome('ab').run(mode='compiled')
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_log(self):
+        tm = palindrome('ab', log_size=2)
+        assert tm.run(max_steps=3) == (RunStatus.max_steps, 3)
+        assert tm.log == 'b|0 copy -> b|b copy R|R\n0|0 copy -> 0|0 back L|S\n'
+
+    def test_snapshot_fork(self):
+        tm = palindrome('abba', tape_cls=PagedTape)
+        tm.run(max_steps=5)
+        snapshot = tm.snapshot()
+        child = tm.fork()
+        tm.run()
+        child.tapes[1].write(0, 'b')
+        child.run()
+        assert tm.condition == 'yes' and child.condition == 'no'
+        tm.restore(snapshot)
+        assert tm.steps == 5 and tm.tapes[1][:4] == list('abba') and tm.indexes == [3, 4]
@@ -0,0 +1,99 @@
+from turingmachine.machine import TuringMachine, TuringMachineError
+from turingmachine.tape import PagedTape
+from turingmachine.nondeterministic import NondeterministicTuringMachine, SearchStatus
+
+BB3 = '0::0:a:0 a -> 1 b R,1 a -> 1 STOP,0 b -> 0 c R,1 b -> 1 b R,0 c -> 1 c L,1 c -> 1 a L'
+# guesses n bits and accepts only if all of them are 1
+GUESS = ','.join(
+    f'B c{i} -> 0 c{i + 1} R,B c{i} -> 1 c{i + 1} R' for i in range(12)
+    ) + ',B c12 -> 0 d L,1 d -> 1 d L,B d -> 0 STOP'
+# finds 1 on the tape
+FIND = '0,0,0:::q1:0 q1 -> 0 q1 R,1 q1 -> 1 q1 R,1 q1 -> 1 acc S,1 acc -> 1 STOP'
+
+
+def guess():
+    return NondeterministicTuringMachine.from_str(':::c0:' + GUESS)
+
+
+class TestNondeterministic:
+    def test_deterministic(self):
+        tm1 = TuringMachine.from_str(BB3)
+        tm2 = NondeterministicTuringMachine.from_str(BB3)
+        tm1.run()
+        result = tm2.search()
+        assert result.accepted and result.steps == tm1.steps == tm2.steps
+        assert tm2.tape == tm1.tape and tm2.index == tm1.index and tm2.stopped
+
+    def test_accepting(self):
+        tm = NondeterministicTuringMachine.from_str(FIND)
+        tm.accepting = {'acc'}
+        result = tm.search()
+        assert result.status == SearchStatus.rejected
+        assert list(tm.tape) == ['0', '0', '0'] and tm.steps == 0
+        tm[3] = '1'
+        assert tm.search() == (SearchStatus.accepted, 5, 6)
+        assert tm.index == 3 and tm.condition == 'acc'
+
+    def test_guess(self):
+        tm = guess()
+        result = tm.search()
+        assert result.accepted and result.steps == 26
+        assert result.visited < 2 ** 14
+        assert list(tm.tape) == ['0'] + ['1'] * 12 + ['0'] and tm.index == -1
+
+    def test_dedup(self):
+        tm = NondeterministicTuringMachine.from_str(':::q1:B q1 -> 0 q2 S,B q1 -> 0 q1 S')
+        tm.set_rule('0', 'q2', '', 'q1', 'S')
+        assert tm.search() == (SearchStatus.rejected, 2, 3)
+
+    def test_budgets(self):
+        tm = guess()
+        assert tm.search(max_steps=5) == (SearchStatus.max_steps, 5, 63)
+        result = tm.search(max_frontier=100)
+        assert result.status == SearchStatus.max_frontier and result.steps == 7
+        assert tm.steps == 0 and not tm.stopped
+
+    def test_depth_first(self):
+        tm1, tm2 = guess(), guess()
+        tm1.search()
+        result = tm2.search(max_steps=30, depth_first=True)
+        assert result.accepted and result.steps == 26
+        assert tm1.tape == tm2.tape and tm1.index == tm2.index
+        result = guess().search(max_steps=20, depth_first=True)
+        assert result.status == SearchStatus.max_steps
+        try:
+            guess().search(depth_first=True)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_workers(self):
+        tm1, tm2 = guess(), guess()
+        assert tm1.search() == tm2.search(workers=2)
+        assert tm1.tape == tm2.tape and tm1.condition == tm2.condition
+
+    def test_rules(self):
+        tm = NondeterministicTuringMachine.from_str(FIND, tape_cls=PagedTape)
+        tm.rule_str('1 q1 -> 1 q1 R')
+        assert tm.rule_table() == [
+            ('0', 'q1', '0', 'q1', 'R'), ('1', 'q1', '1', 'q1', 'R'),
+            ('1', 'q1', '1', 'acc', 'S'), ('1', 'acc', '1', 'acc', 'STOP'),
+            ]
+        assert '1 q1 -> 1 acc S' in repr(tm)
+        for func in (tm.move, tm.run):
+            try:
+                func()
+            except TuringMachineError:
+                pass
+            else:
+                raise AssertionError
+
+    def test_fork(self):
+        tm = guess()
+        child = tm.fork()
+        assert child.search().accepted
+        assert tm.steps == 0 and list(tm.tape) == ['']
+        assert child._choices is tm._choices
+        child.set_rule('', 'c0', '1', 'c0', 'R')
+        assert len(child._choices[('', 'c0')]) == len(tm._choices[('', 'c0')]) + 1
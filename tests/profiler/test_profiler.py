@@ -0,0 +1,61 @@
+import json
+
+from turingmachine.machine import TuringMachine
+from turingmachine.profiler import profile
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+SWEEP = '0::0:a:0 a -> 1 a R,1 a -> 1 a R'
+
+
+def profiled(src, mode, **kwargs):
+    tm = TuringMachine.from_str(src, log_size=0)
+    with profile(tm) as prof:
+        tm.run(mode=mode, **kwargs)
+    return tm, prof
+
+
+class TestProfiler:
+    def test_modes(self):
+        tm, prof = profiled(BB4, 'step')
+        assert prof.steps == tm.steps == 107 and sum(prof.hits) == 107
+        assert prof.index == tm.index
+        assert prof.extent[0] <= -tm.tape.center and prof.extent[1] >= 0
+        for mode, kwargs in (('compiled', {}), ('python', {}), ('macro', {'block_size': 2})):
+            other, other_prof = profiled(BB4, mode, **kwargs)
+            assert other_prof.to_dict() == prof.to_dict()
+
+    def test_sweep(self):
+        tm, prof = profiled(SWEEP, 'compiled', max_steps=10000)
+        assert prof.rule_hits() == [('0 a -> 1 a R', 10000), ('1 a -> 1 a R', 0)]
+        assert prof.extent == [0, 10000] and prof.reversals == 0
+
+    def test_log_restored(self):
+        tm = TuringMachine.from_str(BB4, log_size=3)
+        log = tm._log
+        with profile(tm) as prof:
+            tm.run(max_steps=10)
+        assert tm._log is log and tm.log == '' and prof.steps == 10
+        tm.run(max_steps=1)
+        assert tm.log == '1 b -> 0 c L\n'
+
+    def test_report(self):
+        tm = TuringMachine.from_str(BB4, log_size=0)
+        with profile(tm, sample_every=10) as prof:
+            tm.run()
+        report = json.loads(prof.to_json())
+        assert report['steps'] == 107 and report['reversals'] == prof.reversals > 10
+        assert [rule['hits'] for rule in report['rules']] == sorted(prof.hits, reverse=True)
+        assert sum(condition['hits'] for condition in report['conditions']) == 107
+        assert set(prof.seconds) <= {'a', 'b', 'c', 'd'} and sum(prof.seconds.values()) > 0
+        table = prof.table()
+        assert table.splitlines()[0].split() == ['rule', 'hits', 'share']
+        assert '1 b -> 0 c L' in table and 'reversals:' in table
+
+    def test_rules_added(self):
+        tm = TuringMachine.from_str('0::0:a:0 a -> 1 b R')
+        with profile(tm) as prof:
+            tm.move()
+            tm.rule_str('0 b -> 1 a L')
+            tm.move()
+        assert list(prof.hits) == [1, 1] and prof.reversals == 1
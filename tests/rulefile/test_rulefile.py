@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+from turingmachine.machine import TuringMachine, RuleExistsError
+from turingmachine.nondeterministic import NondeterministicTuringMachine
+from turingmachine import rulefile
+
+HEAD = '1,1,0,1::_:inc\n'
+RULES = 'B inc -> _ back L,1 inc -> 0 inc L\n' \
+        '0 inc -> 1 back L\n' \
+        '\n' \
+        '1 back -> 1 back L,0 back -> 0 back L\n' \
+        '_ back -> _ STOP\n'
+
+
+def write(directory, content, name='tm.txt'):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        file.write(content)
+    return path
+
+
+def old_style(content):
+    head, tail = content.split('\n', 1)
+    return TuringMachine.from_str(head + ':' + tail.strip().replace('\n\n', '\n').replace('\n', ','))
+
+
+class TestRuleFile:
+    def test_from_file(self):
+        directory = tempfile.mkdtemp()
+        path = write(directory, HEAD + RULES)
+        expected = old_style(HEAD + RULES)
+        for cache_dir in (None, directory, directory):
+            tm = TuringMachine.from_file(path, cache_dir=cache_dir)
+            assert tm.rule_table() == expected.rule_table()
+            assert tm._rule_ids == expected._rule_ids
+            tm.index = 3
+            tm.run()
+            assert list(tm.tape) == ['_', '1', '1', '1', '0'] and tm.stopped
+        assert len([name for name in os.listdir(directory) if name.endswith('.tmrc')]) == 1
+
+    def test_one_line(self):
+        directory = tempfile.mkdtemp()
+        for content in ('1,1:::q1:1 q1 -> 0 q1 R', '1,1:::q1:1 q1 -> 0 q1 R\n', '1,1:::q1\n1 q1 -> 0 q1 R'):
+            tm = TuringMachine.from_file(write(directory, content))
+            assert tm.rule_table() == [('1', 'q1', '0', 'q1', 'R')]
+
+    def test_stale_cache(self):
+        directory = tempfile.mkdtemp()
+        path = write(directory, HEAD + RULES)
+        TuringMachine.from_file(path, cache_dir=directory)
+        write(directory, HEAD + RULES.replace('0 inc -> 1 back L', '0 inc -> 1 back S'))
+        tm = TuringMachine.from_file(path, cache_dir=directory)
+        assert ('0', 'inc', '1', 'back', 'S') in tm.rule_table()
+
+        cache, = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.tmrc')]
+        with open(cache, 'r+b') as file:
+            file.seek(60)
+            file.truncate()
+        tm = TuringMachine.from_file(path, cache_dir=directory)
+        assert len(tm.rule_table()) == 6
+        assert rulefile.load_cache(path, cache) is not None
+
+    def test_existing_rules(self):
+        directory = tempfile.mkdtemp()
+        path = write(directory, '1 q1 -> 0 q1 R\n1 q1 -> 0 q1 R\nB q1 -> 1 q2 L')
+        tm = TuringMachine.from_str('1:::q1:0 q2 -> 0 STOP')
+        tm.rule_file(path, cache_dir=directory)
+        tm.rule_file(path, cache_dir=directory)
+        assert [rule[:2] for rule in tm.rule_table()] == [('0', 'q2'), ('1', 'q1'), ('', 'q1')]
+        assert tm.run().steps == 3
+
+    def test_errors(self):
+        directory = tempfile.mkdtemp()
+        for rules, error in (
+                ('1 q1 -> 0 q1 R\n1 q1 -> 1 q1 R', RuleExistsError),
+                ('1 q1 -> 0 q1 X', ValueError),
+                ('1 q1 -> 0 R', ValueError),
+                ):
+            for cache_dir in (None, directory):
+                tm = TuringMachine.from_str('1:::q1:')
+                try:
+                    tm.rule_file(write(directory, rules), cache_dir=cache_dir)
+                except error:
+                    pass
+                else:
+                    raise AssertionError
+
+    def test_nondeterministic(self):
+        directory = tempfile.mkdtemp()
+        path = write(directory, '1,1:::q1\n1 q1 -> 1 q1 R\n1 q1 -> 0 acc S\n0 acc -> 0 STOP')
+        for cache_dir in (None, directory, directory):
+            tm = NondeterministicTuringMachine.from_file(path, cache_dir=cache_dir)
+            assert len(tm.rule_table()) == 3 and tm.search().accepted
+
+    def test_multitape(self):
+        from turingmachine.multitape import MultiTapeTuringMachine
+        directory = tempfile.mkdtemp()
+        path = write(directory, '1,1|0::0:q1\n1|0 q1 -> 1|1 q1 R|R\n0|0 q1 -> 0|0 STOP\n')
+        tm = MultiTapeTuringMachine.from_file(path, cache_dir=directory)
+        assert tm.run().steps == 3
+        assert [list(tape) for tape in tm.tapes] == [['1', '1', '0'], ['1', '1', '0']]
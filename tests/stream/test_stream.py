@@ -0,0 +1,74 @@
+import io
+import random
+from functools import partial
+
+from turingmachine.machine import TuringMachine, RunStatus, RuleNotFoundError, TuringMachineError
+from turingmachine.tape import StreamTape
+from turingmachine import stream
+
+# swaps a and b, then marks the end of the input
+SWAP = 'a q1 -> b q1 R,b q1 -> a q1 R,B q1 -> . STOP'
+# swaps a and b and goes back to the start at the end of the input
+BACK = 'a q1 -> b q1 R,b q1 -> a q1 R,B q1 -> . back L,a back -> a back L,b back -> b back L'
+
+
+def streaming(source, rules, **kwargs):
+    output = []
+    sizes = []
+
+    def sink(vals):
+        sizes.append(len(tm.tape._buf))
+        output.extend(vals)
+
+    tm = TuringMachine(source, 'q1', log_size=0, tape_cls=partial(StreamTape, sink=sink, **kwargs))
+    tm.rule_str(rules)
+    return tm, output, sizes
+
+
+class TestStream:
+    def test_bounded_memory(self):
+        random.seed(0)
+        text = ''.join(random.choice('ab') for _ in range(200000))
+        tm, output, sizes = streaming(stream.read_cells(io.StringIO(text), 1000), SWAP, chunk_size=1000)
+        assert stream.run_streaming(tm, flush_every=500) == (RunStatus.halted, 200001)
+        assert ''.join(output) == text.translate(str.maketrans('ab', 'ba')) + '.'
+        assert max(sizes) < 4000
+
+    def test_forward_only(self):
+        tm, output, sizes = streaming('ab', BACK)
+        assert not stream.forward_only(tm)
+        tm.rule_str('. q2 -> . q2 R,a q2 -> a q3 S')
+        assert stream.forward_only(tm, 'q2')
+        tm.set_rule('b', 'q3', 'b', 'q1', 'S')
+        assert not stream.forward_only(tm, 'q2')
+
+    def test_not_forward(self):
+        tm, output, sizes = streaming(iter('ab' * 5000), BACK)
+        try:
+            stream.run_streaming(tm, flush_every=100)
+        except RuleNotFoundError:
+            pass
+        else:
+            raise AssertionError
+        assert output == [] and tm.index == -1 and len(tm.tape) == 10002
+
+    def test_budgets(self):
+        tm, output, sizes = streaming(iter('ab' * 5000), SWAP)
+        assert stream.run_streaming(tm, max_steps=1000, flush_every=300) == (RunStatus.max_steps, 1000)
+        assert output == list('ba' * 500) and tm.index == 1000
+        assert stream.run_streaming(tm) == (RunStatus.halted, 9001)
+        assert len(output) == 10001
+
+    def test_read_cells(self):
+        assert list(stream.read_cells(io.BytesIO(b'ab\xff'), 2)) == ['a', 'b', '\xff']
+        file = io.StringIO()
+        stream.file_sink(file, delimiter=',')(['1', '2'])
+        assert file.getvalue() == '1,2,'
+
+    def test_tape_type(self):
+        try:
+            stream.run_streaming(TuringMachine.from_str(':::q1:' + SWAP))
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
@@ -0,0 +1,310 @@
+import copy
+import os
+import random
+import tempfile
+
+from turingmachine.tape import Tape, RunTape, PagedTape, StreamTape, MmapTape
+from turingmachine.machine import TuringMachine, TuringMachineError
+from turingmachine.macro import Macro
+
+
+class TestTape:
+    def test_init(self):
+        tape = Tape(['1', '2', '3'], default='0')
+        assert list(tape) == ['1', '2', '3']
+        assert tape.center == 0
+        assert tape.symbols[0] == '0'
+        assert list(Tape()) == ['']
+
+    def test_read_write(self):
+        tape = Tape(['1', '2', '3'])
+        assert tape.read(1) == '2'
+        tape.write(1, 'x')
+        assert tape.read(1) == 'x'
+        assert tape.read_code(1) == tape.codes['x']
+
+    def test_grow(self):
+        tape = Tape(['1'])
+        tape.write(-1000, 'l')
+        tape.write(1000, 'r')
+        assert len(tape) == 2001
+        assert tape.center == 1000
+        assert tape[0] == 'l' and tape[-1] == 'r' and tape[1000] == '1'
+        assert tape.read(500) == ''
+        assert len(tape._buf) >= 2001
+
+    def test_widen(self):
+        tape = Tape(str(i) for i in range(300))
+        assert tape._buf.typecode == 'H'
+        assert tape.read(299) == '299'
+
+    def test_slice(self):
+        tape = Tape(['1', '2', '3', '4'])
+        assert tape[1:3] == ['2', '3']
+        tape[0] = 'a'
+        assert tape[0] == 'a'
+
+    def test_eq(self):
+        tape1 = Tape(['1', '2'])
+        tape2 = Tape(['2'])
+        tape2.write(-1, '1')
+        assert tape1 == tape2
+        assert tape1 == ['1', '2']
+        assert tape1 != Tape(['1', '2', ''])
+
+    def test_reset(self):
+        for cls in (Tape, RunTape, PagedTape):
+            tape = cls(['1', '2'])
+            tape.write(-5, 'x')
+            symbols = tape.symbols
+            tape.reset(['2', '3'])
+            assert list(tape) == ['2', '3'] and tape.center == 0
+            assert tape.symbols is symbols and tape.codes['x'] == 3
+
+    def test_machine(self):
+        tm = TuringMachine.from_str('1,2,3:::q1:')
+        tm[-2] = 'x'
+        assert tm[-2] == 'x'
+        assert tm[-2:1] == ['x', '', '1']
+        assert tm._center == 2
+
+
+class TestRunTape:
+    def test_init(self):
+        tape = RunTape(['1', '1', '2', '1'], default='0')
+        assert list(tape) == ['1', '1', '2', '1']
+        assert tape.runs() == [('1', 2), ('2', 1), ('1', 1)]
+        assert list(RunTape()) == ['']
+
+    def test_split_merge(self):
+        tape = RunTape(['1'] * 10)
+        tape.write(5, '0')
+        assert tape.runs() == [('1', 5), ('0', 1), ('1', 4)]
+        tape.write(5, '1')
+        assert tape.runs() == [('1', 10)]
+        tape.write(-3, '1')
+        assert tape.runs() == [('1', 1), ('', 2), ('1', 10)]
+        assert tape.center == 3
+
+    def test_same_as_tape(self):
+        random.seed(0)
+        tape1, tape2 = Tape(['a', 'b']), RunTape(['a', 'b'])
+        for _ in range(2000):
+            index = random.randint(-50, 50)
+            if random.random() < 0.5:
+                assert tape1.read(index) == tape2.read(index)
+            else:
+                val = random.choice('ab ')
+                tape1.write(index, val)
+                tape2.write(index, val)
+            assert tape1.center == tape2.center
+        assert tape1 == tape2 and tape2 == list(tape1)
+        assert tape1[3:40] == tape2[3:40] and tape1[-1] == tape2[-1]
+
+    def test_snapshot(self):
+        tape = RunTape(['1'] * 1000)
+        snapshot = tape.snapshot()
+        assert len(snapshot[0]) == 1
+        tape.write(-5, 'x')
+        tape.write(500, 'y')
+        tape.restore(snapshot)
+        assert tape == RunTape(['1'] * 1000) and tape.center == 0
+
+    def test_machine(self):
+        tmac = Macro(TuringMachine.from_str('a' + ',1,0,1,1' * 20 + ',b,2,3,2,2,c:::q1:'))
+        tmac.copy_range(['1', '0'], 'b', ['2', '3'], 'c', [tmac.tm.default], 'R')
+        tmac.stop()
+        tm1 = tmac.tm
+        tm2 = copy.deepcopy(tm1)
+        tm2.tape = RunTape(tm1.tape)
+        tm1.run()
+        tm2.run()
+        assert tm1.tape == tm2.tape and tm1.index == tm2.index
+        assert tm1.log == tm2.log and repr(tm1) == repr(tm2)
+
+    def test_compiled(self):
+        tm = TuringMachine.from_str('1:::q1:1 q1 -> 0 STOP', tape_cls=RunTape)
+        assert isinstance(tm.tape, RunTape)
+        try:
+            tm.run(mode='compiled')
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
+
+
+class TestPagedTape:
+    def test_same_as_tape(self):
+        random.seed(1)
+        tape1, tape2 = Tape(['a', 'b']), PagedTape(['a', 'b'], page_size=8)
+        for _ in range(2000):
+            index = random.randint(-50, 50)
+            if random.random() < 0.5:
+                assert tape1.read(index) == tape2.read(index)
+            else:
+                val = random.choice('ab ')
+                tape1.write(index, val)
+                tape2.write(index, val)
+            assert tape1.center == tape2.center and len(tape1) == len(tape2)
+        assert tape2 == tape1 and tape2 == list(tape1)
+        assert tape1[3:40] == tape2[3:40] and tape1[-1] == tape2[-1]
+
+    def test_fork(self):
+        tape = PagedTape(['1'] * 100, page_size=10)
+        child = tape.fork()
+        assert child._pages[3] is tape._pages[3]
+        child.write(35, 'x')
+        child.write(-20, 'y')
+        assert child._pages[3] is not tape._pages[3] and child._pages[4] is tape._pages[4]
+        assert tape.read(35) == '1' and child.read(35) == 'x'
+        assert 'x' not in tape.codes and len(tape) == 100 and len(child) == 120
+        assert child.shared_pages() == 9 and tape.shared_pages() == 10
+        tape.write(35, 'z')
+        assert child.read(35) == 'x' and tape.shared_pages() == 9
+
+    def test_snapshot(self):
+        tape = PagedTape(['1'] * 100, page_size=10)
+        snapshot = tape.snapshot()
+        tape.write(50, '0')
+        tape.write(150, '0')
+        tape.restore(snapshot)
+        assert tape == ['1'] * 100 and len(tape._pages) == 10
+
+    def test_center(self):
+        tape1, tape2 = Tape(['1', '2', '3']), PagedTape(['1', '2', '3'], page_size=4)
+        for center in (1, 5, -3, 0):
+            tape1.center = tape2.center = center
+            tape1.write(2, 'x')
+            tape2.write(2, 'x')
+            assert tape1 == tape2 and tape1.center == tape2.center
+
+    def test_widen(self):
+        tape = PagedTape(['a'] * 10, page_size=4)
+        child = tape.fork()
+        for i in range(300):
+            child.write(i, str(i))
+        assert child._typecode == 'H' and tape._pages[0].typecode == 'B'
+        assert child.read(299) == '299' and tape.read(5) == 'a'
+
+    def test_machine(self):
+        src = '0::0:a:0 a -> 1 b R,1 a -> 1 STOP,0 b -> 0 c R,1 b -> 1 b R,0 c -> 1 c L,1 c -> 1 a L'
+        tm1 = TuringMachine.from_str(src)
+        tm2 = TuringMachine.from_str(src, tape_cls=PagedTape)
+        tm1.run()
+        tm2.run()
+        assert tm1.tape == tm2.tape and repr(tm1) == repr(tm2) and tm1.log == tm2.log
+
+
+class TestStreamTape:
+    def test_lazy(self):
+        pulled = []
+
+        def source():
+            for val in 'abcdef':
+                pulled.append(val)
+                yield val
+
+        tape = StreamTape(source(), chunk_size=2)
+        assert pulled == [] and len(tape) == 0
+        assert tape.read(2) == 'c' and pulled == list('abc')
+        assert tape.read(1) == 'b' and len(tape) == 3
+        tape.write(-2, 'x')
+        assert list(tape) == ['x', '', 'a', 'b', 'c'] and pulled == list('abc')
+        assert tape.read(10) == '' and list(tape)[2:] == list('abcdef') + [''] * 5
+
+    def test_flush(self):
+        output = []
+        tape = StreamTape('abcdef', chunk_size=4, sink=output.extend)
+        tape.write(1, 'x')
+        tape.flush(2)
+        assert output == ['a', 'x'] and list(tape) == ['c', 'd']
+        assert tape.read(5) == 'f' and tape.center == -2
+        try:
+            tape.read(1)
+        except IndexError:
+            pass
+        else:
+            raise AssertionError
+        tape.flush()
+        assert output == list('axcdef') and len(tape) == 0
+        assert tape.read(8) == '' and len(tape) == 3
+
+    def test_machine(self):
+        tm = TuringMachine(iter('111'), 'q1', tape_cls=StreamTape)
+        tm.rule_str('1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+        tm.run()
+        assert tm.tape == ['0', '0', '0', '1'] and tm.steps == 4
+        tm.stopped = False
+        try:
+            tm.run(mode='compiled')
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
+
+
+class TestMmapTape:
+    def test_same_as_tape(self):
+        random.seed(2)
+        tape1, tape2 = Tape(['a', 'b']), MmapTape(['a', 'b'])
+        for _ in range(3000):
+            index = random.randint(-10000, 10000)
+            if random.random() < 0.5:
+                assert tape1.read(index) == tape2.read(index)
+            else:
+                val = random.choice('ab ')
+                tape1.write(index, val)
+                tape2.write(index, val)
+            assert tape1.center == tape2.center
+        assert tape1 == tape2 and tape2 == list(tape1)
+        assert tape1[3:40] == tape2[3:40] and tape1[-1] == tape2[-1]
+
+    def test_widen(self):
+        tape = MmapTape(['a'] * 10000)
+        for i in range(300):
+            tape.write(-i, str(i))
+        assert tape.typecode == 'H' and tape._buf.itemsize == 2
+        assert tape.read(-299) == '299' and tape.read(9999) == 'a'
+        assert list(tape) == [str(i) for i in reversed(range(300))] + ['a'] * 9999
+
+    def test_open(self):
+        path = os.path.join(tempfile.mkdtemp(), 'tape')
+        tape = MmapTape('abc', path=path)
+        tape.write(-5000, 'x')
+        cells = list(tape)
+        tape.close()
+        tape = MmapTape.open(path)
+        assert list(tape) == cells and tape.center == 5000
+        tape.write(1, 'y')
+        tape.sync()
+        assert MmapTape.open(path).read(1) == 'y'
+
+    def test_fork_snapshot(self):
+        tape = MmapTape('abc')
+        child = copy.deepcopy(tape)
+        child.write(0, 'x')
+        assert tape.read(0) == 'a' and child.read(0) == 'x'
+        snapshot = tape.snapshot()
+        tape.write(100000, 'y')
+        tape.restore(snapshot)
+        assert list(tape) == ['a', 'b', 'c'] and len(tape._buf) < 100000
+
+    def test_iterate(self):
+        tape = MmapTape(['1'] * 10)
+        cells = iter(tape)
+        next(cells)
+        tape.write(100000, '2')
+        assert next(cells) == '1'
+
+    def test_machine(self):
+        src = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+              '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+        for mode in ('step', 'compiled', 'python'):
+            tm1 = TuringMachine.from_str(src)
+            tm2 = TuringMachine.from_str(src, tape_cls=MmapTape)
+            tm1.run(mode=mode)
+            tm2.run(mode=mode)
+            assert tm1.tape == tm2.tape and tm1.log == tm2.log and repr(tm1) == repr(tm2)
+        tm = TuringMachine.from_str('0::0:a:0 a -> 1 a L', log_size=0, tape_cls=MmapTape)
+        tm.run(mode='compiled', max_steps=10 ** 6)
+        assert len(tm.tape) == 10 ** 6 + 1 and tm.tape.read(-10 ** 6 + 1) == '1'
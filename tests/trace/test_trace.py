@@ -0,0 +1,134 @@
+import os
+import tempfile
+
+from turingmachine.machine import TuringMachine, TuringMachineError, RuleNotFoundError
+from turingmachine.tape import RunTape, PagedTape, StreamTape
+from turingmachine.trace import Trace, TraceError, record
+
+BB4 = '0::0:a:0 a -> 1 b R,1 a -> 1 b L,0 b -> 1 a L,1 b -> 0 c L,' \
+      '0 c -> 1 STOP,1 c -> 1 d L,0 d -> 1 d R,1 d -> 0 a R'
+
+
+def trace_path():
+    return os.path.join(tempfile.mkdtemp(), 'tm.trace')
+
+
+def state(tm):
+    return tm.index, tm.condition, tm.steps, tm.stopped, [tm.tape.read(i) for i in range(-20, 20)]
+
+
+def expected(steps, src=BB4):
+    tm = TuringMachine.from_str(src)
+    tm.run(max_steps=steps)
+    return tm
+
+
+class TestTrace:
+    def test_seek(self):
+        for mode, kwargs in (('step', {}), ('compiled', {}), ('python', {}), ('macro', {'block_size': 2})):
+            path = trace_path()
+            tm = TuringMachine.from_str(BB4)
+            result = record(tm, path, mode=mode, keyframe_every=10, **kwargs)
+            assert result.halted and result.steps == 107
+            with Trace(path) as trace:
+                assert trace.steps == 107 and trace.keyframes[0] == 0 and len(trace.keyframes) >= 11
+                for steps in (0, 1, 9, 10, 11, 55, 106, 107):
+                    assert state(trace.seek(steps)) == state(expected(steps))
+
+    def test_log(self):
+        path = trace_path()
+        tm = TuringMachine.from_str(BB4)
+        record(tm, path, keyframe_every=7)
+        assert tm.log == ''
+        with Trace(path) as trace:
+            assert len(trace.rule_ids(0, 107)) == 107
+            log = expected(107).log.splitlines(keepends=True)
+            assert trace.log(0, 107) == ''.join(log)
+            assert trace.log(5, 23) == ''.join(log[5:23])
+            try:
+                trace.seek(108)
+            except IndexError:
+                pass
+            else:
+                raise AssertionError
+
+    def test_log_restored(self):
+        tm = TuringMachine.from_str(BB4, log_size=2)
+        log = tm._log
+        record(tm, trace_path(), max_steps=50)
+        assert tm._log is log and tm.steps == 50
+        tm.run(max_steps=1)
+        assert len(tm.log.splitlines()) == 1
+
+    def test_budget(self):
+        path = trace_path()
+        tm = TuringMachine.from_str(BB4)
+        tm.run(max_steps=30)
+        result = record(tm, path, max_steps=25, keyframe_every=10)
+        assert result.steps == 25 and not result.halted
+        with Trace(path) as trace:
+            assert trace.keyframes == [30, 40, 50, 55]
+            assert state(trace.seek(42)) == state(expected(42))
+
+    def test_tapes(self):
+        for tape_cls in (RunTape, PagedTape):
+            path = trace_path()
+            tm = TuringMachine.from_str(BB4, tape_cls=tape_cls)
+            record(tm, path, mode='step', keyframe_every=16)
+            with Trace(path) as trace:
+                assert state(trace.seek(70)) == state(expected(70))
+        tm = TuringMachine([], 'a', tape_cls=StreamTape)
+        try:
+            record(tm, trace_path())
+        except TuringMachineError:
+            pass
+        else:
+            raise AssertionError
+
+    def test_missing_rule(self):
+        path = trace_path()
+        src = '1,1,1::0:a:1 a -> 0 a R'
+        tm = TuringMachine.from_str(src)
+        try:
+            record(tm, path, keyframe_every=2)
+        except RuleNotFoundError:
+            pass
+        else:
+            raise AssertionError
+        with Trace(path) as trace:
+            assert trace.steps == 3
+            assert state(trace.seek(3)) == state(tm)
+
+    def test_rules_added(self):
+        path = trace_path()
+        tm = TuringMachine.from_str('0::0:a:0 a -> 1 b R')
+        try:
+            record(tm, path)
+        except RuleNotFoundError:
+            pass
+        tm.rule_str('0 b -> 1 STOP')
+        record(tm, path)
+        with Trace(path) as trace:
+            assert trace.keyframes == [1, 2] and len(trace.rules) == 2
+            assert trace.seek(2).stopped
+
+    def test_truncated(self):
+        path = trace_path()
+        record(TuringMachine.from_str(BB4), path, keyframe_every=10)
+        with open(path, 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:-5])
+        with Trace(path) as trace:
+            assert trace.steps == 100
+            assert state(trace.seek(100)) == state(expected(100))
+
+        for data in (b'', b'TMCP\x01'):
+            with open(path, 'wb') as file:
+                file.write(data)
+            try:
+                Trace(path)
+            except TraceError:
+                pass
+            else:
+                raise AssertionError
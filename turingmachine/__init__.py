@@ -1,6 +1,24 @@
 """
 Turing Machine package consists of this modules:
     machine: implements turing machine
+    engine: compiled integer engine for turing machine
+    codegen: compilation of turing machine rules to python source
+    blocks: block macro machine simulation of turing machine
+    deciders: deciders proving that turing machine never halts
+    multitape: turing machine with many tapes and heads
+    nondeterministic: nondeterministic turing machine run by search
+    batch: batch execution of turing machine on many tapes
+    lockstep: numpy lockstep simulation of turing machine on many tapes
+    stream: streaming runs of turing machine on lazily read input
+    profiler: per-rule and per-condition execution profiler
+    events: subscriptions to events of turing machine runs
+    trace: binary traces of turing machine runs with random-access replay
+    rulefile: streaming rule file loader with an on-disk cache of parsed rules
+    minimizer: minimisation of rule tables of turing machine
+    analysis: static analysis of reachable rules of turing machine
+    aio: asyncio runs of turing machine with cooperative time slicing
+    checkpoint: binary checkpoints of turing machine
+    tape: growable tape of interned symbol codes
     macro: set of macros to write functions
     gui: GUI user interface
     extensions: some author-written extensions package
@@ -0,0 +1,172 @@
+"""
+Module providing asyncio runs of TuringMachine with cooperative time slicing
+
+run_async runs the machine in slices of slice_steps steps with
+TuringMachine.run, so budgets, run modes and events work as they do
+there. Slices are run in the thread of the event loop, which gets
+control back between them, or in an executor, so the loop is free
+while they run. A thread executor runs slices on the machine itself.
+A process executor runs every slice on a fork of the machine sent to
+a worker, configuration, new symbols and log of the fork are brought
+back after the slice, rules are compiled by the worker for every slice,
+so slices should be long there. StreamTape and MmapTape machines could
+not be sent to processes.
+
+Cancelling the task of run_async stops the run between slices: a slice
+running in an executor is finished and brought back first, so the
+machine could be run again from where it was stopped. Progress is
+reported by calling progress(tm, steps) after every slice, with steps
+made by the run so far.
+
+Usage:
+    >>> import asyncio
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP', log_size=0)
+    >>> asyncio.run(run_async(tm, slice_steps=2, progress=lambda tm, steps: print(steps)))
+    2
+    4
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> tm.tape
+    Tape(['0', '0', '0', '1'])
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from turingmachine import machine
+from turingmachine.tape import StreamTape, MmapTape
+
+# default amount of steps of a slice
+SLICE_STEPS = 65536
+
+
+def _add(total, result):
+    """Get status of result with counts of steps of total and result added"""
+    if total is None:
+        return result
+    return result._make((result.status,) + tuple(a + b for a, b in zip(total[1:], result[1:])))
+
+
+def _tapes(tm):
+    return getattr(tm, 'tapes', [tm.tape])
+
+
+def _run_slice(tm, kwargs):
+    """Run a slice on the fork of a machine in a worker process
+    Returns:
+        result, None if there is no rule to move, snapshot of the
+        machine, symbols of every tape and rule ids of logged moves"""
+    try:
+        result = tm.run(**kwargs)
+    except machine.RuleNotFoundError:
+        result = None
+    return result, tm.snapshot(), [tape.symbols for tape in _tapes(tm)], list(tm._log)
+
+
+async def _wait(future, finish=None):
+    """Wait for the slice running in an executor, when the task is
+    cancelled, the slice is finished and passed to finish first
+    Returns:
+        result of the slice"""
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        if finish is not None and not future.cancelled() and future.exception() is None:
+            finish(future.result())
+        raise
+
+
+def _bring_back(tm, outcome):
+    """Write configuration, new symbols and log of a fork of tm,
+    which ran the slice, into tm
+    Returns:
+        result of the slice"""
+    result, snapshot, symbols, rule_ids = outcome
+    for tape, tape_symbols in zip(_tapes(tm), symbols):
+        for symbol in tape_symbols[len(tape.symbols):]:
+            tape.intern(symbol)
+    tm.restore(snapshot)
+    if tm._log.enabled:
+        tm._log.extend(rule_ids)
+    return result
+
+
+async def _process_slice(tm, loop, executor, kwargs):
+    """Run a slice on a fork of tm in a process executor, firing events as TuringMachine.run does"""
+    if any(isinstance(tape, (StreamTape, MmapTape)) for tape in _tapes(tm)):
+        raise machine.TuringMachineError('StreamTape and MmapTape machines could not be run in processes')
+
+    child = tm.fork()
+    child._log = machine.ExecutionLog(None if tm._log.enabled else 0)
+    events = tm._events
+    if events is not None:
+        events.start()
+        if events.every:
+            kwargs['max_steps'] = events.limit(kwargs['max_steps'])
+    stopped = tm.stopped
+
+    future = loop.run_in_executor(executor, _run_slice, child, kwargs)
+    result = _bring_back(tm, await _wait(future, lambda outcome: _bring_back(tm, outcome)))
+
+    if result is None:
+        if events is not None:
+            events.fire_missing()
+        raise machine.RuleNotFoundError(tm.current, tm.condition, tm)
+    if events is not None:
+        events.fire_steps()
+        if result.halted and not stopped:
+            events.fire_halt()
+    return result
+
+
+async def _slice(tm, loop, executor, kwargs):
+    if executor is None:
+        result = tm.run(**kwargs)
+        await asyncio.sleep(0)
+        return result
+    if isinstance(executor, ProcessPoolExecutor):
+        return await _process_slice(tm, loop, executor, kwargs)
+    return await _wait(loop.run_in_executor(executor, lambda: tm.run(**kwargs)))
+
+
+async def run_async(
+        tm, slice_steps=SLICE_STEPS,
+        max_steps=None, max_seconds=None, max_tape_cells=None,
+        mode='step', block_size=None,
+        executor=None, progress=None
+        ):
+    """Run tm in slices of slice_steps steps, giving control
+    to the event loop between them, see TuringMachine.run
+    Arguments:
+        slice_steps: maximum amount of steps of a slice
+        executor: concurrent.futures executor running slices,
+        None to run them in the thread of the event loop
+        progress: function called as progress(tm, steps) after every
+        slice with amount of steps made by the run so far
+    Returns:
+        RunResult of the whole run, MacroRunResult in macro mode"""
+    if slice_steps <= 0:
+        raise ValueError(f'slice_steps must be positive, not {slice_steps}')
+
+    loop = asyncio.get_running_loop()
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    total = None
+    while True:
+        steps = 0 if total is None else total.steps
+        kwargs = {
+            'max_steps': slice_steps if max_steps is None else min(slice_steps, max_steps - steps),
+            'max_seconds': None if deadline is None else max(deadline - time.monotonic(), 0),
+            'max_tape_cells': max_tape_cells, 'mode': mode, 'block_size': block_size,
+            }
+        result = await _slice(tm, loop, executor, kwargs)
+        total = _add(total, result)
+        if progress is not None:
+            progress(tm, total.steps)
+
+        if result.status is not machine.RunStatus.max_steps:
+            return total
+        if max_steps is not None and total.steps >= max_steps:
+            return total
+        if deadline is not None and time.monotonic() >= deadline:
+            return total._replace(status=machine.RunStatus.max_seconds)
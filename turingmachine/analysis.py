@@ -0,0 +1,183 @@
+"""
+Module providing static analysis of rule tables of TuringMachine
+
+Rules reachable from the current configuration of the machine are found
+without running it: the current condition sees the current cell, a
+condition entered by a rule staying in place sees the symbol the rule
+writes, a condition entered by a rule moving the head sees any symbol,
+which could be on the tape, that is a symbol of the tape or a symbol
+written by a reachable rule. Symbols a condition sees, which have no
+rule, are missing rules the machine could stop at with RuleNotFoundError,
+checking them before a long run saves the run. Symbols are over-approximated,
+so a missing rule is not necessarily hit by a run, but a run hits no
+missing rule, which is not reported.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str('1,1:::a:1 a -> 1 a R,B a -> 1 b L,1 b -> 1 b L,0 c -> 0 a R')
+    >>> result = analyze(tm)
+    >>> result.missing
+    [('', 'b')]
+    >>> print(result.report(tm.EMPTY_SIGN))
+    conditions: 2, rules: 3 of 4, halting: -
+    missing rules:
+    B b
+    components:
+    a
+    b
+"""
+
+from collections import namedtuple
+
+from turingmachine import machine
+from turingmachine.tape import StreamTape
+
+MOVES = ('R', 'L', 'S', 'STOP')
+
+
+class Analysis(namedtuple('Analysis', [
+        'conditions', 'graph', 'sees', 'writes', 'missing', 'halting', 'components', 'unused'
+        ])):
+    """Outcome of analyze
+
+    Attributes:
+        conditions: conditions reachable from the current one, in the order they are found
+        graph: list of conditions reachable rules lead to of every condition
+        sees: set of symbols every condition could see
+        writes: set of symbols every condition could write
+        missing: (symbol, condition) of every missing rule
+        halting: conditions with reachable STOP rules
+        components: strongly connected components of graph, lists of conditions in
+        topological order, so no condition leads to a condition of an earlier component
+        unused: (val, condition) of rules, which could not be reached
+    """
+    __slots__ = ()
+
+    def report(self, empty=machine.TuringMachine.EMPTY_SIGN):
+        """Get report of the analysis as text
+        Arguments:
+            empty: sign of the default symbol"""
+        def symbol(val):
+            return empty if val == '' else val
+
+        rules = sum(len(self.sees[cond]) for cond in self.conditions) - len(self.missing)
+        lines = [
+            f'conditions: {len(self.conditions)}, rules: {rules} of {rules + len(self.unused)}, '
+            f"halting: {', '.join(self.halting) or '-'}"
+            ]
+        if self.missing:
+            lines.append('missing rules:')
+            lines.extend(f'{symbol(val)} {cond}' for val, cond in self.missing)
+        lines.append('components:')
+        lines.extend(' '.join(component) for component in self.components)
+        return '\n'.join(lines)
+
+
+def _table(tm):
+    """Get (next_val, next_condition, move character) of every (val, condition)"""
+    if type(tm)._rule_items is not machine.TuringMachine._rule_items:
+        raise machine.TuringMachineError(f'rules of {type(tm).__name__} could not be analyzed')
+    table = {}
+    for val, cond, next_val, next_cond, move in tm.rule_table():
+        if move not in MOVES:
+            raise machine.TuringMachineError(f'only R, L, S and STOP moves could be analyzed, not {move!r}')
+        table[val, cond] = (next_val, next_cond, move)
+    return table
+
+
+def components(conditions, graph):
+    """Get strongly connected components of graph by Tarjan's algorithm
+    Returns:
+        lists of conditions in topological order"""
+    index, low, stack, on_stack = {}, {}, [], set()
+    found = []
+    for root in conditions:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        path = [(root, iter(graph.get(root, ())))]
+        while path:
+            cond, edges = path[-1]
+            for next_cond in edges:
+                if next_cond not in index:
+                    index[next_cond] = low[next_cond] = len(index)
+                    stack.append(next_cond)
+                    on_stack.add(next_cond)
+                    path.append((next_cond, iter(graph.get(next_cond, ()))))
+                    break
+                if next_cond in on_stack:
+                    low[cond] = min(low[cond], index[next_cond])
+            else:
+                path.pop()
+                if path:
+                    low[path[-1][0]] = min(low[path[-1][0]], low[cond])
+                if low[cond] == index[cond]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == cond:
+                            break
+                    found.append(component[::-1])
+    return found[::-1]
+
+
+def analyze(tm, symbols=None):
+    """Find rules of tm reachable from its current configuration
+    Arguments:
+        symbols: symbols, which could be on the tape besides the ones written
+        by rules, interned symbols of the tape by default, symbols of rules
+        are added to them for StreamTape, which input is read lazily
+    Returns:
+        Analysis"""
+    table = _table(tm)
+    if symbols is None:
+        symbols = set(tm.tape.symbols)
+        if isinstance(tm.tape, StreamTape):
+            symbols.update(val for val, _ in table)
+    alphabet = set(symbols) | {tm.default}
+
+    start = tm.condition
+    sees = {start: {tm.current}}
+    # conditions entered by moves of the head, which see the whole alphabet
+    moved = set()
+    writes, graph, halting = {}, {}, {}
+    done = {}
+
+    changed = True
+    while changed:
+        changed = False
+        for cond in list(sees):
+            if cond in moved:
+                sees[cond] |= alphabet
+            for val in sees[cond] - done.setdefault(cond, set()):
+                done[cond].add(val)
+                rule = table.get((val, cond))
+                if rule is None:
+                    continue
+                changed = True
+                next_val, next_cond, move = rule
+                alphabet.add(next_val)
+                writes.setdefault(cond, set()).add(next_val)
+                if move == 'STOP':
+                    halting[cond] = None
+                    continue
+                graph.setdefault(cond, {})[next_cond] = None
+                sees.setdefault(next_cond, set())
+                if move == 'S':
+                    sees[next_cond].add(next_val)
+                else:
+                    moved.add(next_cond)
+
+    conditions = list(sees)
+    graph = {cond: list(graph.get(cond, ())) for cond in conditions}
+    return Analysis(
+        conditions, graph, sees,
+        {cond: writes.get(cond, set()) for cond in conditions},
+        [(val, cond) for cond in conditions for val in sorted(sees[cond]) if (val, cond) not in table],
+        list(halting),
+        components(conditions, graph),
+        [key for key in table if key[0] not in sees.get(key[1], ())]
+        )
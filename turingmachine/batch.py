@@ -0,0 +1,120 @@
+"""
+Module providing batch execution of TuringMachine on many input tapes
+
+Rule table of the machine is sent to every worker process once,
+when it is started. Every worker keeps a single machine, which tape
+is reset for every input, so rules are compiled once per worker.
+Inputs are read lazily in chunks, and only a few chunks per worker
+are in flight at a time.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str(':::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> for result in run_many(tm, ['11', '1'], workers=0):
+    ...     print(result)
+    BatchResult(id=0, tape=['0', '0', '1'], steps=3, status=<RunStatus.halted: 1>)
+    BatchResult(id=1, tape=['0', '1'], steps=2, status=<RunStatus.halted: 1>)
+"""
+
+import itertools
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from turingmachine import machine
+
+# amount of chunks in flight per worker
+CHUNKS_PER_WORKER = 2
+
+
+class BatchResult(namedtuple('BatchResult', ['id', 'tape', 'steps', 'status'])):
+    """Result of a run of the machine on an input
+
+    Attributes:
+        id: position of the input among inputs
+        tape: list of used cells of the final tape
+        steps: amount of steps made
+        status: RunStatus of the run, None if there was no rule to move
+    """
+    __slots__ = ()
+
+    @property
+    def halted(self):
+        return self.status is machine.RunStatus.halted
+
+
+# machine and run arguments of the worker process
+_worker = None
+
+
+def _init(spec, run_kwargs):
+    """Build machine of the worker process from spec"""
+    global _worker
+    cls, tape_cls, table, condition, index, default = spec
+    tm = cls([], condition, index=index, default=default, log_size=0, tape_cls=tape_cls)
+    for rule in table:
+        tm.set_rule(*rule)
+    _worker = tm, condition, index, run_kwargs
+
+
+def _run_chunk(chunk):
+    """Run the machine of the worker process on chunk of (id, input) pairs
+    Returns:
+        list of BatchResult"""
+    tm, condition, index, run_kwargs = _worker
+    results = []
+    for input_id, vals in chunk:
+        tm.tape.reset(str(val) for val in vals)
+        tm.index = index
+        tm.condition = condition
+        tm.stopped = False
+        tm.steps = 0
+        try:
+            status = tm.run(**run_kwargs).status
+        except machine.RuleNotFoundError:
+            status = None
+        results.append(BatchResult(input_id, list(tm.tape), tm.steps, status))
+    return results
+
+
+def run_many(tm, inputs, workers=None, chunksize=256, **run_kwargs):
+    """Run rules of tm on every input tape on a process pool
+    Arguments:
+        tm: machine, which rules, condition, index, default and tape
+        backend are used, only R, L, S and STOP moves are allowed
+        inputs: iterable of input tapes, read lazily
+        workers: amount of worker processes, all cores if None,
+        0 to run in this process
+        chunksize: amount of inputs sent to a worker at once
+        run_kwargs: arguments of TuringMachine.run, mode is 'compiled'
+        by default
+    Yields:
+        BatchResult of every input in order of completion
+    """
+    run_kwargs.setdefault('mode', 'compiled')
+    spec = (type(tm), type(tm.tape), tm.rule_table(), tm.condition, tm.index, tm.default)
+    ids = enumerate(inputs)
+    chunks = iter(lambda: list(itertools.islice(ids, chunksize)), [])
+
+    if workers == 0:
+        _init(spec, run_kwargs)
+        for chunk in chunks:
+            yield from _run_chunk(chunk)
+        return
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(spec, run_kwargs)) as pool:
+        pending = {
+            pool.submit(_run_chunk, chunk)
+            for chunk in itertools.islice(chunks, workers * CHUNKS_PER_WORKER)
+            }
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.add(pool.submit(_run_chunk, chunk))
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
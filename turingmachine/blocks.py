@@ -0,0 +1,362 @@
+"""
+Module providing block macro machine simulation of TuringMachine
+
+Tape is grouped into blocks of block_size cells and the machine is
+simulated block by block (Marxen and Buntrock macro machine).
+Transition of every (block, condition, entry side) is computed once
+by simulating compiled rules of the machine and is cached.
+Tape is kept as two stacks of runs of equal blocks, so when the head
+passes through a run of equal blocks without changing its condition,
+the whole run is processed in one macro step.
+
+Rule ids of every block transition are cached with it, so moves
+are logged the same way as in other modes.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str(
+    ...     ':::a:B a -> 1 b R,B b -> 1 a L,1 a -> 1 b L,1 b -> 1 STOP'
+    ...     )
+    >>> tm.run(mode='macro', block_size=2)
+    MacroRunResult(status=<RunStatus.halted: 1>, steps=6, macro_steps=2)
+    >>> tm.tape
+    Tape(['1', '1', '1', '1'])
+"""
+
+import itertools
+import time
+from array import array
+from collections import namedtuple
+
+from turingmachine import engine
+from turingmachine import machine
+
+# sides of the block head enters from or exits to
+LEFT = 0
+RIGHT = 1
+# other ends of block transitions
+HALTED = 2
+MISSING = 3
+
+
+class InfiniteLoopError(machine.TuringMachineError):
+    """Raise when machine loops forever inside of a block"""
+
+    def __init__(self, block, cond):
+        msg = "Machine loops forever inside of block {} in condition '{}'"
+        super().__init__(msg.format(block, cond))
+
+
+class MacroRunResult(namedtuple('MacroRunResult', ['status', 'steps', 'macro_steps'])):
+    """Result of TuringMachine.run in macro mode
+
+    Attributes:
+        status: RunStatus of the run
+        steps: amount of steps of the machine made during the run
+        macro_steps: amount of macro steps made during the run
+    """
+    __slots__ = ()
+
+    @property
+    def halted(self):
+        return self.status is machine.RunStatus.halted
+
+
+def _push(stack, block, count):
+    """Push count blocks on the stack of runs"""
+    if stack and stack[-1][0] == block:
+        stack[-1][1] += count
+    else:
+        stack.append([block, count])
+
+
+def _pop(stack, count=1):
+    """Remove count blocks from the top run of the stack"""
+    stack[-1][1] -= count
+    if not stack[-1][1]:
+        stack.pop()
+
+
+class BlockMachine:
+    """Macro machine over blocks of TuringMachine tape
+
+    Attributes:
+        tm: TuringMachine to simulate
+        block_size: amount of cells in a block
+        rules: CompiledRules of tm
+        transitions: cache of (block, condition, entry side) transitions
+        macro_steps: amount of macro steps made
+    """
+
+    def __init__(self, tm, block_size):
+        if block_size < 1:
+            raise ValueError(f'block size must be positive, not {block_size}')
+
+        engine.check_tape(tm)
+        self.tm = tm
+        self.block_size = block_size
+        self.rules = engine.compile_rules(tm)
+        self.transitions = self.rules.block_cache.setdefault(block_size, {})
+        self.macro_steps = 0
+
+    def transition(self, block, cond, side):
+        """Get transition of the block
+        Returns:
+            tuple of new block, condition, end(LEFT, RIGHT, HALTED or MISSING),
+            amount of steps, last head position, range of visited positions
+            and rule ids of the steps
+        """
+        key = (block, cond, side)
+        result = self.transitions.get(key)
+        if result is None:
+            result = self.transitions[key] = self._simulate(block, cond, side)
+        return result
+
+    def _simulate(self, block, cond, side):
+        """Simulate rules on a single block until the head leaves it"""
+        rules = self.rules
+        width = rules.width
+        cells = list(block)
+        pos = 0 if side == LEFT else self.block_size - 1
+        lo = hi = pos
+        steps = 0
+        ids = []
+        seen = set()
+
+        while True:
+            t = cond * width + cells[pos]
+            next_cond = rules.next_condition[t]
+            if next_cond == engine.NO_RULE:
+                end = MISSING
+                break
+
+            config = (pos, cond, tuple(cells))
+            if config in seen:
+                raise InfiniteLoopError(block, rules.conditions[cond])
+            seen.add(config)
+
+            ids.append(rules.rule_id[t])
+            cells[pos] = rules.next_symbol[t]
+            cond = next_cond
+            steps += 1
+
+            move = rules.shift[t]
+            if move == engine.STOP:
+                end = HALTED
+                break
+
+            pos += move
+            lo = min(lo, pos)
+            hi = max(hi, pos)
+            if pos < 0:
+                end = LEFT
+                break
+            if pos >= self.block_size:
+                end = RIGHT
+                break
+
+        return tuple(cells), cond, end, steps, pos, lo, hi, tuple(ids)
+
+    def layout(self):
+        """Split tape of tm into blocks around the head
+        Returns:
+            stacks of [block, count] runs to the left and
+            to the right of the head, top of a stack is next to the head
+        """
+        k = self.block_size
+        tape = self.tm.tape
+        origin = self.tm.index
+        tape.locate(origin)
+        first, last = tape._start - tape._zero, tape._end - tape._zero
+        left_blocks = -(-(origin - first) // k)
+        right_blocks = -(-(last - origin) // k)
+        start = tape.locate(origin - left_blocks * k)
+        end = tape.locate(origin + right_blocks * k - 1) + 1
+        codes = tuple(tape._buf[start:end])
+        tape._start, tape._end = tape._zero + first, tape._zero + last
+
+        left, right = [], []
+        for i in range(left_blocks):
+            _push(left, codes[i * k:(i + 1) * k], 1)
+        for i in reversed(range(left_blocks, left_blocks + right_blocks)):
+            _push(right, codes[i * k:(i + 1) * k], 1)
+        return left, right
+
+    def run(self, max_steps=None, max_seconds=None, max_tape_cells=None):
+        """Run the machine until it is stopped, an exception
+        is raised or a budget is exhausted. Budgets are the same as
+        in TuringMachine.run, max_steps counts steps of the machine.
+        Tape, index, condition, step counter and log are written back into tm.
+        When the machine loops forever inside of a block, InfiniteLoopError
+        is raised, unless max_steps or max_seconds is given, then the rest
+        of the budget is run by the compiled engine.
+
+        Returns:
+            MacroRunResult with amount of steps and macro steps made
+        """
+        tm = self.tm
+        if tm.stopped:
+            return MacroRunResult(machine.RunStatus.halted, 0, 0)
+
+        k = self.block_size
+        rules = self.rules
+        blank = (0,) * k
+        cond = rules.intern_condition(tm.condition)
+        origin = tm.index
+        left, right = self.layout()
+
+        facing = RIGHT
+        offset = 0
+        lo = hi = 0
+        head = None
+        steps = 0
+        macro_steps = 0
+        status = machine.RunStatus.halted
+        halted = False
+        error = None
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        check = tm.CHECK_EVERY
+        missing = False
+        budget_steps = None
+        log = tm._log if tm._log.enabled else None
+
+        while True:
+            check -= 1
+            if not check:
+                check = tm.CHECK_EVERY
+                if deadline is not None and time.monotonic() >= deadline:
+                    status = machine.RunStatus.max_seconds
+                    break
+                if max_tape_cells is not None and \
+                        k * sum(count for _, count in left + right) > max_tape_cells:
+                    status = machine.RunStatus.max_tape_cells
+                    break
+
+            if facing == RIGHT:
+                src, dst, j, entry = right, left, offset, LEFT
+            else:
+                src, dst, j, entry = left, right, offset - 1, RIGHT
+
+            block = src[-1][0] if src else blank
+            try:
+                new_block, next_cond, end, block_steps, pos, block_lo, block_hi, ids = \
+                    self.transition(block, cond, entry)
+            except InfiniteLoopError as e:
+                error = e
+                break
+
+            if max_steps is not None and steps + block_steps > max_steps:
+                budget_steps = max_steps - steps
+                break
+            if src:
+                _pop(src)
+
+            lo = min(lo, j * k + block_lo)
+            hi = max(hi, j * k + block_hi)
+            steps += block_steps
+            macro_steps += 1
+            if log is not None:
+                log.extend(ids)
+
+            if end == HALTED or end == MISSING:
+                _push(src, new_block, 1)
+                head = j * k + pos
+                halted = end == HALTED
+                missing = end == MISSING
+                if missing and steps == max_steps:
+                    # budget is exhausted before the missing rule is looked up, as in step mode
+                    missing = False
+                    status = machine.RunStatus.max_steps
+                cond = next_cond
+                break
+
+            if end == facing:
+                count = 1
+                if next_cond == cond and (src[-1][0] == block if src else block == blank):
+                    # blank end of the tape is swept by CHECK_EVERY blocks at once
+                    count += src[-1][1] if src else tm.CHECK_EVERY
+                    if max_steps is not None:
+                        count = min(count, (max_steps - steps) // block_steps + 1)
+                    if src:
+                        _pop(src, count - 1)
+
+                    last_j = j + (count - 1 if facing == RIGHT else 1 - count)
+                    lo = min(lo, last_j * k + block_lo)
+                    hi = max(hi, last_j * k + block_hi)
+                    steps += block_steps * (count - 1)
+                    if log is not None:
+                        log.extend(itertools.chain.from_iterable(
+                            itertools.repeat(ids, count - 1)
+                            ))
+
+                _push(dst, new_block, count)
+                offset += count if facing == RIGHT else -count
+            else:
+                _push(src, new_block, 1)
+                facing = end
+
+            cond = next_cond
+
+        if head is None:
+            head = offset * k if facing == RIGHT else offset * k - 1
+
+        self._store(origin, offset, left, right, lo, hi)
+        tm.index = origin + head
+        tm.condition = rules.conditions[cond]
+        tm.stopped = halted
+        tm.steps += steps
+        self.macro_steps += macro_steps
+
+        if missing:
+            raise machine.RuleNotFoundError(tm.current, tm.condition, tm)
+
+        if error is not None:
+            if max_steps is None and max_seconds is None:
+                raise error
+            # the loop is never left, so it is run until the budget is exhausted
+            result = tm.run(
+                max_steps=None if max_steps is None else max_steps - steps,
+                max_seconds=None if deadline is None else max(deadline - time.monotonic(), 0),
+                mode='compiled'
+                )
+            steps += result.steps
+            status = result.status
+
+        if budget_steps is not None:
+            steps += engine.execute(tm, budget_steps)
+            if not tm.stopped:
+                status = machine.RunStatus.max_steps
+
+        return MacroRunResult(status, steps, macro_steps)
+
+    def _store(self, origin, offset, left, right, lo, hi):
+        """Write stacks of blocks back into the tape of tm"""
+        tape = self.tm.tape
+        typecode = tape.typecode
+
+        cells = array(typecode)
+        for block, count in left:
+            cells.extend(array(typecode, block) * count)
+        gap = len(cells)
+        for block, count in reversed(right):
+            cells.extend(array(typecode, block) * count)
+
+        first = min(tape._start - tape._zero, origin + lo)
+        last = max(tape._end - tape._zero - 1, origin + hi)
+
+        begin = origin + offset * self.block_size - gap
+        tape.locate(begin)
+        tape.locate(begin + len(cells) - 1)
+        tape.locate(first)
+        tape.locate(last)
+
+        start = tape._zero + begin
+        tape._buf[start:start + len(cells)] = cells
+        tape._start, tape._end = tape._zero + first, tape._zero + last + 1
+
+
+def run(tm, block_size, max_steps=None, max_seconds=None, max_tape_cells=None):
+    """Run tm as a macro machine with blocks of block_size cells"""
+    return BlockMachine(tm, block_size).run(
+        max_steps=max_steps, max_seconds=max_seconds,
+        max_tape_cells=max_tape_cells
+        )
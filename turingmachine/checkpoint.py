@@ -0,0 +1,185 @@
+"""
+Module providing binary checkpoints of TuringMachine
+
+Checkpoint keeps everything needed to continue a run: interned
+symbol table, conditions, rules as codes, used cells of the tape as
+a raw buffer, head index, center, current condition, step counter and
+log size. Tape buffer is written and read in bulk, so checkpoints of
+large tapes cost about the same as copying their memory. Log itself
+is not saved.
+
+Layout(all numbers are little-endian):
+    header: magic b'TMCP', version, tape kind(0 for Tape, 1 for RunTape),
+    stopped flag, index, center, steps, log size(-1 for None)
+    symbols, conditions: amount and utf-8 strings prefixed by length
+    current condition: its code
+    rules: amount and (val, condition, next_val, next_condition, move) codes
+    tape: typecode and amount of used cells followed by the cells for Tape,
+    amount of runs followed by codes and counts of the runs for RunTape
+
+Usage:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'tm.ckpt')
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> tm.run(max_steps=2)
+    RunResult(status=<RunStatus.max_steps: 2>, steps=2)
+    >>> tm.save_checkpoint(path)
+    >>> tm = machine.TuringMachine.load_checkpoint(path)
+    >>> tm.index, tm.steps, tm.tape
+    (2, 2, Tape(['0', '0', '1']))
+    >>> tm.run()
+    RunResult(status=<RunStatus.halted: 1>, steps=2)
+"""
+
+import struct
+import sys
+from array import array
+
+from turingmachine import machine
+from turingmachine.tape import Tape, RunTape
+
+MAGIC = b'TMCP'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBBBqqQq')
+COUNT = struct.Struct('<Q')
+TYPECODE = struct.Struct('<c')
+
+TAPES = (Tape, RunTape)
+MOVES = ('R', 'L', 'S', 'STOP')
+
+
+class CheckpointError(machine.TuringMachineError):
+    """Raise when checkpoint file could not be read"""
+
+    def __init__(self, path, reason):
+        super().__init__(f"Wrong checkpoint file '{path}': {reason}")
+
+
+def _write_array(file, cells):
+    """Write array or memoryview of an array in little-endian
+    byte order without copying"""
+    if sys.byteorder == 'big' and cells.itemsize > 1:
+        typecode = cells.format if isinstance(cells, memoryview) else cells.typecode
+        cells = array(typecode, cells)
+        cells.byteswap()
+    file.write(memoryview(cells).cast('B'))
+
+
+def _read_array(file, typecode, amount):
+    """Read amount items of array written by _write_array"""
+    cells = array(typecode)
+    cells.fromfile(file, amount)
+    if sys.byteorder == 'big' and cells.itemsize > 1:
+        cells.byteswap()
+    return cells
+
+
+def _write_strings(file, strings):
+    file.write(COUNT.pack(len(strings)))
+    for string in strings:
+        data = string.encode()
+        file.write(COUNT.pack(len(data)))
+        file.write(data)
+
+
+def _read_count(file):
+    return COUNT.unpack(file.read(COUNT.size))[0]
+
+
+def _read_strings(file):
+    return [file.read(_read_count(file)).decode() for _ in range(_read_count(file))]
+
+
+def save(tm, path):
+    """Save tm into the checkpoint file at path"""
+    if type(tm.tape) not in TAPES:
+        raise machine.TuringMachineError(f'checkpoints of {type(tm.tape).__name__} are not supported')
+
+    tape = tm.tape
+    table = tm.rule_table()
+    conditions = list(dict.fromkeys(
+        [tm.condition] + [cond for _, cond, _, next_cond, _ in table for cond in (cond, next_cond)]
+        ))
+    condition_codes = {cond: code for code, cond in enumerate(conditions)}
+    rules = array('Q')
+    for val, cond, next_val, next_cond, move in table:
+        rules.extend((
+            tape.intern(val), condition_codes[cond], tape.intern(next_val),
+            condition_codes[next_cond], MOVES.index(move)
+            ))
+
+    log_size = -1 if tm._log.size is None else tm._log.size
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, TAPES.index(type(tape)), tm.stopped,
+            tm.index, tape.center, tm.steps, log_size
+            ))
+        _write_strings(file, tape.symbols)
+        _write_strings(file, conditions)
+        file.write(COUNT.pack(condition_codes[tm.condition]))
+        file.write(COUNT.pack(len(rules) // 5))
+        _write_array(file, rules)
+
+        if isinstance(tape, Tape):
+            file.write(TYPECODE.pack(tape.typecode.encode()))
+            file.write(COUNT.pack(len(tape)))
+            with memoryview(tape._buf) as view:
+                _write_array(file, view[tape._start:tape._end])
+        else:
+            file.write(COUNT.pack(len(tape._runs)))
+            _write_array(file, array('Q', (code for code, _ in tape._runs)))
+            _write_array(file, array('Q', (count for _, count in tape._runs)))
+
+
+def load(path, cls=machine.TuringMachine, log_func=None):
+    """Load machine of cls from the checkpoint file at path
+    Returns:
+        new object of cls"""
+    with open(path, 'rb') as file:
+        try:
+            magic, version, tape_kind, stopped, index, center, steps, log_size = \
+                HEADER.unpack(file.read(HEADER.size))
+        except struct.error:
+            raise CheckpointError(path, 'file is too short')
+        if magic != MAGIC:
+            raise CheckpointError(path, 'not a checkpoint')
+        if version != VERSION:
+            raise CheckpointError(path, f'unsupported version {version}')
+
+        try:
+            symbols = _read_strings(file)
+            conditions = _read_strings(file)
+            condition = conditions[_read_count(file)]
+            rules = _read_array(file, 'Q', 5 * _read_count(file))
+
+            tape_cls = TAPES[tape_kind]
+            tm = cls(
+                [], condition, index=index, default=symbols[0], log_func=log_func,
+                log_size=None if log_size == -1 else log_size, tape_cls=tape_cls
+                )
+            tape = tm.tape
+            for symbol in symbols:
+                tape.intern(symbol)
+            for i in range(0, len(rules), 5):
+                val, cond, next_val, next_cond, move = rules[i:i + 5]
+                tm.set_rule(
+                    symbols[val], conditions[cond], symbols[next_val],
+                    conditions[next_cond], MOVES[move]
+                    )
+
+            if tape_cls is Tape:
+                typecode = TYPECODE.unpack(file.read(TYPECODE.size))[0].decode()
+                cells = _read_array(file, typecode, _read_count(file))
+                tape.restore((cells, -center))
+            else:
+                amount = _read_count(file)
+                codes = _read_array(file, 'Q', amount)
+                counts = _read_array(file, 'Q', amount)
+                tape.restore((tuple(zip(codes, counts)), -center))
+        except (struct.error, EOFError, IndexError, UnicodeDecodeError) as e:
+            raise CheckpointError(path, f'file is damaged({e})')
+
+    tm.steps = steps
+    tm.stopped = bool(stopped)
+    return tm
@@ -0,0 +1,219 @@
+"""
+Module providing compilation of TuringMachine rules to Python source
+
+Compiled rules(see engine module) are turned into the source of a
+Python function with a branch block for every condition, which
+dispatches on the symbol under the head with integer literals and
+holds the tape buffer, the head and the used range in local variables.
+Generated function is kept with the compiled rules of the machine,
+functions are also cached by a hash of the rule table, so machines
+with the same rules share them, the cache keeps CACHE_SIZE functions
+used last. Source is kept for inspection and registered in linecache
+for tracebacks while the function is cached.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str('1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> generated = compile_to_python(tm)
+    >>> print(generated.source)  # doctest: +ELLIPSIS
+    def run(tape, pos, cond, limit, log):
+    ...
+            if cond == 0:  # q1
+                if sym == 1:  # 1 q1 -> 0 q1 R
+                    buf[pos] = 2
+                    pos += 1
+                elif sym == 0:  #  q1 -> 1 q1 STOP
+                    buf[pos] = 1
+                    return pos, lo, hi, 0, made + 1, HALTED
+                else:
+                    return pos, lo, hi, 0, made, MISSING
+    ...
+    >>> tm.run(mode='python')
+    RunResult(status=<RunStatus.halted: 1>, steps=3)
+    >>> tm.tape
+    Tape(['0', '0', '1'])
+"""
+
+import hashlib
+import linecache
+import sys
+from collections import OrderedDict, namedtuple
+
+from turingmachine import engine
+from turingmachine import machine
+
+# statuses returned by generated functions
+RUNNING = 0
+HALTED = 1
+MISSING = 2
+
+MOVE_CHARS = {1: 'R', -1: 'L', 0: 'S', engine.STOP: 'STOP'}
+
+# amount of generated functions kept by hash of the rule table
+CACHE_SIZE = 128
+
+# generated functions by hash of the rule table, least recently used first
+_cache = OrderedDict()
+
+
+class Generated(namedtuple('Generated', ['source', 'function', 'key'])):
+    """Rules compiled to a Python function
+
+    Attributes:
+        source: source of the function
+        function: run(tape, pos, cond, limit, log) making up to limit
+        steps from position pos of tape buffer in condition code cond
+        and returning (pos, lo, hi, cond, made, status)
+        key: hash of the rule table, source is cached by
+    """
+    __slots__ = ()
+
+
+def _comment(*parts):
+    """Join parts into a single line comment"""
+    return ' '.join(parts).replace('\r', ' ').replace('\n', ' ')
+
+
+def _generate(rules, logged):
+    """Get source of the function running compiled rules"""
+    by_condition = {}
+    for cond, val, next_val, next_cond, shift, rule_id in rules._coded:
+        by_condition.setdefault(cond, []).append((val, next_val, next_cond, shift, rule_id))
+
+    lines = [
+        'def run(tape, pos, cond, limit, log):',
+        '    buf = tape._buf',
+        '    lo = tape._start',
+        '    hi = tape._end - 1',
+        '    made = 0',
+        ]
+    if logged:
+        lines.append('    record = log.append')
+    lines += [
+        '    while made < limit:',
+        '        sym = buf[pos]',
+        ]
+
+    keyword = 'if'
+    for cond in sorted(by_condition):
+        lines.append(f'        {keyword} cond == {cond}:  # {_comment(rules.conditions[cond])}')
+        keyword = 'elif'
+
+        symbol_keyword = 'if'
+        for val, next_val, next_cond, shift, rule_id in by_condition[cond]:
+            comment = _comment(
+                rules.symbols[val], rules.conditions[cond], '->', rules.symbols[next_val],
+                rules.conditions[next_cond], MOVE_CHARS[shift]
+                )
+            lines.append(f'            {symbol_keyword} sym == {val}:  # {comment}')
+            symbol_keyword = 'elif'
+            if logged:
+                lines.append(f'                record({rule_id})')
+            if next_val != val:
+                lines.append(f'                buf[pos] = {next_val}')
+            if shift == engine.STOP:
+                lines.append(f'                return pos, lo, hi, {next_cond}, made + 1, HALTED')
+                continue
+            if next_cond != cond:
+                lines.append(f'                cond = {next_cond}')
+            if shift:
+                lines.append(f'                pos {"+" if shift > 0 else "-"}= 1')
+            else:
+                lines.append('                pass')
+
+        lines.append('            else:')
+        lines.append(f'                return pos, lo, hi, {cond}, made, MISSING')
+
+    if by_condition:
+        lines.append('        else:')
+        lines.append('            return pos, lo, hi, cond, made, MISSING')
+    else:
+        lines.append('        return pos, lo, hi, cond, made, MISSING')
+
+    lines.extend([
+        '        made += 1',
+        '        if pos < lo or pos > hi:',
+        '            if pos < 0 or pos >= len(buf):',
+        '                added = tape._grow(pos)',
+        '                buf = tape._buf',
+        '                pos += added',
+        '                lo += added',
+        '                hi += added',
+        '            if pos < lo:',
+        '                lo = pos',
+        '            if pos > hi:',
+        '                hi = pos',
+        '    return pos, lo, hi, cond, made, RUNNING',
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def _filename(key):
+    return f'<turingmachine {key[:12]}>'
+
+
+def compile_to_python(tm, logged=False):
+    """Compile rules of tm to a Python function, generated function
+    is kept with compiled rules of tm and cached by a hash of the rule table
+    Arguments:
+        logged: append rule id of every step to log
+    Returns:
+        Generated rules"""
+    rules = engine.compile_rules(tm)
+    attached = (logged, len(rules.conditions))
+    generated = rules.generated.get(attached)
+    if generated is not None:
+        return generated
+
+    table = (
+        tuple(rules._coded), tuple(rules.conditions),
+        tuple(rules.symbols[code] for code in sorted({rule[i] for rule in rules._coded for i in (1, 2)})),
+        logged,
+        )
+    key = hashlib.sha1(repr(table).encode()).hexdigest()
+
+    generated = _cache.get(key)
+    if generated is None:
+        source = _generate(rules, logged)
+        filename = _filename(key)
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        namespace = {'HALTED': HALTED, 'MISSING': MISSING, 'RUNNING': RUNNING}
+        exec(compile(source, filename, 'exec'), namespace)
+        generated = _cache[key] = Generated(source, namespace['run'], key)
+        while len(_cache) > CACHE_SIZE:
+            old_key, _ = _cache.popitem(last=False)
+            linecache.cache.pop(_filename(old_key), None)
+    else:
+        _cache.move_to_end(key)
+    rules.generated[attached] = generated
+    return generated
+
+
+def execute(tm, steps=None):
+    """Run tm with rules compiled to a Python function until it is
+    stopped, an exception is raised or amount of steps is made.
+    Tape, index, condition, step counter and log are written back into tm
+    Returns:
+        amount of steps made"""
+    if tm.stopped:
+        return 0
+
+    engine.check_tape(tm)
+    rules = engine.compile_rules(tm)
+    cond = rules.intern_condition(tm.condition)
+    generated = compile_to_python(tm, logged=tm._log.enabled)
+
+    tape = tm.tape
+    pos = tape.locate(tm.index)
+    limit = sys.maxsize if steps is None else steps
+    pos, lo, hi, cond, made, status = generated.function(tape, pos, cond, limit, tm._log)
+
+    tape._start, tape._end = lo, hi + 1
+    tm.index = pos - tape._zero
+    tm.condition = rules.conditions[cond]
+    tm.stopped = status == HALTED
+    tm.steps += made
+
+    if status == MISSING:
+        raise machine.RuleNotFoundError(tm.current, tm.condition, tm)
+
+    return made
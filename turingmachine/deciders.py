@@ -0,0 +1,415 @@
+"""
+Module providing deciders proving that TuringMachine never halts
+
+Deciders simulate compiled rules of a copy of the machine and watch
+its configurations, so looping machines can be dropped long before
+a step budget is exhausted:
+    cycler: the same configuration of the machine repeats
+    translated_cycler: the same condition and tape around the head
+    repeat at a shifted record-breaking head position
+    bouncer: the tape laid out into runs of equal blocks repeats with
+    growing run counts, which is proven by replaying the macro steps
+    between the repeats with symbolic counts(see blocks module)
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str('0::0:a:0 a -> 1 b R,0 b -> 0 a L,1 a -> 1 b R')
+    >>> decide(tm)
+    Decision(verdict=<Verdict.non_halting: 3>, decider='cycler', steps=3)
+    >>> decide(machine.TuringMachine.from_str('0::0:a:0 a -> 1 a R'))
+    Decision(verdict=<Verdict.non_halting: 3>, decider='translated_cycler', steps=2)
+"""
+
+import copy
+import enum
+from collections import namedtuple
+
+from turingmachine import blocks
+from turingmachine import engine
+from turingmachine import machine
+from turingmachine.tape import Tape
+
+# default step budget of deciders
+MAX_STEPS = 100000
+
+# first step budget of decide
+FIRST_STEPS = 1000
+
+# amount of last records of every direction compared by translated cycler
+RECORD_WINDOW = 64
+
+# block sizes tried by bouncer
+BLOCK_SIZES = (1, 2, 3, 4)
+
+
+class Verdict(enum.Enum):
+    """
+    Outcome of a decider
+
+    Attributes:
+        halted: machine is stopped by STOP move within the budget
+        rule_not_found: machine has no rule to move within the budget
+        non_halting: decider proved that the machine never halts
+        undecided: budget is exhausted without a proof
+    """
+    halted = enum.auto()
+    rule_not_found = enum.auto()
+    non_halting = enum.auto()
+    undecided = enum.auto()
+
+
+class Decision(namedtuple('Decision', ['verdict', 'decider', 'steps'])):
+    """Result of a decider
+
+    Attributes:
+        verdict: Verdict of the decider
+        decider: name of the decider, which proved that machine never halts
+        steps: step of the machine at which it has halted or the proof is done
+    """
+    __slots__ = ()
+
+    @property
+    def non_halting(self):
+        return self.verdict is Verdict.non_halting
+
+
+def _prepare(tm):
+    """Get copy of tm with array Tape of the same codes and no log"""
+    tm = copy.deepcopy(tm)
+    if type(tm.tape) is not Tape:
+        tape = Tape(default=tm.default)
+        for symbol in tm.tape.symbols:
+            tape.intern(symbol)
+        for index, val in enumerate(tm.tape, -tm.tape.center):
+            tape.write(index, val)
+        tm.tape = tape
+    tm._compiled = None
+    tm._log = machine.ExecutionLog(0)
+    return tm
+
+
+def _extent(tape):
+    """Get index of the leftmost used cell and codes of used cells"""
+    return tape._start - tape._zero, tape._buf[tape._start:tape._end]
+
+
+def _segment(extent, first, last):
+    """Get codes of cells [first, last] of extent of the tape"""
+    lo, cells = extent
+    inner = cells[max(first - lo, 0):max(last - lo + 1, 0)]
+    before = max(min(lo, last + 1) - first, 0)
+    after = last - first + 1 - before - len(inner)
+    return [0] * before + inner.tolist() + [0] * after
+
+
+class Cycler:
+    """Detects repeats of the whole configuration of the machine
+    with Brent's algorithm: every configuration is compared with the
+    one saved at the last power of two steps"""
+
+    name = 'cycler'
+
+    def start(self, cond, index, tape):
+        self.power = self.length = 1
+        self.saved = (cond, index, _extent(tape))
+
+    def observe(self, step, cond, index, tape):
+        saved = self.saved
+        if cond == saved[0] and index == saved[1] and _extent(tape) == saved[2]:
+            return True
+
+        if self.power == self.length:
+            self.saved = (cond, index, _extent(tape))
+            self.power *= 2
+            self.length = 0
+        self.length += 1
+        return False
+
+
+class TranslatedCycler:
+    """Detects machines repeating themselves at a shifting position
+
+    Record is a step, which takes the head to a cell never visited
+    and outside of the start tape, so all cells further are blank.
+    When two records in the same direction have the same condition and
+    the same cells between the head and the farthest cell visited back
+    since the earlier one, the machine repeats the steps between them
+    forever.
+    """
+
+    name = 'translated_cycler'
+
+    def start(self, cond, index, tape):
+        first = tape._start - tape._zero
+        self.bounds = {1: max(index, tape._end - tape._zero - 1), -1: min(index, first)}
+        # [condition, index, extent of the tape, farthest cell visited back until the next record]
+        self.records = {1: [], -1: []}
+
+    def observe(self, step, cond, index, tape):
+        for direction, records in self.records.items():
+            if records:
+                back = records[-1][3]
+                records[-1][3] = min(back, index) if direction > 0 else max(back, index)
+
+        direction = 1 if index > self.bounds[1] else -1 if index < self.bounds[-1] else 0
+        if not direction:
+            return False
+        self.bounds[direction] = index
+
+        extent = _extent(tape)
+        records = self.records[direction]
+        back = index
+        for record in reversed(records):
+            back = min(back, record[3]) if direction > 0 else max(back, record[3])
+            if record[0] != cond:
+                continue
+            span = abs(record[1] - back)
+            if direction > 0:
+                same = _segment(record[2], record[1] - span, record[1]) == \
+                    _segment(extent, index - span, index)
+            else:
+                same = _segment(record[2], record[1], record[1] + span) == \
+                    _segment(extent, index, index + span)
+            if same:
+                return True
+
+        records.append([cond, index, extent, index])
+        del records[:-RECORD_WINDOW]
+        return False
+
+
+def _run_steps(tm, max_steps, observers):
+    """Simulate compiled rules of tm step by step, passing every
+    configuration to observers until one of them proves that it never halts
+    Returns:
+        Decision"""
+    if tm.stopped:
+        return Decision(Verdict.halted, None, 0)
+
+    tm = _prepare(tm)
+    rules = engine.compile_rules(tm)
+    cond = rules.intern_condition(tm.condition)
+    width = rules.width
+    next_symbol = rules.next_symbol
+    next_condition = rules.next_condition
+    shift = rules.shift
+    tape = tm.tape
+    index = tm.index
+    tape.locate(index)
+
+    for observer in observers:
+        observer.start(cond, index, tape)
+
+    for step in range(1, max_steps + 1):
+        t = cond * width + tape.read_code(index)
+        next_cond = next_condition[t]
+        if next_cond == engine.NO_RULE:
+            return Decision(Verdict.rule_not_found, None, step - 1)
+
+        tape.write_code(index, next_symbol[t])
+        cond = next_cond
+        move = shift[t]
+        if move == engine.STOP:
+            return Decision(Verdict.halted, None, step)
+
+        index += move
+        tape.locate(index)
+        for observer in observers:
+            if observer.observe(step, cond, index, tape):
+                return Decision(Verdict.non_halting, observer.name, step)
+
+    return Decision(Verdict.undecided, None, max_steps)
+
+
+def cycler(tm, max_steps=MAX_STEPS):
+    """Prove that tm never halts, as its configuration repeats
+    Returns:
+        Decision"""
+    return _run_steps(tm, max_steps, [Cycler()])
+
+
+def translated_cycler(tm, max_steps=MAX_STEPS):
+    """Prove that tm never halts, as it repeats at a shifting position
+    Returns:
+        Decision"""
+    return _run_steps(tm, max_steps, [TranslatedCycler()])
+
+
+def _add(count1, count2):
+    """Add symbolic counts of (constant, variables) form"""
+    return count1[0] + count2[0], count1[1] | count2[1]
+
+
+def _push(stack, block, count):
+    """Push symbolic count blocks on the stack of runs"""
+    if stack and stack[-1][0] == block:
+        stack[-1][1] = _add(stack[-1][1], count)
+    else:
+        stack.append([block, count])
+
+
+def _macro_step(macro, config):
+    """Make a macro step of the block machine on config
+    [condition, facing, left, right] of stacks of [block, count] runs
+    with symbolic counts
+    Returns:
+        amount of steps made, None if the step depends on the value of
+        a variable count or the machine halts, -1 if the machine sweeps
+        the blank end of the tape forever
+    """
+    cond, facing, left, right = config
+    if facing == blocks.RIGHT:
+        src, dst, entry = right, left, blocks.LEFT
+    else:
+        src, dst, entry = left, right, blocks.RIGHT
+
+    blank = (0,) * macro.block_size
+    block = src[-1][0] if src else blank
+    new_block, next_cond, end, steps, *_ = macro.transition(block, cond, entry)
+    if end == blocks.HALTED or end == blocks.MISSING:
+        return None
+
+    if src:
+        constant, variables = src[-1][1]
+        if constant == 1 and variables:
+            return None
+        if constant == 1:
+            src.pop()
+        else:
+            src[-1][1] = (constant - 1, variables)
+
+    if end == facing:
+        count = (1, frozenset())
+        if next_cond == cond:
+            if not src and block == blank:
+                return -1
+            if src and src[-1][0] == block:
+                count = _add(count, src.pop()[1])
+        steps *= count[0]
+        _push(dst, new_block, count)
+    else:
+        _push(src, new_block, (1, frozenset()))
+        config[1] = end
+
+    config[0] = next_cond
+    return steps
+
+
+def _shape(config):
+    """Get config without counts of runs"""
+    cond, facing, left, right = config
+    return cond, facing, tuple(run[0] for run in left), tuple(run[0] for run in right)
+
+
+def _counts(config):
+    return [run[1][0] for run in config[2] + config[3]]
+
+
+def _replay(macro, shape, counts, macro_steps):
+    """Check that config of shape and counts turns into itself with
+    every count not smaller after macro_steps for every addition
+    to the counts, so it is repeated forever"""
+    cond, facing, left, right = shape
+    config = [cond, facing, [], []]
+    variable = 0
+    for stack, stack_blocks in ((config[2], left), (config[3], right)):
+        for block in stack_blocks:
+            stack.append([block, (counts[variable], frozenset([variable]))])
+            variable += 1
+
+    for _ in range(macro_steps):
+        if _macro_step(macro, config) in (None, -1):
+            return False
+
+    return _shape(config) == shape and \
+        all(new >= old for new, old in zip(_counts(config), counts))
+
+
+def _bouncer(tm, block_size, max_steps):
+    """Run bouncer decider with blocks of block_size
+    Returns:
+        Decision"""
+    macro = blocks.BlockMachine(tm, block_size)
+    cond = macro.rules.intern_condition(tm.condition)
+    left, right = macro.layout()
+    config = [
+        cond, blocks.RIGHT,
+        [[block, (count, frozenset())] for block, count in left],
+        [[block, (count, frozenset())] for block, count in right],
+        ]
+
+    seen = {}
+    steps = 0
+    macro_steps = 0
+    while steps <= max_steps:
+        shape = _shape(config)
+        counts = _counts(config)
+        previous = seen.get(shape)
+        if previous is not None:
+            last_macro_steps, last_counts = previous
+            if all(new >= old for new, old in zip(counts, last_counts)) and \
+                    _replay(macro, shape, last_counts, macro_steps - last_macro_steps):
+                return Decision(Verdict.non_halting, 'bouncer', steps)
+        seen[shape] = (macro_steps, counts)
+
+        try:
+            made = _macro_step(macro, config)
+        except blocks.InfiniteLoopError:
+            return Decision(Verdict.non_halting, 'bouncer', steps)
+        if made == -1:
+            return Decision(Verdict.non_halting, 'bouncer', steps)
+        if made is None:
+            break
+        steps += made
+        macro_steps += 1
+
+    return Decision(Verdict.undecided, None, min(steps, max_steps))
+
+
+def bouncer(tm, max_steps=MAX_STEPS, block_sizes=BLOCK_SIZES):
+    """Prove that tm never halts, as it bounces between ends of the tape
+    growing runs of the same blocks. Halting is not detected by this
+    decider, as it stops at the first macro step the machine halts in
+    Returns:
+        Decision"""
+    if tm.stopped:
+        return Decision(Verdict.halted, None, 0)
+
+    tm = _prepare(tm)
+    for block_size in block_sizes:
+        decision = _bouncer(tm, block_size, max_steps)
+        if decision.non_halting:
+            return decision
+    return Decision(Verdict.undecided, None, max_steps)
+
+
+DECIDERS = ('cycler', 'translated_cycler', 'bouncer')
+
+
+def decide(tm, max_steps=MAX_STEPS, deciders=DECIDERS):
+    """Run deciders on tm until one of them proves it never halts.
+    Cyclers watch the same step by step simulation, which
+    detects halting, bouncer is run after them. Deciders are run
+    with budgets growing tenfold from FIRST_STEPS up to max_steps,
+    so simple loops are found without simulating the whole budget
+    Arguments:
+        max_steps: step budget of every simulation
+        deciders: names of deciders to run
+    Returns:
+        Decision"""
+    observers = []
+    if 'cycler' in deciders:
+        observers.append(Cycler())
+    if 'translated_cycler' in deciders:
+        observers.append(TranslatedCycler())
+    unknown = set(deciders) - set(DECIDERS)
+    if unknown:
+        raise ValueError(f'unknown deciders: {sorted(unknown)}')
+
+    budget = min(FIRST_STEPS, max_steps)
+    while True:
+        decision = _run_steps(tm, budget, observers)
+        if decision.verdict is Verdict.undecided and 'bouncer' in deciders:
+            decision = bouncer(tm, budget)
+        if decision.verdict is not Verdict.undecided or budget == max_steps:
+            return decision
+        budget = min(budget * 10, max_steps)
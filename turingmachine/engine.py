@@ -0,0 +1,326 @@
+"""
+Module providing compiled integer engine for TuringMachine
+
+Symbols and conditions are interned to small integers and rules
+are stored in flat arrays indexed by condition * width + symbol,
+so the main loop runs without per-step method dispatch.
+
+Runs of cells, which rules of the form 'v q -> f(v) q R' loop over
+in one direction, are swept in one bulk operation over the tape
+buffer: the end of the run is found and the rewrite map is applied
+by bytes.translate. This works for tapes with up to 256 symbols.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> tm.run(mode='compiled')
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> tm.tape
+    Tape(['0', '0', '0', '1'])
+    >>> tm.index, tm.condition
+    (3, 'q1')
+"""
+
+import sys
+from array import array
+
+from turingmachine import machine
+from turingmachine.tape import Tape, MmapTape
+
+STOP = 2
+NO_RULE = -1
+
+# amount of cells scanned at first when looking for the end of a run
+SWEEP_WINDOW = 32
+
+# head shift of every move character
+MOVES = {
+    'R': 1,
+    'L': -1,
+    'S': 0,
+    'STOP': STOP,
+    }
+
+
+class CompiledRules:
+    """Rule table of a TuringMachine interned to small integers
+
+    Symbols are interned on the tape of the machine, so
+    tables are indexed by codes stored on the tape itself.
+
+    Attributes:
+        symbols: interned symbols of the tape
+        symbol_codes: symbol to code mapping of the tape
+        conditions: interned conditions, code of the condition is its index
+        condition_codes: condition to code mapping
+        width: row width of the tables, equal to the amount of symbols
+        next_symbol: next symbol code for every (condition, symbol) cell
+        next_condition: next condition code, NO_RULE if there is no rule
+        shift: head shift -1, 0, 1 or STOP
+        rule_id: rule id of the machine for every (condition, symbol) cell
+        sweep_at: 1 for cells of rules looping on their condition to the left or right
+        sweeps: (stop, rewrite, ids) translation tables of every (condition, shift)
+        with looping rules, stop marks symbols ending the run with 1, ids
+        translates symbols to rule ids of the loop, None if they do not fit a byte
+        block_cache: transitions of blocks of every block size(see blocks module)
+        generated: functions the rules are compiled to of every (logged, amount of conditions)(see codegen module)
+    """
+
+    def __init__(self, tm):
+        self.symbols = tm.tape.symbols
+        self.symbol_codes = tm.tape.codes
+        self._intern = tm.tape.intern
+        self.conditions = []
+        self.condition_codes = {}
+        self.width = None
+        self.block_cache = {}
+        self.generated = {}
+        self._coded = []
+
+        for key, (next_val, next_cond, move) in tm._rules.items():
+            if move not in MOVES:
+                raise machine.TuringMachineError(
+                    f"compiled engine supports only R, L, S and STOP moves, not {move!r}"
+                    )
+            val, cond = key
+            self._coded.append((
+                self.intern_condition(cond), self.intern_symbol(val),
+                self.intern_symbol(next_val), self.intern_condition(next_cond),
+                MOVES[move], tm._rule_ids[key]
+                ))
+
+        self._build()
+
+    def _build(self):
+        """(Re)build flat tables from coded rules"""
+        self.width = len(self.symbols)
+        size = self.width * len(self.conditions)
+
+        self.next_symbol = array('i', bytes(4 * size))
+        self.next_condition = array('i', [NO_RULE]) * size
+        self.shift = array('b', bytes(size))
+        self.rule_id = array('i', bytes(4 * size))
+
+        self.sweep_at = array('b', bytes(size))
+        self.sweeps = {}
+
+        loops = {}
+        for cond, val, next_val, next_cond, shift, rule_id in self._coded:
+            t = cond * self.width + val
+            self.next_symbol[t] = next_val
+            self.next_condition[t] = next_cond
+            self.shift[t] = shift
+            self.rule_id[t] = rule_id
+
+            if next_cond == cond and shift in (1, -1) and self.width <= 256:
+                self.sweep_at[t] = 1
+                loops.setdefault((cond, shift), {})[val] = next_val, rule_id
+
+        for key, loop in loops.items():
+            ids = None
+            if all(rule_id < 256 for _, rule_id in loop.values()):
+                ids = bytes(loop[val][1] if val in loop else 0 for val in range(256))
+            self.sweeps[key] = (
+                bytes(0 if val in loop else 1 for val in range(256)),
+                bytes(loop[val][0] if val in loop else val for val in range(256)),
+                ids
+                )
+
+    def intern_symbol(self, symbol):
+        """Get code of the symbol, adding it if it is new"""
+        code = self._intern(symbol)
+        if self.width is not None:
+            self.update()
+        return code
+
+    def update(self):
+        """Rebuild tables if symbols were added to the tape"""
+        if self.width != len(self.symbols):
+            self._build()
+
+    def intern_condition(self, condition):
+        """Get code of the condition, adding it if it is new"""
+        code = self.condition_codes.get(condition)
+        if code is None:
+            code = self.condition_codes[condition] = len(self.conditions)
+            self.conditions.append(condition)
+            if self.width is not None:
+                self._build()
+        return code
+
+
+def check_tape(tm):
+    """Check that tape of tm is an array Tape or an MmapTape,
+    which are the only ones compiled tables could be run on"""
+    if type(tm.tape) not in (Tape, MmapTape):
+        raise machine.TuringMachineError(
+            f'compiled engine runs only on Tape and MmapTape, not {type(tm.tape).__name__}'
+            )
+
+
+def compile_rules(tm):
+    """Get compiled rules of tm, compiling them if
+    rules or the tape have changed"""
+    if tm._compiled is None or tm._compiled.symbols is not tm.tape.symbols:
+        tm._compiled = CompiledRules(tm)
+    tm._compiled.update()
+    return tm._compiled
+
+
+def run_length(buf, pos, direction, stop, limit):
+    """Find length of the run of looping cells starting at pos
+    Arguments:
+        buf: tape buffer of one-byte codes
+        pos: first cell of the run
+        direction: 1 or -1
+        stop: translation table marking symbols ending the run with 1
+        limit: maximum length of the run
+    Returns:
+        length of the run, bounded by limit and ends of buf"""
+    if direction > 0:
+        bound = min(len(buf) - pos, limit)
+    else:
+        bound = min(pos + 1, limit)
+
+    length = 0
+    window = SWEEP_WINDOW
+    with memoryview(buf) as view:
+        while length < bound:
+            size = min(window, bound - length)
+            if direction > 0:
+                start = pos + length
+                found = view[start:start + size].tobytes().translate(stop).find(1)
+            else:
+                start = pos - length - size + 1
+                found = view[start:start + size].tobytes().translate(stop).rfind(1)
+                if found != -1:
+                    found = size - 1 - found
+
+            if found != -1:
+                return length + found
+            length += size
+            window *= 2
+
+    return length
+
+
+def rewrite_run(buf, start, end, rewrite):
+    """Apply rewrite translation table to cells [start, end) of buf"""
+    with memoryview(buf) as view:
+        view[start:end] = view[start:end].tobytes().translate(rewrite)
+
+
+def execute(tm, steps=None):
+    """Run tm with compiled rules until it is stopped, an exception
+    is raised or amount of steps is made. Tape, index, condition,
+    step counter and log are written back into tm
+    Returns:
+        amount of steps made"""
+    if tm.stopped:
+        return 0
+
+    check_tape(tm)
+    rules = compile_rules(tm)
+    cond = rules.intern_condition(tm.condition)
+
+    width = rules.width
+    next_symbol = rules.next_symbol
+    next_condition = rules.next_condition
+    shift = rules.shift
+    rule_id = rules.rule_id
+    sweep_at = rules.sweep_at
+    sweeps = rules.sweeps
+    log = tm._log if tm._log.enabled else None
+
+    tape = tm.tape
+    pos = tape.locate(tm.index)
+    buf = tape._buf
+    lo, hi = tape._start, tape._end - 1
+    stopped = False
+    missing = False
+
+    left = sys.maxsize if steps is None else steps
+    done = 0
+    while left > 0:
+        sweep = False
+        made = left
+        for i in range(left):
+            t = cond * width + buf[pos]
+            next_cond = next_condition[t]
+            if next_cond == NO_RULE:
+                made = i
+                missing = True
+                break
+            if sweep_at[t]:
+                made = i
+                sweep = True
+                break
+
+            if log is not None:
+                log.append(rule_id[t])
+            buf[pos] = next_symbol[t]
+            cond = next_cond
+
+            move = shift[t]
+            if move == STOP:
+                made = i + 1
+                stopped = True
+                break
+
+            pos += move
+            if pos < lo or pos > hi:
+                if pos < 0 or pos >= len(buf):
+                    added = tape._grow(pos)
+                    buf = tape._buf
+                    pos += added
+                    lo += added
+                    hi += added
+                lo = min(lo, pos)
+                hi = max(hi, pos)
+
+        done += made
+        left -= made
+        if not sweep:
+            break
+
+        move = shift[t]
+        stop, rewrite, ids = sweeps[(cond, move)]
+        length = run_length(buf, pos, move, stop, left)
+        if move > 0:
+            start, end = pos, pos + length
+        else:
+            start, end = pos - length + 1, pos + 1
+
+        if log is not None:
+            with memoryview(buf) as view:
+                run = view[start:end].tobytes()
+            if move < 0:
+                run = run[::-1]
+            if ids is not None:
+                log.extend(run.translate(ids))
+            else:
+                log.extend(map(rule_id[cond * width:(cond + 1) * width].__getitem__, run))
+        rewrite_run(buf, start, end, rewrite)
+
+        done += length
+        left -= length
+        pos += move * length
+        if pos < lo or pos > hi:
+            if pos < 0 or pos >= len(buf):
+                added = tape._grow(pos)
+                buf = tape._buf
+                pos += added
+                lo += added
+                hi += added
+            lo = min(lo, pos)
+            hi = max(hi, pos)
+
+    tape._start, tape._end = lo, hi + 1
+    tm.index = pos - tape._zero
+    tm.condition = rules.conditions[cond]
+    tm.stopped = stopped
+    tm.steps += done
+
+    if missing:
+        raise machine.RuleNotFoundError(tm.current, tm.condition, tm)
+
+    return done
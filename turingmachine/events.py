@@ -0,0 +1,216 @@
+"""
+Module providing events of TuringMachine runs
+
+Callbacks are subscribed to events with TuringMachine.subscribe and
+called as callback(tm, event). Events of a number of steps, halt and
+missing rule are fired by TuringMachine.run between batches of steps,
+so they add no per-step cost. Steps events are fired every amount of
+steps, macro mode fires them once at the end of the run. Events of
+entering a condition from another one and writing a symbol are fired
+by moves of rules, which lead to them: while they are subscribed, log of the machine is
+wrapped by EventLog, so moves are passed to it in every run mode.
+Compiled modes write configuration of the machine back only at the
+end of a run, so steps of the event should be used instead of tm.steps.
+
+Usage:
+    >>> from turingmachine import machine
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 end S,1 end -> 1 STOP', log_size=0)
+    >>> events = []
+    >>> subscription = tm.subscribe(STEPS, lambda tm, event: events.append(event), 2)
+    >>> subscription = tm.subscribe(CONDITION, lambda tm, event: events.append(event), 'end')
+    >>> subscription = tm.subscribe(HALT, lambda tm, event: events.append(event))
+    >>> tm.run(mode='compiled')
+    RunResult(status=<RunStatus.halted: 1>, steps=5)
+    >>> for event in events:
+    ...     print(event)
+    Event(name='steps', steps=2, rule=None)
+    Event(name='condition', steps=4, rule=('', 'q1', '1', 'end'))
+    Event(name='steps', steps=4, rule=None)
+    Event(name='halt', steps=5, rule=None)
+"""
+
+from collections import namedtuple
+
+STEPS = 'steps'
+CONDITION = 'condition'
+SYMBOL = 'symbol'
+HALT = 'halt'
+MISSING = 'missing'
+
+NAMES = (STEPS, CONDITION, SYMBOL, HALT, MISSING)
+
+# events fired by moves of rules
+RULE_EVENTS = (CONDITION, SYMBOL)
+
+
+class Event(namedtuple('Event', ['name', 'steps', 'rule'])):
+    """Event passed to callbacks
+
+    Attributes:
+        name: STEPS, CONDITION, SYMBOL, HALT or MISSING
+        steps: amount of steps made by the machine when the event happened
+        rule: (val, condition, next_val, next_condition) of the move for
+        events of rules, (val, condition) with no rule for MISSING, otherwise None
+    """
+    __slots__ = ()
+
+
+class Subscription(namedtuple('Subscription', ['name', 'callback', 'value'])):
+    """Callback subscribed to an event
+
+    Attributes:
+        name: name of the event
+        callback: function called as callback(tm, event)
+        value: amount of steps for STEPS, condition for CONDITION,
+        symbol for SYMBOL, otherwise None
+    """
+    __slots__ = ()
+
+
+class EventLog:
+    """Log of a TuringMachine firing events of rules, which passes
+    moves to the log it wraps(see ExecutionLog)
+
+    Attributes:
+        log: wrapped log
+        events: Events of the machine
+        steps: amount of steps made by the machine
+    """
+
+    enabled = True
+
+    def __init__(self, log, events):
+        self.log = log
+        self.events = events
+        self.steps = events.tm.steps
+
+    @property
+    def size(self):
+        return self.log.size
+
+    def append(self, rule_id):
+        self.steps += 1
+        subscriptions = self.events.of_rule(rule_id)
+        if subscriptions:
+            self.events.fire_rule(subscriptions, rule_id, self.steps)
+        if self.log.enabled:
+            self.log.append(rule_id)
+
+    def extend(self, rule_ids):
+        for rule_id in rule_ids:
+            self.append(rule_id)
+
+    def clear(self):
+        self.log.clear()
+
+    def __len__(self):
+        return len(self.log)
+
+    def __iter__(self):
+        return iter(self.log)
+
+
+class Events:
+    """Subscriptions to events of a TuringMachine
+
+    Attributes:
+        tm: the machine
+        subscriptions: list of Subscription
+        _rules: subscriptions to events of every rule id, which were looked up
+        _fired: amount of times every STEPS subscription was fired by steps
+    """
+
+    def __init__(self, tm):
+        self.tm = tm
+        self.subscriptions = []
+        self._rules = {}
+        self._fired = {}
+
+    def subscribe(self, name, callback, value=None):
+        if name not in NAMES:
+            raise ValueError(f"wrong event: '{name}', must be one of {', '.join(NAMES)}")
+        if name == STEPS:
+            if not isinstance(value, int) or value <= 0:
+                raise ValueError(f'steps event needs a positive amount of steps, not {value!r}')
+        elif name in RULE_EVENTS:
+            if value is None:
+                raise ValueError(f'{name} event needs a {name}')
+            value = str(value)
+        elif value is not None:
+            raise ValueError(f'{name} event has no value')
+
+        subscription = Subscription(name, callback, value)
+        self.subscriptions.append(subscription)
+        if name == STEPS:
+            self._fired[subscription] = self.tm.steps // value
+        self._update()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.remove(subscription)
+        self._fired.pop(subscription, None)
+        self._update()
+
+    def _update(self):
+        """Wrap log of the machine while events of rules are subscribed"""
+        self._rules = {}
+        self.every = [sub for sub in self.subscriptions if sub.name == STEPS]
+        wrapped = isinstance(self.tm._log, EventLog)
+        if any(sub.name in RULE_EVENTS for sub in self.subscriptions):
+            if not wrapped:
+                self.tm._log = EventLog(self.tm._log, self)
+        elif wrapped:
+            self.tm._log = self.tm._log.log
+
+    def _of(self, name):
+        return [sub for sub in self.subscriptions if sub.name == name]
+
+    def of_rule(self, rule_id):
+        """Get subscriptions fired by the rule with rule_id"""
+        subscriptions = self._rules.get(rule_id)
+        if subscriptions is None:
+            key = self.tm._rule_keys[rule_id]
+            next_val, next_cond, _ = self.tm._rules[key]
+            subscriptions = self._rules[rule_id] = [
+                sub for sub in self.subscriptions
+                if sub.name == CONDITION and sub.value == next_cond != key[1]
+                or sub.name == SYMBOL and sub.value == next_val
+                ]
+        return subscriptions
+
+    def fire_rule(self, subscriptions, rule_id, steps):
+        key = self.tm._rule_keys[rule_id]
+        rule = key + self.tm._rules[key][:2]
+        for sub in subscriptions:
+            sub.callback(self.tm, Event(sub.name, steps, rule))
+
+    def start(self):
+        """Prepare for a run of the machine"""
+        if isinstance(self.tm._log, EventLog):
+            self.tm._log.steps = self.tm.steps
+
+    def limit(self, amount):
+        """Limit amount of steps of the next batch for it to end
+        at the next multiple of steps of STEPS subscriptions"""
+        steps = self.tm.steps
+        for sub in self.every:
+            left = (steps // sub.value + 1) * sub.value - steps
+            if amount is None or left < amount:
+                amount = left
+        return amount
+
+    def fire_steps(self):
+        steps = self.tm.steps
+        for sub in self.every:
+            fired = steps // sub.value
+            if fired > self._fired[sub]:
+                self._fired[sub] = fired
+                sub.callback(self.tm, Event(STEPS, steps, None))
+
+    def fire_halt(self):
+        for sub in self._of(HALT):
+            sub.callback(self.tm, Event(HALT, self.tm.steps, None))
+
+    def fire_missing(self):
+        for sub in self._of(MISSING):
+            sub.callback(self.tm, Event(MISSING, self.tm.steps, (self.tm.current, self.tm.condition)))
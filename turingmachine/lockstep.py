@@ -0,0 +1,190 @@
+"""
+Module providing lockstep simulation of TuringMachine on many tapes
+
+Tapes are rows of a 2D NumPy array of symbol codes, heads and
+conditions are vectors, and compiled rules(see engine module) are
+dense (condition, symbol) tables. Every step advances all running
+tapes with a few array operations, halted rows are masked out.
+NumPy is an optional dependency, it is needed only by this module.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str(':::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> lockstep = Lockstep(tm, ['11', '1', ''])
+    >>> lockstep.run()
+    3
+    >>> for result in lockstep.results():
+    ...     print(result)
+    BatchResult(id=0, tape=['0', '0', '1'], steps=3, status=<RunStatus.halted: 1>)
+    BatchResult(id=1, tape=['0', '1'], steps=2, status=<RunStatus.halted: 1>)
+    BatchResult(id=2, tape=['1'], steps=1, status=<RunStatus.halted: 1>)
+"""
+
+import itertools
+
+from turingmachine import engine
+from turingmachine import machine
+from turingmachine.batch import BatchResult
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# status codes of tapes
+RUNNING = 0
+HALTED = 1
+MISSING = 2
+
+
+class Lockstep:
+    """Simulation of rules of a TuringMachine on many tapes in lockstep
+
+    Attributes:
+        rules: CompiledRules of the machine
+        cells: array of symbol codes with a row for every tape
+        origin: column of the zero cell of every tape
+        heads: column of the head of every tape
+        conditions: condition code of every tape
+        steps: amount of steps made by every tape
+        status: RUNNING, HALTED or MISSING(no rule to move) of every tape
+        lo, hi: range of used columns of every tape
+    """
+
+    def __init__(self, tm, inputs):
+        """
+        Arguments:
+            tm: machine, which rules, condition and index are used,
+            only R, L, S and STOP moves are allowed
+            inputs: input tapes starting from the zero cell
+        """
+        if numpy is None:
+            raise ImportError('numpy is required for lockstep simulation')
+
+        self.rules = engine.compile_rules(tm)
+        cond = self.rules.intern_condition(tm.condition)
+        symbol_codes = self.rules.symbol_codes
+        intern = self.rules.intern_symbol
+        codes = []
+        for vals in inputs:
+            row = []
+            for val in vals:
+                val = str(val)
+                code = symbol_codes.get(val)
+                row.append(intern(val) if code is None else code)
+            codes.append(row)
+
+        lengths = numpy.array([len(row) for row in codes], dtype=numpy.int64)
+        longest = int(lengths.max(initial=0))
+        size = max(longest, abs(tm.index) + 1)
+        self.origin = size
+        self.cells = numpy.zeros((len(codes), 3 * size), dtype=numpy.int32)
+        filled = numpy.arange(longest) < lengths[:, None]
+        self.cells[:, size:size + longest][filled] = numpy.fromiter(
+            itertools.chain.from_iterable(codes), dtype=numpy.int32, count=int(lengths.sum())
+            )
+
+        amount = len(codes)
+        self.heads = numpy.full(amount, size + tm.index, dtype=numpy.int64)
+        self.conditions = numpy.full(amount, cond, dtype=numpy.int64)
+        self.steps = numpy.zeros(amount, dtype=numpy.int64)
+        self.status = numpy.zeros(amount, dtype=numpy.int8)
+        self.lo = numpy.minimum(self.heads, size)
+        self.hi = numpy.maximum(self.heads, size + numpy.maximum(lengths, 1) - 1)
+
+    def _grow(self, left):
+        """Double width of cells to the left or to the right"""
+        width = self.cells.shape[1]
+        blank = numpy.zeros_like(self.cells)
+        if left:
+            self.cells = numpy.hstack((blank, self.cells))
+            self.origin += width
+            self.heads += width
+            self.lo += width
+            self.hi += width
+        else:
+            self.cells = numpy.hstack((self.cells, blank))
+
+    def run(self, max_steps=None):
+        """Advance all running tapes until they are stopped,
+        have no rule to move or max_steps steps are made
+        Returns:
+            amount of lockstep steps made"""
+        rules = self.rules
+        rules.update()
+        width = rules.width
+        next_symbol = numpy.frombuffer(rules.next_symbol, dtype=numpy.int32)
+        next_condition = numpy.frombuffer(rules.next_condition, dtype=numpy.int32)
+        shift = numpy.frombuffer(rules.shift, dtype=numpy.int8).astype(numpy.int64)
+
+        rows = numpy.flatnonzero(self.status == RUNNING)
+        made = 0
+        while rows.size and (max_steps is None or made < max_steps):
+            heads = self.heads[rows]
+            t = self.conditions[rows] * width + self.cells[rows, heads]
+            next_cond = next_condition[t]
+
+            missing = next_cond == engine.NO_RULE
+            if missing.any():
+                self.status[rows[missing]] = MISSING
+                moving = ~missing
+                rows, heads, t, next_cond = rows[moving], heads[moving], t[moving], next_cond[moving]
+                if not rows.size:
+                    break
+
+            self.cells[rows, heads] = next_symbol[t]
+            self.conditions[rows] = next_cond
+            self.steps[rows] += 1
+
+            move = shift[t]
+            stop = move == engine.STOP
+            if stop.any():
+                self.status[rows[stop]] = HALTED
+                move[stop] = 0
+
+            heads += move
+            self.heads[rows] = heads
+            self.lo[rows] = numpy.minimum(self.lo[rows], heads)
+            self.hi[rows] = numpy.maximum(self.hi[rows], heads)
+            if heads.min() < 0:
+                self._grow(left=True)
+                heads = self.heads[rows]
+            if heads.max() >= self.cells.shape[1]:
+                self._grow(left=False)
+
+            if stop.any():
+                rows = rows[~stop]
+            made += 1
+
+        return made
+
+    def tape(self, i):
+        """Get list of used cells of tape i"""
+        symbols = self.rules.symbols
+        return [symbols[code] for code in self.cells[i, self.lo[i]:self.hi[i] + 1].tolist()]
+
+    def index(self, i):
+        """Get index of the head of tape i"""
+        return int(self.heads[i] - self.origin)
+
+    def condition(self, i):
+        """Get condition of tape i"""
+        return self.rules.conditions[self.conditions[i]]
+
+    def results(self):
+        """Get BatchResult of every tape, status of running ones is max_steps"""
+        statuses = {
+            RUNNING: machine.RunStatus.max_steps,
+            HALTED: machine.RunStatus.halted,
+            MISSING: None,
+            }
+        for i in range(len(self.cells)):
+            yield BatchResult(i, self.tape(i), int(self.steps[i]), statuses[int(self.status[i])])
+
+
+def run_lockstep(tm, inputs, max_steps=None):
+    """Run rules of tm on every input tape in lockstep
+    Returns:
+        list of BatchResult of every input"""
+    lockstep = Lockstep(tm, list(inputs))
+    lockstep.run(max_steps)
+    return list(lockstep.results())
@@ -58,9 +58,17 @@ Usage:
     3 q2 --> 1 q2 S
 """
 
+import copy
+import enum
 import itertools
 import sys
-from collections import deque, defaultdict
+import time
+from array import array
+from collections import defaultdict, deque, namedtuple
+from functools import partial
+from types import MethodType
+
+from turingmachine.tape import Tape
 
 
 class TuringMachineError(Exception):
@@ -101,6 +109,83 @@ class RuleExistsError(TuringMachineError):
         super().__init__(msg)
 
 
+class RunStatus(enum.Enum):
+    """
+    Reason of finishing TuringMachine.run
+
+    Attributes:
+        halted: machine is stopped by STOP move
+        max_steps: step budget is exhausted
+        max_seconds: wall-clock budget is exhausted
+        max_tape_cells: tape has grown over its budget
+    """
+    halted = enum.auto()
+    max_steps = enum.auto()
+    max_seconds = enum.auto()
+    max_tape_cells = enum.auto()
+
+
+class RunResult(namedtuple('RunResult', ['status', 'steps'])):
+    """Result of TuringMachine.run
+
+    Attributes:
+        status: RunStatus of the run
+        steps: amount of steps made during the run
+    """
+    __slots__ = ()
+
+    @property
+    def halted(self):
+        return self.status is RunStatus.halted
+
+
+class Snapshot(namedtuple('Snapshot', ['tape', 'index', 'condition', 'steps', 'stopped'])):
+    """Snapshot of configuration of TuringMachine, see TuringMachine.snapshot
+
+    Attributes:
+        tape: snapshot of the tape(see tape module)
+        index: current pointer position index
+        condition: current condition
+        steps: amount of moves made
+        stopped: is the machine stopped
+    """
+    __slots__ = ()
+
+
+class ExecutionLog:
+    """Append-only log of moves, stored as compact rule ids
+
+    Attributes:
+        size: amount of last moves to keep, None to keep all
+        of them and 0 to turn logging off
+        enabled: is anything logged
+        _ids: rule ids of moves
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self.enabled = size != 0
+        self.clear()
+
+    def clear(self):
+        if self.size is None:
+            self._ids = array('I')
+        else:
+            self._ids = deque(maxlen=self.size)
+
+    def append(self, rule_id):
+        self._ids.append(rule_id)
+
+    def extend(self, rule_ids):
+        self._ids.extend(rule_ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+
 class TuringMachine:
     """Main class implementing an interface for
     programming Alan Turing Machine
@@ -108,40 +193,68 @@ class TuringMachine:
     Attributes:
         current: current pointer position value
         condition: start condition of the machine
-        log: log of all moves
-        _rules: all rules
-        tape: tape layout
+        log: log of all moves, rendered on access
+        _log: ExecutionLog of all moves
+        _rules: (next_val, next_condition, move character) of every (val, condition)
+        _rule_ids: rule id of every rule key, ids are given in order of adding
+        _rule_keys: rule key of every rule id
+        _shared_rules: rule containers are shared with forks, so they are copied before changes
+        _moves: move function of every move character
+        tape: tape layout(see tape module)
         index: current pointer position index
         default: default value of empty cell
-        log_func: logging function(default provided)
+        log_func: logging function used to render log(default provided)
+        steps: amount of moves made
     """
 
     EMPTY_SIGN = 'B'
 
+    # amount of steps between checks of run budgets
+    CHECK_EVERY = 4096
+
+    # move characters of move functions
+    MOVE_CHARS = {
+        'forward': 'R',
+        'back': 'L',
+        'stay': 'S',
+        'stop': 'STOP',
+        }
+
     MAIN_OUTPUT = sys.stdout
 
     def __init__(
             self, start_vals,
             start_condition, index=0,
-            log_func=None, default=''
+            log_func=None, default='',
+            log_size=None, tape_cls=Tape
             ):
+        """
+        Arguments:
+            log_size: amount of last moves kept in log,
+            None to keep all of them, 0 to turn logging off
+            tape_cls: tape backend, Tape, RunTape, PagedTape, StreamTape
+            or MmapTape(see tape module), compiled and macro modes
+            run only on Tape and MmapTape
+        """
         self.stopped = False
-        self._center = 0
+        self.steps = 0
         self.condition = str(start_condition)
         self._rules = defaultdict()
-        self.log = ''
-        self.tape = deque(str(val) for val in start_vals)
+        self._rule_ids = {}
+        self._rule_keys = []
+        self._shared_rules = False
+        self._moves = self._bind_moves()
+        self._compiled = None
+        self._events = None
+        self._log = ExecutionLog(log_size)
+        self.tape = tape_cls((str(val) for val in start_vals), default=default)
         self.index = int(index)
-        self.default = default
 
         if log_func is None:
             self.log_func = self.default_log
         else:
             self.log_func = log_func
 
-        if not self.tape:
-            self.tape.append(self.default)
-
     def set_rule(
             self, val,
             condition, next_val,
@@ -157,18 +270,22 @@ class TuringMachine:
             next_condition: next machine condition
             move: direction R(right), L(left), S(stay) or STOP
         """
-        move_func = self._move_char_to_func(move)  # to check for right format character R, L or S
+        self._move_char_to_func(move)  # to check for right format character R, L or S
         val, condition, next_val, next_condition = str(val), str(condition), str(next_val), str(next_condition)
 
         check = self._rules.get((val, condition))
         to = (
             next_val, next_condition,
-            move_func
+            move
             )
 
         if check is None:
             """When this is a new rule we are adding"""
+            self._own_rules()
             self._rules[(val, condition)] = to
+            self._rule_ids[(val, condition)] = len(self._rule_keys)
+            self._rule_keys.append((val, condition))
+            self._compiled = None
         elif check == to:
             """When there already are the same rule we are adding"""
             pass
@@ -189,6 +306,34 @@ class TuringMachine:
         else:
             raise ValueError(f"wrong move character: '{move}', must be either 'R','L' or 'S'")
 
+    def _bind_moves(self):
+        """Get move function of every move character"""
+        return {move: self._move_char_to_func(move) for move in self.MOVE_CHARS.values()}
+
+    def _own_rules(self):
+        """Copy rule containers shared with forks before they are changed"""
+        if self._shared_rules:
+            self._rules = defaultdict(None, self._rules)
+            self._rule_ids = dict(self._rule_ids)
+            self._rule_keys = list(self._rule_keys)
+            self._shared_rules = False
+
+    def rule_table(self):
+        """Get rules with move characters
+        Returns:
+            list of (val, condition, next_val, next_condition, move) rules
+        """
+        table = []
+        for key, to in self._rule_items():
+            if to[2] not in self._moves:
+                raise TuringMachineError(f'only R, L, S and STOP moves have characters, not {to[2]!r}')
+            table.append(key + to)
+        return table
+
+    def _rule_items(self):
+        """Get (val, condition), (next_val, next_condition, move) pairs of all rules"""
+        return self._rules.items()
+
     def rule_str(
             self, format_string,
             delimiter=' ', rules_delimiter=','
@@ -221,12 +366,48 @@ class TuringMachine:
                 move
                 )
 
-    def rule_file(self, name, delimiter=' '):
+    def rule_file(self, name, delimiter=' ', cache_dir=None):
+        """
+        Add rules from a file, one or more comma-separated rules
+        per line, parsed line by line(see rulefile module)
+
+        Arguments:
+            cache_dir: directory of caches of parsed rule files,
+            None to always parse the file
+        """
+        from turingmachine import rulefile
         with open(name) as file:
-            s = file.read()
-        s = s.strip().replace('\n', ',')
-        if s:
-            self.rule_str(s, delimiter=delimiter)
+            rulefile.load_file_rules(self, file, name, cache_dir=cache_dir, delimiter=delimiter)
+
+    def minimize(self, prefix='q'):
+        """
+        Drop rules of conditions unreachable from the current condition,
+        merge conditions with the same behaviour and renumber
+        them(see minimizer module), log is cleared
+
+        Arguments:
+            prefix: prefix of names of renumbered conditions,
+            None to keep names of conditions
+        Returns:
+            Minimization
+        """
+        from turingmachine import minimizer
+        return minimizer.minimize(self, prefix=prefix)
+
+    def analyze(self, symbols=None):
+        """
+        Find rules reachable from the current configuration without
+        running the machine, with missing rules it could stop at, halting
+        conditions and strongly connected components of conditions(see analysis module)
+
+        Arguments:
+            symbols: symbols, which could be on the tape besides the
+            ones written by rules, symbols of the tape by default
+        Returns:
+            Analysis
+        """
+        from turingmachine import analysis
+        return analysis.analyze(self, symbols=symbols)
 
     def move(self):
         """Make a move according to the rules
@@ -235,54 +416,250 @@ class TuringMachine:
         if self.stopped:
             return
 
+        key = (self.current, self.condition)
         try:
-            next_val, next_cond, move_func = self._rules[(self.current, self.condition)]
+            next_val, next_cond, move = self._rules[key]
         except KeyError:
             raise RuleNotFoundError(
                 self.current, self.condition,
                 self
                 )
 
-        self.log += self.log_func(
-            self.current, self.condition,
-            next_val, next_cond, move_func
-            ) + '\n'
+        if self._log.enabled:
+            self._log.append(self._rule_ids[key])
         self.condition = next_cond
+        self.steps += 1
 
         try:
-            return move_func(next_val)
+            return self._moves[move](next_val)
         except TuringMachineStop:
             self.stopped = True
 
-    def run(self):
-        """Make all available moves unless it is stopped or
-        an exception is raised"""
+    def _move_many(self, amount=None):
+        """Make up to amount moves, all available if None
+        Returns:
+            amount of moves made"""
+        steps = self.steps
+        for _ in itertools.repeat(None) if amount is None else range(amount):
+            if self.stopped:
+                break
+            self.move()
+
+        return self.steps - steps
+
+    def run(
+            self, max_steps=None,
+            max_seconds=None, max_tape_cells=None,
+            mode='step', block_size=None
+            ):
+        """Make all available moves unless it is stopped,
+        an exception is raised or a budget is exhausted.
+        Budgets are checked every CHECK_EVERY steps, so
+        max_seconds and max_tape_cells may be slightly exceeded.
+        Run can be continued by calling this function again.
+
+        Arguments:
+            max_steps: maximum amount of steps to make
+            max_seconds: maximum wall-clock time of the run
+            max_tape_cells: maximum amount of used tape cells
+            mode: 'step' to make moves one by one with self.move,
+            'compiled' to run rules interned to integer tables
+            (see engine module), only R, L, S and STOP moves allowed,
+            'python' to run rules compiled to a generated Python
+            function(see codegen module), with the same restrictions,
+            'macro' to run as a macro machine over blocks of block_size
+            cells with cached block transitions(see blocks module)
+            block_size: amount of cells in a block, required in macro mode only
+        Returns:
+            RunResult with status of the run and amount of steps made,
+            MacroRunResult with amount of macro steps in macro mode
+        """
+        events = self._events
+        if events is None:
+            return self._run(max_steps, max_seconds, max_tape_cells, mode, block_size, None)
+
+        events.start()
+        stopped = self.stopped
+        try:
+            result = self._run(max_steps, max_seconds, max_tape_cells, mode, block_size, events)
+        except RuleNotFoundError:
+            events.fire_missing()
+            raise
+        events.fire_steps()
+        if result.halted and not stopped:
+            events.fire_halt()
+        return result
+
+    def _run(self, max_steps, max_seconds, max_tape_cells, mode, block_size, events):
+        """Run the machine, see run, batches of steps end
+        at steps events if events are given"""
+        if mode == 'macro':
+            if block_size is None:
+                raise ValueError("block_size is required in 'macro' mode")
+            from turingmachine import blocks
+            return blocks.run(
+                self, block_size, max_steps=max_steps,
+                max_seconds=max_seconds, max_tape_cells=max_tape_cells
+                )
+        if block_size is not None:
+            raise ValueError(f"block_size is used only in 'macro' mode, not in '{mode}'")
+
+        if mode == 'compiled':
+            from turingmachine import engine
+            step = partial(engine.execute, self)
+        elif mode == 'python':
+            from turingmachine import codegen
+            step = partial(codegen.execute, self)
+        elif mode == 'step':
+            step = self._move_many
+        else:
+            raise ValueError(
+                f"wrong run mode: '{mode}', must be either 'step', 'compiled', 'python' or 'macro'"
+                )
+
+        start = self.steps
+        deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        checked = deadline is not None or max_tape_cells is not None
 
         while not self.stopped:
-            """until stop function called or paused"""
-            self.move()
+            """until stop function called or budget exhausted"""
+            amount = self.CHECK_EVERY if checked else None
+            if max_steps is not None:
+                left = max_steps - (self.steps - start)
+                if left <= 0:
+                    return RunResult(RunStatus.max_steps, self.steps - start)
+                amount = left if amount is None else min(amount, left)
+            if events is not None and events.every:
+                amount = events.limit(amount)
+
+            step(amount)
+
+            if self.stopped:
+                break
+            if events is not None:
+                events.fire_steps()
+            if max_tape_cells is not None and len(self.tape) > max_tape_cells:
+                return RunResult(RunStatus.max_tape_cells, self.steps - start)
+            if deadline is not None and time.monotonic() >= deadline:
+                return RunResult(RunStatus.max_seconds, self.steps - start)
+
+        return RunResult(RunStatus.halted, self.steps - start)
+
+    async def run_async(
+            self, slice_steps=None,
+            max_steps=None, max_seconds=None, max_tape_cells=None,
+            mode='step', block_size=None,
+            executor=None, progress=None
+            ):
+        """Run the machine in slices of slice_steps steps, giving control
+        to the asyncio event loop between them(see aio module), arguments
+        of run have the same meaning, the run is stopped between slices
+        when the task is cancelled
+
+        Arguments:
+            slice_steps: maximum amount of steps of a slice, 65536 by default
+            executor: concurrent.futures thread or process executor
+            running slices, None to run them in the thread of the loop
+            progress: function called as progress(tm, steps) after
+            every slice with amount of steps made by the run so far
+        Returns:
+            RunResult of the whole run, MacroRunResult in macro mode
+        """
+        from turingmachine import aio
+        return await aio.run_async(
+            self, slice_steps=aio.SLICE_STEPS if slice_steps is None else slice_steps, max_steps=max_steps,
+            max_seconds=max_seconds, max_tape_cells=max_tape_cells,
+            mode=mode, block_size=block_size, executor=executor, progress=progress
+            )
+
+    def subscribe(self, event, callback, value=None):
+        """Subscribe callback to an event of runs of the machine,
+        it is called as callback(tm, event)(see events module)
+        Arguments:
+            event: 'steps' fired every value steps, 'condition' fired
+            by entering value condition, 'symbol' fired by writing value
+            symbol, 'halt' or 'missing' fired by a missing rule
+            value: amount of steps, condition or symbol of the event
+        Returns:
+            Subscription, which could be passed to unsubscribe"""
+        from turingmachine import events
+        if self._events is None:
+            self._events = events.Events(self)
+        return self._events.subscribe(event, callback, value)
+
+    def unsubscribe(self, subscription):
+        """Remove subscription returned by subscribe"""
+        self._events.unsubscribe(subscription)
+        if not self._events.subscriptions:
+            self._events = None
+
+    def snapshot(self):
+        """Get snapshot of configuration of the machine, which
+        could be restored later, rules and log are not included
+        Returns:
+            Snapshot"""
+        return Snapshot(self.tape.snapshot(), self.index, self.condition, self.steps, self.stopped)
+
+    def restore(self, snapshot):
+        """Restore configuration of the machine from snapshot taken on it"""
+        self.tape.restore(snapshot.tape)
+        self.index = snapshot.index
+        self.condition = snapshot.condition
+        self.steps = snapshot.steps
+        self.stopped = snapshot.stopped
+
+    def fork(self):
+        """Get a child machine in the same configuration, which tape
+        is forked from this one(see tape module): with PagedTape pages
+        are shared until they are written, other tapes copy all of their
+        used cells, so forking costs O(used cells) there. Rule table is
+        shared with the child, either of them copies it when a rule is
+        added to it. Log of the child is empty
+        Returns:
+            new object of this class"""
+        child = copy.copy(self)
+        child.tape = self.tape.fork()
+        child._log = ExecutionLog(self._log.size)
+        child._compiled = None
+        child._events = None
+        self._shared_rules = child._shared_rules = True
+        child._moves = child._bind_moves()
+        child.log_func = self._rebind(self.log_func, child)
+        return child
+
+    def _rebind(self, func, tm):
+        """Bind func to tm if it is a method of this machine"""
+        if getattr(func, '__self__', None) is self:
+            return MethodType(func.__func__, tm)
+        return func
+
+    def save_checkpoint(self, path):
+        """Save the machine into the binary checkpoint file(see checkpoint module)"""
+        from turingmachine import checkpoint
+        checkpoint.save(self, path)
+
+    @classmethod
+    def load_checkpoint(cls, path, log_func=None):
+        """
+        Alternative constructor, for loading cls from a binary checkpoint
+        file saved by save_checkpoint
+        Returns:
+            new object of this class
+        """
+        from turingmachine import checkpoint
+        return checkpoint.load(path, cls=cls, log_func=log_func)
 
     def default_log(
             self, val,
             condition, next_val,
-            next_condition, move_func,
+            next_condition, move,
             delimiter=' ', file=None,
             step_sign='->'
             ):
-        """Default logging function
+        """Default logging function, called with rules
+        of the log, which have move characters
         Returns:
             move log string"""
-        if move_func == self.forward:
-            move = 'R'
-        elif move_func == self.back:
-            move = 'L'
-        elif move_func == self.stay:
-            move = 'S'
-        elif move_func == self.stop:
-            move = 'STOP'
-        else:
-            move = '"{}"'.format(move_func.__name__)
-
         s = delimiter.join([
             val, condition,
             step_sign, next_val,
@@ -294,12 +671,28 @@ class TuringMachine:
 
         return s
 
+    def _get_log(self):
+        lines = []
+        for rule_id in self._log:
+            key = self._rule_keys[rule_id]
+            lines.append(self.log_func(*key, *self._rules[key]) + '\n')
+
+        return ''.join(lines)
+
+    def _set_log(self, log):
+        if log:
+            raise ValueError("log could only be cleared by setting it to ''")
+        self._log.clear()
+
+    log = property(_get_log, _set_log)
+
     @classmethod
     def from_str(
             cls, _str, tape_delimiter=',',
             rules_delimiter=',',
             section_delimiter=':',
-            log_func=None
+            log_func=None, log_size=None,
+            tape_cls=Tape
             ):
         # TODO: make form_str more convenient in :::::
         """
@@ -319,7 +712,10 @@ class TuringMachine:
         if not index:
             index = 0
 
-        obj = cls(tape, start_cond, index=index, default=default, log_func=log_func)
+        obj = cls(
+            tape, start_cond, index=index, default=default,
+            log_func=log_func, log_size=log_size, tape_cls=tape_cls
+            )
         if rules:
             obj.rule_str(rules, rules_delimiter=rules_delimiter)
 
@@ -328,10 +724,13 @@ class TuringMachine:
     @classmethod
     def from_file(
             cls, file_name, tape_delimiter=',',
-            section_delimiter=':', log_func=None
+            section_delimiter=':', log_func=None,
+            log_size=None, tape_cls=Tape,
+            cache_dir=None
             ):
         """
-        Alternative constructor, for creating cls from a file
+        Alternative constructor, for creating cls from a file,
+        rules are parsed line by line(see rulefile module)
 
         Template:
             tape_elements_separated_by_comma:start_index:default:start_condition
@@ -343,54 +742,53 @@ class TuringMachine:
             1,2,3:0:q1
             1 q1 -> 0 q2 R
             2 q2 -> 3 q2 S'
+        Arguments:
+            cache_dir: directory of caches of parsed rule files,
+            None to always parse the file
         Returns:
             new object of this class
         """
+        from turingmachine import rulefile
         with open(file_name) as file:
-            head = file.readline()
-            tail = file.read()
-
-        if tail:
-            head = head.replace('\n', section_delimiter)
-            tail = tail.strip()
-            tail = tail.replace('\n', ',')
-        else:
-            head = head.strip()
-
-        init_str = head + tail
+            head = file.readline().rstrip('\r\n')
+            if head.count(section_delimiter) == 3:
+                """When rules are on the next lines"""
+                head += section_delimiter
+            obj = cls.from_str(
+                head, tape_delimiter=tape_delimiter,
+                section_delimiter=section_delimiter,
+                log_func=log_func, log_size=log_size, tape_cls=tape_cls
+                )
+            rulefile.load_file_rules(obj, file, file_name, cache_dir=cache_dir)
 
-        return cls.from_str(
-            init_str, tape_delimiter=tape_delimiter, log_func=log_func
-            )
+        return obj
 
     def forward(self, value):
         """Put a value to the current position and move right on the tape
         Returns:
             current value of the new cell
         """
-        self[self.index] = str(value)
+        self.tape.write(self.index, str(value))
         self.index += 1
-        cur = self[self.index]
 
-        return cur
+        return self.tape.read(self.index)
 
     def back(self, value):
         """Put a value to the current position and move left on the tape
         Returns:
             current value of the new cell
         """
-        self[self.index] = str(value)
+        self.tape.write(self.index, str(value))
         self.index -= 1
-        cur = self[self.index]
 
-        return cur
+        return self.tape.read(self.index)
 
     def stay(self, value):
         """Put a value to the current position and stay here
         Returns:
             current value of the new cell
         """
-        self[self.index] = str(value)
+        self.tape.write(self.index, str(value))
 
         return self.current
 
@@ -399,39 +797,33 @@ class TuringMachine:
         raise TuringMachineStop
 
     def _prepare_index(self, index):
-        length = len(self.tape)
-        center = self._center
+        """Make cell with index used on the tape
+        Returns:
+            index of the cell among used ones"""
+        self.tape.locate(index)
+        return self.tape.center + index
 
-        if index > 0:
-            append_times = index - (length - center) + 1
-            for i in range(append_times):
-                self.tape.append(self.default)
-        elif index < 0:
-            append_times = - (index + center)
-            for i in range(append_times):
-                self.tape.appendleft(self.default)
+    def _get_center(self):
+        return self.tape.center
 
-            if append_times > 0:
-                self._center += append_times
+    def _set_center(self, center):
+        self.tape.center = center
 
-        return self._center + index
+    _center = property(_get_center, _set_center)
+
+    @property
+    def default(self):
+        return self.tape.default
 
     def __getitem__(self, index):
         if isinstance(index, slice):
             start = self._prepare_index(index.start)
             stop = self._prepare_index(index.stop)
-            return list(
-                itertools.islice(
-                    self.tape,
-                    start, stop
-                    )
-                )
-        index = self._prepare_index(index)
-        return self.tape[index]
+            return self.tape[start:stop]
+        return self.tape.read(index)
 
     def __setitem__(self, index, value):
-        index = self._prepare_index(index)
-        self.tape[index] = value
+        self.tape.write(index, value)
 
     def view(self):
         string = str(self)
@@ -439,19 +831,22 @@ class TuringMachine:
             print(line)
 
     def __repr__(self):
-        center = self[0]
-        self[0] = '{{{}}}'.format(center)
-        index = self[self.index]
-        self[self.index] = '[{}]'.format(index)
-        tape = str(self.tape)
-        self[self.index] = index  #
-        self[0] = center  # Order is very important
+        try:
+            center = self._prepare_index(0)
+        except IndexError:
+            # zero cell is flushed from a StreamTape
+            center = None
+        index = self._prepare_index(self.index)
+        tape = list(self.tape)
+        if center is not None:
+            tape[center] = '{{{}}}'.format(tape[center])
+        tape[index] = '[{}]'.format(tape[index])
 
         s = 'Index[]: {}\nCondition: {}\nDefault: {}\nCenter({{}}): {}\nTape: {}\nRules:\n'.format(
-            str(self.index), self.condition, self.default, str(self._center), tape[tape.find('['):-1]
+            str(self.index), self.condition, self.default, str(self._center), tape
             )
 
-        for key, val in self._rules.items():
+        for key, val in self._rule_items():
             s += self.default_log(key[0], key[1], val[0], val[1], val[2]) + '\n'
 
         return "TuringMachine(\n{})".format(s)
@@ -459,7 +854,7 @@ class TuringMachine:
     __str__ = __repr__
 
     def _get_cur(self):
-        return self[self.index]
+        return self.tape.read(self.index)
 
     def _set_cur(self, val):
         raise PermissionError("to set current item use back, forward, stay or stop functions")
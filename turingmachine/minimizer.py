@@ -0,0 +1,169 @@
+"""
+Module providing minimisation of rule tables of TuringMachine
+
+Conditions unreachable from the current condition of the machine are
+dropped, conditions with the same behaviour are merged and the rest
+are renumbered in the order they are reached from the current condition.
+Two conditions behave the same when they have rules for the same symbols,
+which write the same symbols with the same moves and lead to conditions
+behaving the same. They are found by partition refinement of Hopcroft:
+conditions are split by symbols, writes and moves of their rules first,
+then blocks of conditions are split by the blocks their rules lead to,
+only the smaller half of every split block is queued for splitting others.
+
+STOP rules lead nowhere, after minimisation they lead to their own
+condition, as rules of 'val condition -> next_val STOP' strings do.
+Rule ids are renumbered, so log of the machine is cleared.
+
+Usage:
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::a:1 a -> 1 b R,1 b -> 1 c R,1 c -> 1 b R,B b -> 1 STOP,B c -> 1 STOP,1 x -> 1 a R', log_size=0)
+    >>> minimize(tm)
+    Minimization(conditions={'a': 'q0', 'b': 'q1', 'c': 'q1'}, rules=3, dropped=3)
+    >>> tm.rule_table()
+    [('1', 'q0', '1', 'q1', 'R'), ('1', 'q1', '1', 'q1', 'R'), ('', 'q1', '1', 'q1', 'STOP')]
+    >>> tm.run()
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> tm.tape
+    Tape(['1', '1', '1', '1'])
+"""
+
+from collections import defaultdict, deque, namedtuple
+
+from turingmachine import machine
+
+# prefix of names of renumbered conditions
+PREFIX = 'q'
+
+
+class Minimization(namedtuple('Minimization', ['conditions', 'rules', 'dropped'])):
+    """Outcome of minimize
+
+    Attributes:
+        conditions: new condition of every condition reachable from
+        the current one, in the order they are reached
+        rules: amount of rules left
+        dropped: amount of rules dropped
+    """
+    __slots__ = ()
+
+
+def _transitions(tm):
+    """Get list of (val, next_val, next_condition, move) rules of every
+    condition in order of rule ids, next_condition is None for STOP rules"""
+    transitions = defaultdict(list)
+    for (val, cond), (next_val, next_cond, move) in tm._rule_items():
+        transitions[cond].append((val, next_val, None if move == 'STOP' else next_cond, move))
+    return transitions
+
+
+def reachable(tm, transitions=None):
+    """Get conditions reachable from the current condition
+    of tm in the order of breadth-first search"""
+    if transitions is None:
+        transitions = _transitions(tm)
+    order = {tm.condition: None}
+    queue = deque(order)
+    while queue:
+        for _, _, next_cond, _ in transitions.get(queue.popleft(), ()):
+            if next_cond is not None and next_cond not in order:
+                order[next_cond] = None
+                queue.append(next_cond)
+    return list(order)
+
+
+def partition(conditions, transitions):
+    """Split conditions into blocks of conditions with the same behaviour
+    Arguments:
+        conditions: conditions closed under transitions
+        transitions: see _transitions
+    Returns:
+        block index of every condition"""
+    blocks, block_of = [], {}
+    signatures = {}
+    for cond in conditions:
+        signature = frozenset(
+            (val, next_val, next_cond is None, move)
+            for val, next_val, next_cond, move in transitions.get(cond, ())
+            )
+        index = signatures.setdefault(signature, len(blocks))
+        if index == len(blocks):
+            blocks.append(set())
+        blocks[index].add(cond)
+        block_of[cond] = index
+
+    inverse = defaultdict(list)
+    for cond in conditions:
+        for val, _, next_cond, _ in transitions.get(cond, ()):
+            if next_cond is not None:
+                inverse[val, next_cond].append(cond)
+    symbols = {val for val, _ in inverse}
+
+    waiting = deque((index, val) for index in range(len(blocks)) for val in symbols)
+    while waiting:
+        index, val = waiting.popleft()
+        touched = defaultdict(set)
+        for cond in blocks[index]:
+            for prev in inverse.get((val, cond), ()):
+                touched[block_of[prev]].add(prev)
+
+        for split, inside in touched.items():
+            if len(inside) == len(blocks[split]):
+                continue
+            if 2 * len(inside) > len(blocks[split]):
+                inside = blocks[split] - inside
+            blocks[split] -= inside
+            new = len(blocks)
+            blocks.append(inside)
+            for cond in inside:
+                block_of[cond] = new
+            # the split block is either queued already or it is stable,
+            # so queueing the smaller half is enough for both halves
+            waiting.extend((new, symbol) for symbol in symbols)
+
+    return block_of
+
+
+def minimize(tm, prefix=PREFIX):
+    """Drop unreachable conditions of tm with their rules, merge conditions
+    with the same behaviour and renumber them, names of conditions are
+    prefix and their number, starting from 0 for the current condition
+    Arguments:
+        prefix: prefix of names of conditions, None to keep the name of
+        the first reached condition of every merged ones
+    Returns:
+        Minimization"""
+    if type(tm)._rule_items is not machine.TuringMachine._rule_items:
+        raise machine.TuringMachineError(f'rules of {type(tm).__name__} could not be minimized')
+
+    transitions = _transitions(tm)
+    order = reachable(tm, transitions)
+    block_of = partition(order, transitions)
+
+    names, representatives = {}, []
+    for cond in order:
+        block = block_of[cond]
+        if block not in names:
+            names[block] = cond if prefix is None else f'{prefix}{len(representatives)}'
+            representatives.append(cond)
+    conditions = {cond: names[block_of[cond]] for cond in order}
+
+    keys, rules = [], {}
+    for cond in representatives:
+        name = conditions[cond]
+        for val, next_val, next_cond, move in transitions.get(cond, ()):
+            key = (val, name)
+            keys.append(key)
+            rules[key] = (next_val, name if next_cond is None else conditions[next_cond], move)
+
+    dropped = len(tm._rules) - len(rules)
+    tm._rules = defaultdict(None, rules)
+    tm._rule_keys = keys
+    tm._rule_ids = {key: rule_id for rule_id, key in enumerate(keys)}
+    tm._shared_rules = False
+    tm._compiled = None
+    tm.condition = conditions[tm.condition]
+    tm._log.clear()
+    if tm._events is not None:
+        tm._events._update()
+
+    return Minimization(conditions, len(rules), dropped)
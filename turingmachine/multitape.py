@@ -0,0 +1,316 @@
+"""
+Module providing MultiTapeTuringMachine class
+
+Multi-tape machine has k tapes with a head on each of them. Rules
+are keyed on the tuple of k symbols under the heads and the condition,
+they write k symbols and move every head on its own. Symbols and
+moves of the heads are separated by '|' in rule strings:
+'1|B q1 -> 1|1 q1 R|R', STOP move stops all of the heads.
+
+Usage:
+    >>> tm = MultiTapeTuringMachine.from_str('1,1,1|0::0:q1:1|0 q1 -> 1|1 q1 R|R,0|0 q1 -> 0|0 STOP')
+    >>> tm.run()
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> tm.tapes
+    [Tape(['1', '1', '1', '0']), Tape(['1', '1', '1', '0'])]
+    >>> print(tm.log, end='')
+    1|0 q1 -> 1|1 q1 R|R
+    1|0 q1 -> 1|1 q1 R|R
+    1|0 q1 -> 1|1 q1 R|R
+    0|0 q1 -> 0|0 q1 STOP
+"""
+
+from turingmachine import machine
+from turingmachine.tape import Tape
+
+# head shift of every move character
+SHIFTS = {'R': 1, 'L': -1, 'S': 0}
+
+
+class MultiTapeTuringMachine(machine.TuringMachine):
+    """Turing machine with k tapes and k heads
+
+    Attributes:
+        tapes: tape of every head(see tape module)
+        indexes: index of every head
+        tape: first tape
+        index: index of the head of the first tape
+        current: tuple of values under the heads
+        _rules: (next_vals, next_condition, moves) of every (vals, condition),
+        moves is a tuple of move characters or 'STOP'
+    """
+
+    TUPLE_DELIMITER = '|'
+
+    def __init__(
+            self, start_vals,
+            start_condition, index=0,
+            log_func=None, default='',
+            log_size=None, tape_cls=Tape
+            ):
+        """
+        Arguments:
+            start_vals: start values of every tape, there are as many tapes
+            index: start index of all of the heads or of every head
+        """
+        start_vals = [list(vals) for vals in start_vals]
+        if not start_vals:
+            raise ValueError('multi-tape machine needs at least one tape')
+        if isinstance(index, (int, str)):
+            indexes = [int(index)] * len(start_vals)
+        else:
+            indexes = [int(i) for i in index]
+        if len(indexes) != len(start_vals):
+            raise ValueError(f'{len(indexes)} indexes are given for {len(start_vals)} tapes')
+
+        self.tapes = [None]
+        self.indexes = indexes
+        super().__init__(
+            start_vals[0], start_condition, index=indexes[0], log_func=log_func,
+            default=default, log_size=log_size, tape_cls=tape_cls
+            )
+        self.tapes = [self.tape] + [
+            tape_cls((str(val) for val in vals), default=default) for vals in start_vals[1:]
+            ]
+
+    def _get_tape(self):
+        return self.tapes[0]
+
+    def _set_tape(self, tape):
+        self.tapes = [tape] + self.tapes[1:]
+
+    tape = property(_get_tape, _set_tape)
+
+    def _get_index(self):
+        return self.indexes[0]
+
+    def _set_index(self, index):
+        self.indexes = [index] + self.indexes[1:]
+
+    index = property(_get_index, _set_index)
+
+    def _split(self, string):
+        """Split string of values or moves of every head"""
+        parts = string.split(self.TUPLE_DELIMITER)
+        if len(parts) != len(self.tapes):
+            raise ValueError(f"'{string}' has {len(parts)} parts for {len(self.tapes)} tapes")
+        return parts
+
+    def set_rule(
+            self, vals,
+            condition, next_vals,
+            next_condition, moves
+            ):
+        """
+        Set a rule for moving according to it
+
+        Arguments:
+            vals: values under the heads
+            condition: machine condition
+            next_vals: next values under the heads
+            next_condition: next machine condition
+            moves: direction R(right), L(left) or S(stay) of every head,
+            or STOP for all of them
+        """
+        vals, next_vals = tuple(map(str, vals)), tuple(map(str, next_vals))
+        condition, next_condition = str(condition), str(next_condition)
+        if moves != 'STOP':
+            moves = tuple(moves)
+            for move in moves:
+                if move not in SHIFTS:
+                    raise ValueError(f"wrong move character: '{move}', must be either 'R','L' or 'S'")
+        for values in (vals, next_vals) + (() if moves == 'STOP' else (moves,)):
+            if len(values) != len(self.tapes):
+                raise ValueError(f'{values} has {len(values)} items for {len(self.tapes)} tapes')
+
+        key = (vals, condition)
+        check = self._rules.get(key)
+        to = (next_vals, next_condition, moves)
+
+        if check is None:
+            self._own_rules()
+            self._rules[key] = to
+            self._rule_ids[key] = len(self._rule_keys)
+            self._rule_keys.append(key)
+        elif check != to:
+            raise machine.RuleExistsError(vals, condition)
+
+    def rule_table(self):
+        """Get rules
+        Returns:
+            list of (vals, condition, next_vals, next_condition, moves) rules
+        """
+        return [key + to for key, to in self._rule_items()]
+
+    def rule_str(
+            self, format_string,
+            delimiter=' ', rules_delimiter=','
+            ):
+        """
+        Add a rule using str
+        Template:
+            'vals condition -> next_vals next_condition moves'
+            where vals, next_vals and moves are separated by '|'
+        Example:
+            '1|B q1 -> 1|1 q3 R|S'
+        """
+        for elem in format_string.split(rules_delimiter):
+            if elem.endswith('STOP'):
+                vals, cond, _, next_vals, moves = elem.split(delimiter)
+                next_cond = cond
+            else:
+                vals, cond, _, next_vals, next_cond, moves = elem.split(delimiter)
+                moves = self._split(moves)
+            vals = [self.default if val == self.EMPTY_SIGN else val for val in self._split(vals)]
+
+            self.set_rule(
+                vals, cond,
+                self._split(next_vals), next_cond,
+                moves
+                )
+
+    def move(self):
+        """Make a move according to the rules
+        Returns:
+            current values of the new cells"""
+        if self.stopped:
+            return
+
+        key = (self.current, self.condition)
+        try:
+            next_vals, next_cond, moves = self._rules[key]
+        except KeyError:
+            raise machine.RuleNotFoundError(
+                self.current, self.condition,
+                self
+                )
+
+        if self._log.enabled:
+            self._log.append(self._rule_ids[key])
+        self.condition = next_cond
+        self.steps += 1
+
+        for tape, index, val in zip(self.tapes, self.indexes, next_vals):
+            tape.write(index, val)
+        if moves == 'STOP':
+            self.stopped = True
+        else:
+            self.indexes = [index + SHIFTS[move] for index, move in zip(self.indexes, moves)]
+        return self.current
+
+    def run(self, *args, mode='step', **kwargs):
+        """Make all available moves, see TuringMachine.run,
+        multi-tape machine runs only in 'step' mode"""
+        if mode != 'step':
+            raise machine.TuringMachineError(f"multi-tape machine runs only in 'step' mode, not in '{mode}'")
+        return super().run(*args, mode=mode, **kwargs)
+
+    def snapshot(self):
+        """Get snapshot of configuration of the machine, tape and
+        index of the Snapshot are tuples with an item for every head"""
+        return machine.Snapshot(
+            tuple(tape.snapshot() for tape in self.tapes), tuple(self.indexes),
+            self.condition, self.steps, self.stopped
+            )
+
+    def restore(self, snapshot):
+        for tape, tape_snapshot in zip(self.tapes, snapshot.tape):
+            tape.restore(tape_snapshot)
+        self.indexes = list(snapshot.index)
+        self.condition = snapshot.condition
+        self.steps = snapshot.steps
+        self.stopped = snapshot.stopped
+
+    def fork(self):
+        child = super().fork()
+        child.tapes = [child.tape] + [tape.fork() for tape in self.tapes[1:]]
+        return child
+
+    def save_checkpoint(self, path):
+        raise machine.TuringMachineError('checkpoints of multi-tape machines are not supported')
+
+    def default_log(
+            self, vals,
+            condition, next_vals,
+            next_condition, moves,
+            delimiter=' ', file=None,
+            step_sign='->'
+            ):
+        """Default logging function
+        Returns:
+            move log string"""
+        join = self.TUPLE_DELIMITER.join
+        s = delimiter.join([
+            join(vals), condition,
+            step_sign, join(next_vals),
+            next_condition, moves if moves == 'STOP' else join(moves)
+            ])
+
+        if file is not None:
+            print(s, file=file)
+
+        return s
+
+    @classmethod
+    def from_str(
+            cls, _str, tape_delimiter=',',
+            rules_delimiter=',',
+            section_delimiter=':',
+            log_func=None, log_size=None,
+            tape_cls=Tape
+            ):
+        """
+        Alternative constructor, for creating cls from a string
+
+        Template:
+            'tapes_separated_by_|:start_indexes:default:start_condition:rules_separated_by_comma'
+            where start index is the same for all of the heads or is given
+            for every head separated by '|'
+        Example:
+            '1,2,3|:0|0::q1:1|B q1 -> 0|1 q2 R|R,2|B q2 -> 3|2 q2 S|R'
+        Returns:
+            new object of this class
+        """
+        tapes, index, default, start_cond, rules = _str.split(section_delimiter)
+
+        tapes = [tape.split(tape_delimiter) for tape in tapes.split(cls.TUPLE_DELIMITER)]
+        if not index:
+            index = 0
+        elif cls.TUPLE_DELIMITER in index:
+            index = index.split(cls.TUPLE_DELIMITER)
+
+        obj = cls(
+            tapes, start_cond, index=index, default=default,
+            log_func=log_func, log_size=log_size, tape_cls=tape_cls
+            )
+        if rules:
+            obj.rule_str(rules, rules_delimiter=rules_delimiter)
+
+        return obj
+
+    def __repr__(self):
+        tapes = []
+        for tape, index in zip(self.tapes, self.indexes):
+            tape.locate(0)
+            tape.locate(index)
+            cells = list(tape)
+            cells[tape.center] = '{{{}}}'.format(cells[tape.center])
+            cells[tape.center + index] = '[{}]'.format(cells[tape.center + index])
+            tapes.append(f'Tape: {cells}\n')
+
+        s = 'Index[]: {}\nCondition: {}\nDefault: {}\n{}Rules:\n'.format(
+            self.TUPLE_DELIMITER.join(map(str, self.indexes)), self.condition,
+            self.default, ''.join(tapes)
+            )
+
+        for key, val in self._rule_items():
+            s += self.default_log(*key, *val) + '\n'
+
+        return "MultiTapeTuringMachine(\n{})".format(s)
+
+    __str__ = __repr__
+
+    def _get_cur(self):
+        return tuple(tape.read(index) for tape, index in zip(self.tapes, self.indexes))
+
+    current = property(_get_cur, machine.TuringMachine._set_cur)
@@ -0,0 +1,318 @@
+"""
+Module providing NondeterministicTuringMachine class
+
+Nondeterministic machine could have many transitions for the same
+value and condition. Configurations reachable from the current one
+are searched breadth-first or depth-first up to a depth, visited
+configurations are deduplicated by fingerprints of their cells,
+head and condition. Blank cells at the ends of the tape are trimmed,
+so configurations differing only in placement on the tape are the same.
+Machine accepts when a branch is stopped in an accepting condition.
+
+Usage:
+    >>> tm = NondeterministicTuringMachine.from_str('1,1:::q1:1 q1 -> 1 q1 R,1 q1 -> 0 q2 R')
+    >>> tm.rule_str('B q1 -> 1 STOP,1 q2 -> 1 acc S,1 acc -> 1 STOP')
+    >>> tm.accepting = {'acc'}
+    >>> tm.search()
+    SearchResult(status=<SearchStatus.accepted: 1>, steps=3, visited=6)
+    >>> tm.tape, tm.index, tm.condition
+    (Tape(['0', '1']), 1, 'acc')
+"""
+
+import enum
+import hashlib
+import itertools
+import os
+from array import array
+from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from turingmachine import machine
+
+STOP = 2
+MOVES = {'R': 1, 'L': -1, 'S': 0, 'STOP': STOP}
+
+# amount of configurations on the frontier to keep at most
+MAX_FRONTIER = 10 ** 6
+
+# smallest frontier, which is spread over worker processes
+MIN_PARALLEL_FRONTIER = 1024
+
+# amount of chunks of the frontier per worker
+CHUNKS_PER_WORKER = 4
+
+
+class SearchStatus(enum.Enum):
+    """
+    Reason of finishing NondeterministicTuringMachine.search
+
+    Attributes:
+        accepted: a branch is stopped in an accepting condition
+        rejected: all of the branches are stopped in other conditions
+        or have no rules to move
+        max_steps: some branches are deeper than the step budget
+        max_frontier: frontier has grown over its budget
+    """
+    accepted = enum.auto()
+    rejected = enum.auto()
+    max_steps = enum.auto()
+    max_frontier = enum.auto()
+
+
+class SearchResult(namedtuple('SearchResult', ['status', 'steps', 'visited'])):
+    """Result of NondeterministicTuringMachine.search
+
+    Attributes:
+        status: SearchStatus of the search
+        steps: depth of the accepting branch or of the search
+        visited: amount of distinct configurations visited
+    """
+    __slots__ = ()
+
+    @property
+    def accepted(self):
+        return self.status is SearchStatus.accepted
+
+
+def fingerprint(config):
+    """Get fingerprint of (condition, first, index, cells) configuration,
+    which does not depend on placement of the cells on the tape"""
+    condition, first, index, cells = config
+    data = f'{condition}\0{index - first}\0'.encode() + array('I', cells).tobytes()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _normalize(condition, first, index, cells):
+    """Make cell with index used and trim blank cells at the ends
+    Returns:
+        (condition, first, index, cells) configuration"""
+    pos = index - first
+    if pos < 0:
+        cells[:0] = [0] * -pos
+        first, pos = index, 0
+    elif pos >= len(cells):
+        cells.extend([0] * (pos - len(cells) + 1))
+
+    start, end = 0, len(cells)
+    while start < pos and not cells[start]:
+        start += 1
+    while end - 1 > pos and not cells[end - 1]:
+        end -= 1
+    return condition, first + start, index, tuple(cells[start:end])
+
+
+# transitions and accepting conditions of the worker process
+_worker = None
+
+
+def _init(transitions, accepting):
+    global _worker
+    _worker = transitions, accepting
+
+
+def _expand(chunk):
+    """Get successors of configurations of chunk
+    Returns:
+        (successors, accepting configuration or None)"""
+    transitions, accepting = _worker
+    successors = []
+    for condition, first, index, cells in chunk:
+        pos = index - first
+        for next_code, next_cond, shift in transitions.get((cells[pos], condition), ()):
+            new = list(cells)
+            new[pos] = next_code
+            if shift == STOP:
+                if accepting is None or next_cond in accepting:
+                    return successors, (next_cond, first, index, tuple(new))
+                continue
+            successors.append(_normalize(next_cond, first, index + shift, new))
+    return successors, None
+
+
+class NondeterministicTuringMachine(machine.TuringMachine):
+    """Turing machine with many transitions for the same
+    value and condition, which is run by search
+
+    Attributes:
+        accepting: set of accepting conditions, None to accept
+        when any branch is stopped
+        _choices: list of (next_val, next_condition, move character)
+        transitions of every (val, condition)
+    """
+
+    def __init__(self, *args, accepting=None, **kwargs):
+        """
+        Arguments:
+            accepting: accepting conditions, None to accept
+            when any branch is stopped
+        """
+        super().__init__(*args, **kwargs)
+        self.accepting = None if accepting is None else set(map(str, accepting))
+        self._choices = defaultdict(list)
+
+    def set_rule(
+            self, val,
+            condition, next_val,
+            next_condition, move
+            ):
+        """
+        Add a transition, there could be many of them for the same
+        value and condition, adding the same transition twice does nothing
+
+        Arguments:
+            val: tape cell value
+            condition: machine condition
+            next_val: next tape cell value
+            next_condition: next machine condition
+            move: direction R(right), L(left), S(stay) or STOP
+        """
+        self._move_char_to_func(move)
+        val, condition, next_val, next_condition = str(val), str(condition), str(next_val), str(next_condition)
+
+        key = (val, condition)
+        to = (next_val, next_condition, move)
+        if to not in self._choices.get(key, ()):
+            self._own_rules()
+            self._choices[key].append(to)
+            if key not in self._rule_ids:
+                self._rule_ids[key] = len(self._rule_keys)
+                self._rule_keys.append(key)
+
+    def _rule_items(self):
+        for key in self._rule_keys:
+            for to in self._choices[key]:
+                yield key, to
+
+    def _own_rules(self):
+        if self._shared_rules:
+            self._choices = defaultdict(list, {key: list(choices) for key, choices in self._choices.items()})
+        super()._own_rules()
+
+    def move(self):
+        raise machine.TuringMachineError('nondeterministic machine is run only by search')
+
+    def run(self, *args, **kwargs):
+        raise machine.TuringMachineError('nondeterministic machine is run only by search')
+
+    def _transitions(self):
+        """Get (next_code, next_condition, shift) transitions
+        of every (code, condition) of the tape"""
+        intern = self.tape.intern
+        transitions = {}
+        for (val, cond), (next_val, next_cond, move) in self._rule_items():
+            transitions.setdefault((intern(val), cond), []).append((intern(next_val), next_cond, MOVES[move]))
+        return transitions
+
+    def _accept(self, config, steps):
+        """Write accepting configuration into the machine"""
+        condition, first, index, cells = config
+        symbols = self.tape.symbols
+        self.tape.reset(symbols[code] for code in cells)
+        self.tape.center = -first
+        self.index = index
+        self.condition = condition
+        self.steps += steps
+        self.stopped = True
+
+    def search(
+            self, max_steps=None,
+            max_frontier=MAX_FRONTIER, depth_first=False,
+            workers=0
+            ):
+        """Search configurations reachable from the current one
+        for an accepting one. When it is found, it is written into
+        the machine, otherwise the machine is not changed.
+
+        Arguments:
+            max_steps: maximum depth of the search, required
+            for depth-first search
+            max_frontier: maximum amount of configurations waiting to be expanded
+            depth_first: search depth-first instead of breadth-first,
+            breadth-first search finds the shallowest accepting branch
+            workers: amount of worker processes to expand large
+            frontiers of breadth-first search on, all cores if None,
+            0 to search in this process
+        Returns:
+            SearchResult
+        """
+        if self.stopped:
+            raise machine.TuringMachineStop('machine is already stopped')
+
+        self.tape.locate(self.index)
+        cells = [self.tape.intern(val) for val in self.tape]
+        start = _normalize(self.condition, -self.tape.center, self.index, cells)
+        _init(self._transitions(), self.accepting)
+
+        if depth_first:
+            if max_steps is None:
+                raise ValueError('max_steps is required for depth-first search')
+            if workers != 0:
+                raise ValueError('depth-first search runs only in this process')
+            return self._depth_first(start, max_steps, max_frontier)
+        return self._breadth_first(start, max_steps, max_frontier, workers)
+
+    def _breadth_first(self, start, max_steps, max_frontier, workers):
+        frontier = [start]
+        visited = {fingerprint(start)}
+        pool = None
+        if workers != 0:
+            workers = workers or os.cpu_count()
+            pool = ProcessPoolExecutor(workers, initializer=_init, initargs=_worker)
+
+        try:
+            for depth in itertools.count():
+                if not frontier:
+                    return SearchResult(SearchStatus.rejected, depth, len(visited))
+                if max_steps is not None and depth >= max_steps:
+                    return SearchResult(SearchStatus.max_steps, depth, len(visited))
+
+                if pool is not None and len(frontier) >= MIN_PARALLEL_FRONTIER:
+                    size = -(-len(frontier) // (workers * CHUNKS_PER_WORKER))
+                    chunks = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+                    expanded = pool.map(_expand, chunks)
+                else:
+                    expanded = map(_expand, ([config] for config in frontier))
+
+                frontier = []
+                for successors, accepted in expanded:
+                    if accepted is not None:
+                        self._accept(accepted, depth + 1)
+                        return SearchResult(SearchStatus.accepted, depth + 1, len(visited))
+                    for config in successors:
+                        key = fingerprint(config)
+                        if key not in visited:
+                            visited.add(key)
+                            frontier.append(config)
+                    if len(frontier) > max_frontier:
+                        return SearchResult(SearchStatus.max_frontier, depth + 1, len(visited))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _depth_first(self, start, max_steps, max_frontier):
+        # shallowest depth of every visited configuration
+        visited = {fingerprint(start): 0}
+        stack = [(start, 0)]
+        deepest = 0
+        cut = False
+        while stack:
+            config, depth = stack.pop()
+            successors, accepted = _expand([config])
+            if depth == max_steps:
+                cut = cut or bool(successors) or accepted is not None
+                continue
+            if accepted is not None:
+                self._accept(accepted, depth + 1)
+                return SearchResult(SearchStatus.accepted, depth + 1, len(visited))
+
+            deepest = max(deepest, depth + 1)
+            for config in reversed(successors):
+                key = fingerprint(config)
+                if visited.get(key, max_steps + 1) > depth + 1:
+                    visited[key] = depth + 1
+                    stack.append((config, depth + 1))
+            if len(stack) > max_frontier:
+                return SearchResult(SearchStatus.max_frontier, deepest, len(visited))
+
+        status = SearchStatus.max_steps if cut else SearchStatus.rejected
+        return SearchResult(status, deepest, len(visited))
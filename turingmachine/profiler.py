@@ -0,0 +1,201 @@
+"""
+Module providing execution profiler of TuringMachine
+
+Profile takes place of the log of the machine(see ExecutionLog) while
+it is profiled, so it works in every run mode and costs nothing when
+it is not used. Every logged rule id increments hit counter of the rule,
+head position is followed by shifts of the rules to count extent of the
+head and reversals of its direction. Wall time could be sampled every
+sample_every steps, it is attributed to the condition of the sampled step.
+
+Usage:
+    >>> from turingmachine import machine
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 1 q1 R,B q1 -> 1 back L,1 back -> 1 back L,B back -> 1 STOP')
+    >>> with profile(tm) as prof:
+    ...     tm.run()
+    RunResult(status=<RunStatus.halted: 1>, steps=8)
+    >>> print(prof.table())
+    rule                     hits  share
+    1 q1 -> 1 q1 R              3  37.5%
+    1 back -> 1 back L          3  37.5%
+     q1 -> 1 back L             1  12.5%
+     back -> 1 back STOP        1  12.5%
+    <BLANKLINE>
+    condition   hits  share  seconds
+    q1             4  50.0%        -
+    back           4  50.0%        -
+    <BLANKLINE>
+    steps: 8, extent: [-1, 3], reversals: 1
+"""
+
+import json
+import time
+from array import array
+from contextlib import contextmanager
+
+# head shift of every move character
+SHIFTS = {
+    'R': 1,
+    'L': -1,
+    }
+
+
+class Profile:
+    """Execution profile of a TuringMachine, collected in place of its log
+
+    Attributes:
+        enabled: always True, so moves are passed to the profile
+        size: size of the log replaced by the profile
+        hits: hit counter of every rule id
+        steps: amount of profiled steps
+        index: head index after the last profiled step
+        extent: [lowest, highest] head index reached
+        reversals: amount of changes of direction of the head
+        seconds: sampled wall time of every condition, None if
+        time is not sampled
+        sample_every: amount of steps between samples of wall time
+    """
+
+    enabled = True
+
+    def __init__(self, tm, sample_every=None):
+        self.tm = tm
+        self.size = tm._log.size
+        self.sample_every = sample_every
+        self.hits = array('Q')
+        self._shifts = []
+        self.steps = 0
+        self.index = tm.index
+        self.extent = [tm.index, tm.index]
+        self.reversals = 0
+        self._direction = 0
+        self.seconds = None if sample_every is None else {}
+        self._sampled = time.perf_counter()
+        self._update()
+
+    def _update(self):
+        """Add counters of rules added to the machine"""
+        tm = self.tm
+        for key in tm._rule_keys[len(self.hits):]:
+            self._shifts.append(SHIFTS.get(tm._rules[key][2], 0))
+            self.hits.append(0)
+
+    def append(self, rule_id):
+        self.steps += 1
+        if rule_id >= len(self.hits):
+            self._update()
+        self.hits[rule_id] += 1
+
+        shift = self._shifts[rule_id]
+        if shift:
+            self.index += shift
+            if shift != self._direction:
+                if self._direction:
+                    self.reversals += 1
+                self._direction = shift
+            if self.index < self.extent[0]:
+                self.extent[0] = self.index
+            elif self.index > self.extent[1]:
+                self.extent[1] = self.index
+
+        if self.sample_every is not None and not self.steps % self.sample_every:
+            now = time.perf_counter()
+            condition = self.tm._rule_keys[rule_id][1]
+            self.seconds[condition] = self.seconds.get(condition, 0) + now - self._sampled
+            self._sampled = now
+
+    def extend(self, rule_ids):
+        for rule_id in rule_ids:
+            self.append(rule_id)
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+    def rule_hits(self):
+        """Get (rule, hits) pairs of rules sorted by hits, rules
+        are rendered by default_log of the machine"""
+        tm = self.tm
+        rules = []
+        for rule_id, hits in enumerate(self.hits):
+            key = tm._rule_keys[rule_id]
+            rules.append((tm.default_log(*key, *tm._rules[key]), hits))
+        return sorted(rules, key=lambda rule: -rule[1])
+
+    def condition_hits(self):
+        """Get (condition, hits) pairs sorted by hits"""
+        conditions = {}
+        for rule_id, hits in enumerate(self.hits):
+            condition = self.tm._rule_keys[rule_id][1]
+            conditions[condition] = conditions.get(condition, 0) + hits
+        return sorted(conditions.items(), key=lambda condition: -condition[1])
+
+    def _share(self, hits):
+        return '{:.1%}'.format(hits / self.steps if self.steps else 0)
+
+    def table(self):
+        """Get report of the profile as text tables sorted by hits"""
+        rules = self.rule_hits()
+        width = max([len('rule')] + [len(rule) for rule, _ in rules])
+        lines = ['{:<{}} {:>8} {:>6}'.format('rule', width, 'hits', 'share')]
+        for rule, hits in rules:
+            lines.append('{:<{}} {:>8} {:>6}'.format(rule, width, hits, self._share(hits)))
+
+        conditions = self.condition_hits()
+        width = max([len('condition')] + [len(condition) for condition, _ in conditions])
+        lines.append('')
+        lines.append('{:<{}} {:>6} {:>6} {:>8}'.format('condition', width, 'hits', 'share', 'seconds'))
+        for condition, hits in conditions:
+            seconds = '-'
+            if self.seconds is not None:
+                seconds = '{:.6f}'.format(self.seconds.get(condition, 0))
+            lines.append('{:<{}} {:>6} {:>6} {:>8}'.format(
+                condition, width, hits, self._share(hits), seconds
+                ))
+
+        lines.append('')
+        lines.append('steps: {}, extent: [{}, {}], reversals: {}'.format(
+            self.steps, *self.extent, self.reversals
+            ))
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        """Get report of the profile as a dict of JSON types"""
+        seconds = self.seconds or {}
+        return {
+            'steps': self.steps,
+            'extent': list(self.extent),
+            'reversals': self.reversals,
+            'rules': [{'rule': rule, 'hits': hits} for rule, hits in self.rule_hits()],
+            'conditions': [
+                {'condition': condition, 'hits': hits, 'seconds': seconds.get(condition)}
+                for condition, hits in self.condition_hits()
+                ],
+            }
+
+    def to_json(self, **kwargs):
+        """Get report of the profile as JSON, kwargs are passed to json.dumps"""
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+@contextmanager
+def profile(tm, sample_every=None):
+    """Profile runs of tm inside the with block, log of tm is
+    replaced by the profile and restored after the block
+    Arguments:
+        sample_every: amount of steps between samples of wall time
+        of conditions, time is not sampled if None
+    Yields:
+        Profile"""
+    log = tm._log
+    prof = Profile(tm, sample_every=sample_every)
+    tm._log = prof
+    try:
+        yield prof
+    finally:
+        tm._log = log
@@ -0,0 +1,274 @@
+"""
+Module providing streaming loading of rule files of TuringMachine
+
+Rule files are parsed line by line straight into the rule table of
+the machine in one pass, move functions are bound once for all of the
+rules. Parsed rules could be cached on disk as an interned table of
+symbols, conditions and codes, which is keyed by path, size, mtime and
+content hash of the rule file, so later loads of the same file skip parsing.
+
+Cache layout(all numbers are little-endian):
+    header: magic b'TMRC', version, size and mtime in nanoseconds
+    of the rule file, blake2b digest of its content
+    symbols, conditions: length of utf-8 strings joined by newlines
+    and the strings, they come from lines, so they have no newlines
+    rules: amount and (val, condition, next_val, next_condition, move) codes
+
+Usage:
+    >>> import os, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> path = os.path.join(directory, 'tm.txt')
+    >>> with open(path, 'w') as file:
+    ...     _ = file.write('1,1,1:::q1\\n1 q1 -> 0 q1 R\\nB q1 -> 1 STOP\\n')
+    >>> tm = machine.TuringMachine.from_file(path, cache_dir=directory)
+    >>> tm = machine.TuringMachine.from_file(path, cache_dir=directory)
+    >>> tm.run()
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> tm.tape
+    Tape(['0', '0', '0', '1'])
+"""
+
+import gc
+import hashlib
+import os
+import struct
+from array import array
+from contextlib import contextmanager
+
+from turingmachine import machine
+from turingmachine.checkpoint import _write_array, _read_array, _read_count
+
+MAGIC = b'TMRC'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBQQ16s')
+COUNT = struct.Struct('<Q')
+
+MOVES = ('R', 'L', 'S', 'STOP')
+
+# size of chunks the rule file is hashed by
+HASH_CHUNK = 1 << 20
+
+
+def parse_rules(lines, delimiter=' ', rules_delimiter=',', empty=None, default=''):
+    """Get (val, condition, next_val, next_condition, move) of every
+    rule of lines in rule_str format, many rules could be on a line
+    Arguments:
+        empty: sign of the default value in vals of rules, replaced by default
+    """
+    for line in lines:
+        for elem in line.rstrip('\r\n').split(rules_delimiter):
+            if not elem:
+                continue
+            parts = elem.split(delimiter)
+            if len(parts) == 5 and parts[4] == 'STOP':
+                val, cond, _, next_val, move = parts
+                next_cond = cond
+            elif len(parts) == 6:
+                val, cond, _, next_val, next_cond, move = parts
+            else:
+                raise ValueError(f"wrong rule: '{elem}'")
+            if val == empty:
+                val = default
+            yield val, cond, next_val, next_cond, move
+
+
+@contextmanager
+def _paused_gc():
+    """Pause garbage collection, which would walk
+    over the growing rule table again and again"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def add_rules(tm, rules):
+    """Add (val, condition, next_val, next_condition, move) rules of
+    strings to tm in one pass, machines with their own set_rule
+    get rules one by one through it
+    Returns:
+        amount of rules added"""
+    with _paused_gc():
+        if type(tm).set_rule is not machine.TuringMachine.set_rule:
+            added = 0
+            for rule in rules:
+                tm.set_rule(*rule)
+                added += 1
+            return added
+
+        tm._own_rules()
+        table, ids, keys = tm._rules, tm._rule_ids, tm._rule_keys
+        start = len(keys)
+        for val, cond, next_val, next_cond, move in rules:
+            if move not in MOVES:
+                tm._move_char_to_func(move)
+            to = (next_val, next_cond, move)
+            key = (val, cond)
+            check = table.get(key)
+            if check is None:
+                table[key] = to
+                ids[key] = len(keys)
+                keys.append(key)
+            elif check != to:
+                raise machine.RuleExistsError(val, cond)
+
+        tm._compiled = None
+        return len(keys) - start
+
+
+def add_columns(tm, columns):
+    """Add rules given as (vals, conditions, next_vals, next_conditions, moves)
+    columns to tm, a machine without rules is filled in bulk unless
+    there are repeated rules, see add_rules
+    Returns:
+        amount of rules added"""
+    with _paused_gc():
+        if type(tm).set_rule is machine.TuringMachine.set_rule and not tm._rules:
+            vals, conds, next_vals, next_conds, moves = columns
+            new_keys = list(zip(vals, conds))
+            moves = list(moves)
+            for move in set(moves).difference(MOVES):
+                tm._move_char_to_func(move)
+            new = dict(zip(new_keys, zip(next_vals, next_conds, moves)))
+            if len(new) == len(new_keys):
+                tm._own_rules()
+                tm._rules.update(new)
+                tm._rule_ids.update(zip(new_keys, range(len(tm._rule_keys), len(tm._rule_keys) + len(new_keys))))
+                tm._rule_keys.extend(new_keys)
+                tm._compiled = None
+                return len(new_keys)
+        return add_rules(tm, zip(*columns))
+
+
+def _own_syntax(tm):
+    """Check that tm parses rule strings of its own syntax"""
+    return type(tm).rule_str is not machine.TuringMachine.rule_str
+
+
+def load_rules(tm, file, delimiter=' ', rules_delimiter=','):
+    """Parse rules from lines of an open file into tm, see parse_rules,
+    lines are passed to rule_str of machines with their own syntax
+    Returns:
+        amount of rules added"""
+    if _own_syntax(tm):
+        added = len(tm._rule_keys)
+        for line in file:
+            line = line.rstrip('\r\n')
+            if line:
+                tm.rule_str(line, delimiter=delimiter, rules_delimiter=rules_delimiter)
+        return len(tm._rule_keys) - added
+
+    return add_rules(tm, parse_rules(
+        file, delimiter=delimiter, rules_delimiter=rules_delimiter,
+        empty=tm.EMPTY_SIGN, default=tm.default
+        ))
+
+
+def file_digest(path):
+    """Get blake2b digest of content of the file at path"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def cache_path(path, cache_dir, *options):
+    """Get path of the cache of the rule file at path in cache_dir,
+    options the file is parsed with are a part of the key"""
+    key = '\0'.join([os.path.abspath(path), *map(str, options)])
+    return os.path.join(cache_dir, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '.tmrc')
+
+
+def _write_table(file, strings):
+    data = '\n'.join(strings).encode()
+    file.write(COUNT.pack(len(data)))
+    file.write(data)
+
+
+def _read_table(file):
+    data = file.read(_read_count(file))
+    return data.decode().split('\n') if data else []
+
+
+def save_cache(rules, path, cache):
+    """Save rules as the interned table into the cache file of the rule
+    file at path, it is written into a temporary file and replaced"""
+    symbols, conditions = {}, {}
+    codes = array('I')
+    for val, cond, next_val, next_cond, move in rules:
+        codes.extend((
+            symbols.setdefault(val, len(symbols)), conditions.setdefault(cond, len(conditions)),
+            symbols.setdefault(next_val, len(symbols)), conditions.setdefault(next_cond, len(conditions)),
+            MOVES.index(move)
+            ))
+
+    stat = os.stat(path)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    temp = f'{cache}.{os.getpid()}.tmp'
+    with open(temp, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, stat.st_size, stat.st_mtime_ns, file_digest(path)))
+        _write_table(file, symbols)
+        _write_table(file, conditions)
+        file.write(COUNT.pack(len(codes) // 5))
+        _write_array(file, codes)
+    os.replace(temp, cache)
+
+
+def load_cache(path, cache):
+    """Load rules from the cache file of the rule file at path
+    Returns:
+        (vals, conditions, next_vals, next_conditions, moves) columns of
+        rules, None if there is no cache or it is stale or damaged"""
+    try:
+        with open(cache, 'rb') as file:
+            magic, version, size, mtime, digest = HEADER.unpack(file.read(HEADER.size))
+            stat = os.stat(path)
+            if (
+                    magic != MAGIC or version != VERSION or size != stat.st_size
+                    or mtime != stat.st_mtime_ns or digest != file_digest(path)
+                    ):
+                return None
+            symbols = _read_table(file)
+            conditions = _read_table(file)
+            codes = _read_array(file, 'I', 5 * _read_count(file))
+    except (OSError, struct.error, EOFError, UnicodeDecodeError):
+        return None
+
+    try:
+        with _paused_gc():
+            return (
+                list(map(symbols.__getitem__, codes[0::5])), list(map(conditions.__getitem__, codes[1::5])),
+                list(map(symbols.__getitem__, codes[2::5])), list(map(conditions.__getitem__, codes[3::5])),
+                list(map(MOVES.__getitem__, codes[4::5]))
+                )
+    except IndexError:
+        return None
+
+
+def load_file_rules(tm, file, path, cache_dir=None, delimiter=' ', rules_delimiter=','):
+    """Load rules of the rest of the open rule file at path into tm,
+    from its cache in cache_dir if it is up to date, cache is
+    written after parsing otherwise, it is not used if cache_dir is None
+    or tm has its own rule syntax
+    Returns:
+        amount of rules added"""
+    if cache_dir is None or _own_syntax(tm):
+        return load_rules(tm, file, delimiter=delimiter, rules_delimiter=rules_delimiter)
+
+    cache = cache_path(path, cache_dir, delimiter, rules_delimiter, tm.EMPTY_SIGN, tm.default)
+    columns = load_cache(path, cache)
+    if columns is not None:
+        return add_columns(tm, columns)
+
+    rules = list(parse_rules(
+        file, delimiter=delimiter, rules_delimiter=rules_delimiter,
+        empty=tm.EMPTY_SIGN, default=tm.default
+        ))
+    added = add_rules(tm, rules)
+    save_cache(rules, path, cache)
+    return added
@@ -0,0 +1,111 @@
+"""
+Module providing streaming runs of TuringMachine on a StreamTape
+
+Input cells are pulled from a reader or an iterator only when the
+head reaches them(see tape module). While no rule reachable from the
+current condition moves the head left, cells left of the head are
+never revisited, so they are flushed to the sink of the tape and
+a transducer moving on to the right runs in bounded memory.
+
+Usage:
+    >>> import io
+    >>> from functools import partial
+    >>> output = []
+    >>> tape_cls = partial(StreamTape, sink=output.extend)
+    >>> tm = machine.TuringMachine(read_cells(io.StringIO('abba')), 'q1', tape_cls=tape_cls)
+    >>> tm.rule_str('a q1 -> b q1 R,b q1 -> a q1 R')
+    >>> tm.set_rule('', 'q1', '.', 'q1', 'STOP')
+    >>> run_streaming(tm)
+    RunResult(status=<RunStatus.halted: 1>, steps=5)
+    >>> ''.join(output)
+    'baab.'
+"""
+
+import time
+
+from turingmachine import machine
+from turingmachine.tape import StreamTape, CHUNK_SIZE
+
+# amount of steps between flushes of the tape
+FLUSH_EVERY = 4096
+
+# moves, which never move the head left
+FORWARD_MOVES = ('R', 'S', 'STOP')
+
+
+def read_cells(reader, size=CHUNK_SIZE):
+    """Get iterator of characters of a file or socket-like reader,
+    which is read by size characters at a time, bytes are read as latin-1"""
+    while True:
+        data = reader.read(size)
+        if not data:
+            return
+        if isinstance(data, bytes):
+            data = data.decode('latin-1')
+        yield from data
+
+
+def file_sink(file, delimiter=''):
+    """Get sink writing flushed values into a file separated by delimiter"""
+    def sink(vals):
+        file.write(delimiter.join(vals) + delimiter)
+    return sink
+
+
+def forward_only(tm, condition=None):
+    """Check that no rule reachable from condition moves the head
+    left, so cells left of the head are never revisited
+    Arguments:
+        condition: start condition, current condition of tm if None"""
+    rules = {}
+    for (_, cond), (_, next_cond, move) in tm._rule_items():
+        rules.setdefault(cond, []).append((next_cond, move in FORWARD_MOVES))
+
+    start = tm.condition if condition is None else condition
+    reached = {start}
+    stack = [start]
+    while stack:
+        for next_cond, forward in rules.get(stack.pop(), ()):
+            if not forward:
+                return False
+            if next_cond not in reached:
+                reached.add(next_cond)
+                stack.append(next_cond)
+    return True
+
+
+def run_streaming(tm, max_steps=None, max_seconds=None, flush_every=FLUSH_EVERY):
+    """Run tm on its StreamTape, flushing cells left of the head every
+    flush_every steps while they are never revisited, and all of the
+    used cells when the machine is stopped
+    Arguments:
+        max_steps: maximum amount of steps to make
+        max_seconds: maximum wall-clock time of the run
+    Returns:
+        RunResult"""
+    if not isinstance(tm.tape, StreamTape):
+        raise machine.TuringMachineError(f'streaming runs only on StreamTape, not {type(tm.tape).__name__}')
+
+    start = tm.steps
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    # forward_only of every condition reached
+    forward = {}
+    while not tm.stopped:
+        amount = flush_every
+        if max_steps is not None:
+            left = max_steps - (tm.steps - start)
+            if left <= 0:
+                return machine.RunResult(machine.RunStatus.max_steps, tm.steps - start)
+            amount = min(amount, left)
+
+        tm.run(max_steps=amount)
+
+        if tm.condition not in forward:
+            forward[tm.condition] = forward_only(tm)
+        if forward[tm.condition]:
+            tm.tape.flush(tm.index)
+        if deadline is not None and time.monotonic() >= deadline:
+            return machine.RunResult(machine.RunStatus.max_seconds, tm.steps - start)
+
+    tm.tape.flush()
+    return machine.RunResult(machine.RunStatus.halted, tm.steps - start)
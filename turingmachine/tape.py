@@ -0,0 +1,916 @@
+"""
+Module providing tapes for TuringMachine
+
+Tape stores cells as interned symbol codes in a contiguous array,
+which grows twice at the end the head has run off, so reads and
+writes are O(1) at any position.
+
+RunTape stores runs of equal cells as (code, count) pairs, which
+are split and merged on writes, so tapes made of long runs take
+O(runs) memory and can be snapshotted in O(runs).
+
+PagedTape stores cells in fixed-size pages, which are shared by
+forks and snapshots of the tape and copied only when they are written,
+so a fork costs O(pages) and memory grows with the pages it touches.
+
+StreamTape pulls input cells from an iterator only when they are
+reached, and drops cells flushed to a sink, so a machine, which moves
+on in one direction, runs in bounded memory(see stream module).
+
+MmapTape stores one or two byte codes of Tape cells in a memory-mapped
+file, which is remapped when the head runs off either end, so tapes
+could be larger than RAM. Its metadata is kept next to the file, so
+a finished tape could be reopened without loading it.
+
+Usage:
+    >>> tape = Tape(['1', '2', '3'])
+    >>> tape.read(-2)
+    ''
+    >>> tape.write(4, 'x')
+    >>> tape
+    Tape(['', '', '1', '2', '3', '', 'x'])
+    >>> tape.center
+    2
+    >>> tape[2:4]
+    ['1', '2']
+    >>> tape = RunTape(['1'] * 1000)
+    >>> tape.write(500, '0')
+    >>> tape.runs()
+    [('1', 500), ('0', 1), ('1', 499)]
+    >>> tape = PagedTape(['1'] * 1000, page_size=256)
+    >>> child = tape.fork()
+    >>> child.write(500, '0')
+    >>> child.read(500), tape.read(500)
+    ('0', '1')
+    >>> child.shared_pages()
+    3
+    >>> tape = MmapTape(['1', '2'])
+    >>> tape.write(-3, 'x')
+    >>> tape, tape.typecode
+    (MmapTape(['x', '', '', '1', '2']), 'B')
+"""
+
+import itertools
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+
+# array typecodes used for codes, in order of widening
+TYPECODES = (
+    ('B', 0xff),
+    ('H', 0xffff),
+    ('I', 0xffffffff),
+    )
+
+# amount of cells in a page of PagedTape
+PAGE_SIZE = 4096
+
+# amount of cells pulled at once by StreamTape
+CHUNK_SIZE = 4096
+
+# typecodes of MmapTape and amount of cells it starts with
+MMAP_TYPECODES = TYPECODES[:2]
+MMAP_CELLS = 4096
+
+# amount of bytes written at once by MmapTape when cells are moved or cleared
+MMAP_CHUNK = 1 << 24
+
+
+class Tape:
+    """Bidirectionally growable tape of interned symbol codes
+
+    Indexing and iteration of the tape go over used cells
+    from the leftmost one, like on a plain sequence.
+    Use read and write for indexing relative to the center.
+
+    Attributes:
+        symbols: interned symbols, code of the symbol is its index
+        codes: symbol to code mapping
+        default: default value of empty cell, its code is always 0
+        center: position of the zero cell among used cells
+        _buf: array of codes, cells outside of used ones are default
+        _start: first used cell of _buf
+        _end: cell after the last used one of _buf
+        _zero: cell of _buf with zero index
+    """
+
+    def __init__(self, vals=(), default=''):
+        self.default = default
+        self.symbols = [default]
+        self.codes = {default: 0}
+        self._buf = array('B')
+        self.reset(vals)
+
+    def reset(self, vals=()):
+        """Replace cells of the tape by vals, keeping interned symbols"""
+        codes = [self.intern(val) for val in vals]
+        if not codes:
+            codes.append(0)
+
+        self._buf = array(self._buf.typecode, codes)
+        self._start = 0
+        self._end = len(self._buf)
+        self._zero = 0
+
+    def _typecode(self):
+        """Get the narrowest typecode to hold all of the codes"""
+        for typecode, limit in TYPECODES:
+            if len(self.symbols) - 1 <= limit:
+                return typecode
+        raise OverflowError('too many symbols on the tape')
+
+    def intern(self, symbol):
+        """Get code of the symbol, adding it if it is new"""
+        code = self.codes.get(symbol)
+        if code is None:
+            code = self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if self._typecode() != self._buf.typecode:
+                self._buf = array(self._typecode(), self._buf)
+        return code
+
+    @property
+    def typecode(self):
+        """Array typecode of the codes"""
+        return self._buf.typecode
+
+    def _blank(self, size):
+        """Get array of size default cells"""
+        return array(self._buf.typecode, bytes(size * self._buf.itemsize))
+
+    def _grow(self, pos):
+        """Grow _buf at least twice for it to contain cell pos
+        Returns:
+            amount of cells added to the left"""
+        size = len(self._buf)
+        if pos < 0:
+            added = max(size, -pos)
+            self._buf = self._blank(added) + self._buf
+            self._start += added
+            self._end += added
+            self._zero += added
+            return added
+
+        self._buf.extend(self._blank(max(size, pos - size + 1)))
+        return 0
+
+    def locate(self, index):
+        """Make cell with index used
+        Returns:
+            position of the cell in _buf"""
+        pos = self._zero + index
+        if pos < self._start or pos >= self._end:
+            if pos < 0 or pos >= len(self._buf):
+                pos += self._grow(pos)
+            if pos < self._start:
+                self._start = pos
+            else:
+                self._end = pos + 1
+        return pos
+
+    def read(self, index):
+        pos = self.locate(index)
+        return self.symbols[self._buf[pos]]
+
+    def write(self, index, value):
+        code = self.intern(value)
+        pos = self.locate(index)
+        self._buf[pos] = code
+
+    def read_code(self, index):
+        pos = self.locate(index)
+        return self._buf[pos]
+
+    def write_code(self, index, code):
+        pos = self.locate(index)
+        self._buf[pos] = code
+
+    def snapshot(self):
+        """Get snapshot of the cells with a bulk copy, see restore"""
+        return self._buf[self._start:self._end], self._start - self._zero
+
+    def restore(self, snapshot):
+        """Restore cells from snapshot of this tape"""
+        cells, first = snapshot
+        if cells.typecode == self._buf.typecode:
+            self._buf = cells[:]
+        else:
+            self._buf = array(self._buf.typecode, cells)
+        self._start = 0
+        self._end = len(self._buf)
+        self._zero = -first
+
+    def fork(self):
+        """Get a copy of the tape with a bulk copy of used cells"""
+        tape = type(self).__new__(type(self))
+        tape.default = self.default
+        tape.symbols = list(self.symbols)
+        tape.codes = dict(self.codes)
+        tape._buf, first = self.snapshot()
+        tape._start = 0
+        tape._end = len(tape._buf)
+        tape._zero = -first
+        return tape
+
+    def _get_center(self):
+        return self._zero - self._start
+
+    def _set_center(self, center):
+        self._zero = self._start + center
+
+    center = property(_get_center, _set_center)
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __iter__(self):
+        return map(self.symbols.__getitem__, self._buf[self._start:self._end])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self.symbols.__getitem__, self._buf[self._start:self._end][index]))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        return self.symbols[self._buf[self._start + index]]
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        code = self.intern(value)
+        self._buf[self._start + index] = code
+
+    def __eq__(self, other):
+        if isinstance(other, Tape) and self.symbols == other.symbols:
+            return self._buf[self._start:self._end] == other._buf[other._start:other._end]
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'Tape({})'.format(list(self))
+
+    __str__ = __repr__
+
+
+class StreamTape(Tape):
+    """Tape of Tape cells, which pulls input cells from an iterator
+    when they are reached and could flush cells to a sink
+
+    Input cells start from the zero cell, cells, which were
+    not pulled yet, are not used. Flushed cells are dropped
+    and could not be accessed any more.
+
+    Attributes:
+        chunk_size: amount of input cells pulled at once
+        sink: function called with list of flushed values, or None
+        _source: iterator of input cells, None when it is exhausted
+        _read: amount of pulled input cells
+        _flushed: index of the leftmost cell, which is not flushed
+    """
+
+    def __init__(self, vals=(), default='', chunk_size=CHUNK_SIZE, sink=None):
+        """
+        Arguments:
+            vals: iterable of input cells, read lazily
+        """
+        self.chunk_size = chunk_size
+        self.sink = sink
+        super().__init__(vals, default=default)
+
+    def reset(self, vals=()):
+        """Replace input of the tape by vals, keeping interned symbols"""
+        self._buf = array(self._buf.typecode)
+        self._start = self._end = self._zero = 0
+        self._source = iter(vals)
+        self._read = 0
+        self._flushed = None
+
+    def _pull(self, index):
+        """Pull input cells till cell with index"""
+        while self._source is not None and self._read <= index:
+            size = max(self.chunk_size, index - self._read + 1)
+            vals = list(itertools.islice(self._source, size))
+            if len(vals) < size:
+                self._source = None
+            if not vals:
+                break
+
+            codes = [self.intern(val) for val in vals]
+            super().locate(self._read + len(codes) - 1)
+            pos = self._zero + self._read
+            self._buf[pos:pos + len(codes)] = array(self._buf.typecode, codes)
+            self._read += len(codes)
+
+    def locate(self, index):
+        if index >= self._read and self._source is not None:
+            self._pull(index)
+        if self._flushed is not None and index < self._flushed:
+            raise IndexError(f'cell {index} is already flushed')
+        return super().locate(index)
+
+    def flush(self, index=None):
+        """Send values of used cells left of cell with index to
+        the sink and drop them, all used cells if index is None"""
+        end = self._end if index is None else max(self._start, min(self._zero + index, self._end))
+        if self.sink is not None and end > self._start:
+            self.sink(list(map(self.symbols.__getitem__, self._buf[self._start:end])))
+
+        self._flushed = end - self._zero
+        del self._buf[:end]
+        self._zero -= end
+        self._start = 0
+        self._end -= end
+
+    def fork(self):
+        raise TypeError('StreamTape could not be forked')
+
+
+class MmapTape(Tape):
+    """Tape of Tape cells, which codes are stored in a memory-mapped file
+
+    Codes are one byte long, two bytes long when there are more than
+    256 symbols. Slices of _buf are views of the file, not copies.
+
+    Attributes:
+        path: file of the tape, None for an anonymous temporary file,
+        metadata is written into path + '.json' by sync and close
+        _file: open file of the tape
+        _map: mmap of the file
+        _typecode: typecode of the codes
+        _buf: memoryview of _map cast to _typecode
+    """
+
+    def __init__(self, vals=(), default='', path=None):
+        """
+        Arguments:
+            path: file to store the tape in, it is overwritten
+        """
+        self.default = default
+        self.symbols = [default]
+        self.codes = {default: 0}
+        self.path = path
+        self._typecode = MMAP_TYPECODES[0][0]
+        if path is None:
+            self._file = tempfile.TemporaryFile()
+        else:
+            self._file = open(path, 'w+b')
+        self._map = None
+        self._map_cells(MMAP_CELLS)
+        self.reset(vals)
+
+    @classmethod
+    def open(cls, path):
+        """Reopen tape saved at path by sync or close,
+        cells are not loaded until they are accessed"""
+        with open(path + '.json') as file:
+            meta = json.load(file)
+
+        tape = cls.__new__(cls)
+        tape.default = meta['symbols'][0]
+        tape.symbols = meta['symbols']
+        tape.codes = {symbol: code for code, symbol in enumerate(tape.symbols)}
+        tape.path = path
+        tape._typecode = meta['typecode']
+        tape._file = open(path, 'r+b')
+        tape._map = None
+        tape._map_cells(os.path.getsize(path) // array(tape._typecode).itemsize)
+        tape._start, tape._end, tape._zero = meta['start'], meta['end'], meta['zero']
+        return tape
+
+    def _map_cells(self, size):
+        """Resize the file to size cells and map it"""
+        if self._map is not None:
+            self._buf.release()
+            self._map.resize(size * array(self._typecode).itemsize)
+        else:
+            self._file.truncate(size * array(self._typecode).itemsize)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        self._buf = memoryview(self._map).cast(self._typecode)
+
+    def _clear(self, start, end):
+        """Set bytes [start, end) of the file to zero"""
+        for pos in range(start, end, MMAP_CHUNK):
+            size = min(MMAP_CHUNK, end - pos)
+            self._map[pos:pos + size] = bytes(size)
+
+    @property
+    def typecode(self):
+        return self._typecode
+
+    def reset(self, vals=()):
+        """Replace cells of the tape by vals, keeping interned symbols"""
+        self._map_cells(MMAP_CELLS)
+        self._clear(0, len(self._map))
+        self._start = self._end = self._zero = 0
+        vals = iter(vals)
+        while True:
+            codes = [self.intern(val) for val in itertools.islice(vals, CHUNK_SIZE)]
+            if not codes:
+                break
+            pos = self.locate(self._end + len(codes) - 1) - len(codes) + 1
+            self._buf[pos:pos + len(codes)] = array(self._typecode, codes)
+        self.locate(0)
+
+    def intern(self, symbol):
+        """Get code of the symbol, adding it if it is new"""
+        code = self.codes.get(symbol)
+        if code is None:
+            if len(self.symbols) > MMAP_TYPECODES[-1][1]:
+                raise OverflowError('too many symbols on the tape')
+            code = self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if code > MMAP_TYPECODES[0][1] and self._typecode == MMAP_TYPECODES[0][0]:
+                self._widen()
+        return code
+
+    def _widen(self):
+        """Rewrite one byte codes of the file as two byte ones"""
+        narrow = self._typecode
+        size = len(self._buf)
+        self._buf.release()
+        self._typecode = MMAP_TYPECODES[1][0]
+        self._map.resize(size * array(self._typecode).itemsize)
+        self._buf = memoryview(self._map).cast(self._typecode)
+        # codes are widened from the end, so they are not overwritten before read
+        for end in range(size, 0, -MMAP_CHUNK):
+            start = max(end - MMAP_CHUNK, 0)
+            cells = array(narrow, self._map[start:end])
+            self._buf[start:end] = array(self._typecode, cells)
+
+    def _grow(self, pos):
+        """Grow the file at least twice for it to contain cell pos
+        Returns:
+            amount of cells added to the left"""
+        size = len(self._buf)
+        itemsize = self._buf.itemsize
+        if pos < 0:
+            added = max(size, -pos)
+            self._map_cells(size + added)
+            self._map.move(added * itemsize, 0, size * itemsize)
+            self._clear(0, added * itemsize)
+            self._start += added
+            self._end += added
+            self._zero += added
+            return added
+
+        self._map_cells(size + max(size, pos - size + 1))
+        return 0
+
+    def snapshot(self):
+        """Get snapshot of the cells copied into memory, see restore"""
+        return array(self._typecode, self._buf[self._start:self._end]), self._start - self._zero
+
+    def restore(self, snapshot):
+        """Restore cells from snapshot of this tape"""
+        cells, first = snapshot
+        self._map_cells(max(len(cells), MMAP_CELLS))
+        self._clear(0, len(self._map))
+        self._buf[:len(cells)] = array(self._typecode, cells)
+        self._start = 0
+        self._end = len(cells)
+        self._zero = -first
+
+    def fork(self):
+        """Get a copy of the tape in an anonymous temporary file"""
+        tape = type(self).__new__(type(self))
+        tape.default = self.default
+        tape.symbols = list(self.symbols)
+        tape.codes = dict(self.codes)
+        tape.path = None
+        tape._typecode = self._typecode
+        tape._file = tempfile.TemporaryFile()
+        self._map.flush()
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, tape._file)
+        tape._file.flush()
+        tape._map = None
+        tape._map_cells(len(self._buf))
+        tape._start, tape._end, tape._zero = self._start, self._end, self._zero
+        return tape
+
+    def __deepcopy__(self, memo):
+        return self.fork()
+
+    def __iter__(self):
+        # cells are copied by chunks, so no view of the file is kept
+        for start in range(self._start, self._end, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, self._end)
+            yield from map(self.symbols.__getitem__, self._buf[start:end].tolist())
+
+    def sync(self):
+        """Flush cells into the file and write metadata next to it"""
+        self._map.flush()
+        if self.path is not None:
+            meta = {
+                'symbols': self.symbols, 'typecode': self._typecode,
+                'start': self._start, 'end': self._end, 'zero': self._zero,
+                }
+            with open(self.path + '.json', 'w') as file:
+                json.dump(meta, file)
+
+    def close(self):
+        """Sync and close the file, the tape could not be used after it"""
+        self.sync()
+        self._buf.release()
+        self._map.close()
+        self._file.close()
+
+    def __repr__(self):
+        return 'MmapTape({})'.format(list(self))
+
+    __str__ = __repr__
+
+
+class RunTape:
+    """Bidirectionally growable tape of runs of equal symbol codes
+
+    Has the same interface as Tape. Cells are found from the run
+    accessed last, so access near the head is O(1) amortized.
+
+    Attributes:
+        symbols: interned symbols, code of the symbol is its index
+        codes: symbol to code mapping
+        default: default value of empty cell, its code is always 0
+        center: position of the zero cell among used cells
+        _runs: [code, count] runs of used cells from the leftmost one,
+        neighbouring runs have different codes
+        _first: index of the leftmost used cell
+        _len: amount of used cells
+        _run: index of the run accessed last in _runs
+        _run_start: index of the first cell of _run
+    """
+
+    def __init__(self, vals=(), default=''):
+        self.default = default
+        self.symbols = [default]
+        self.codes = {default: 0}
+        self.reset(vals)
+
+    def reset(self, vals=()):
+        """Replace cells of the tape by vals, keeping interned symbols"""
+        self._runs = []
+        for val in vals:
+            code = self.intern(val)
+            if self._runs and self._runs[-1][0] == code:
+                self._runs[-1][1] += 1
+            else:
+                self._runs.append([code, 1])
+        if not self._runs:
+            self._runs.append([0, 1])
+
+        self._first = 0
+        self._len = sum(count for _, count in self._runs)
+        self._run = 0
+        self._run_start = 0
+
+    def intern(self, symbol):
+        """Get code of the symbol, adding it if it is new"""
+        code = self.codes.get(symbol)
+        if code is None:
+            code = self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def locate(self, index):
+        """Make cell with index used
+        Returns:
+            position of the cell among used cells"""
+        runs = self._runs
+        if index < self._first:
+            added = self._first - index
+            if runs[0][0] == 0:
+                runs[0][1] += added
+            else:
+                runs.insert(0, [0, added])
+                self._run += 1
+            if self._run == 0:
+                self._run_start = index
+            self._first = index
+            self._len += added
+        elif index >= self._first + self._len:
+            added = index - self._first - self._len + 1
+            if runs[-1][0] == 0:
+                runs[-1][1] += added
+            else:
+                runs.append([0, added])
+            self._len += added
+        return index - self._first
+
+    def _find(self, index):
+        """Move to the run containing used cell with index
+        Returns:
+            index of the run in _runs"""
+        runs = self._runs
+        i, start = self._run, self._run_start
+        while index < start:
+            i -= 1
+            start -= runs[i][1]
+        while index >= start + runs[i][1]:
+            start += runs[i][1]
+            i += 1
+        self._run, self._run_start = i, start
+        return i
+
+    def read(self, index):
+        return self.symbols[self.read_code(index)]
+
+    def write(self, index, value):
+        self.write_code(index, self.intern(value))
+
+    def read_code(self, index):
+        self.locate(index)
+        return self._runs[self._find(index)][0]
+
+    def write_code(self, index, code):
+        self.locate(index)
+        runs = self._runs
+        i = self._find(index)
+        old, count = runs[i]
+        if old == code:
+            return
+
+        offset = index - self._run_start
+        new = [[old, offset]] if offset else []
+        new.append([code, 1])
+        if count - offset - 1:
+            new.append([old, count - offset - 1])
+        runs[i:i + 1] = new
+
+        # merge the new cell with neighbouring runs of the same code
+        i += 1 if offset else 0
+        start = index
+        if i + 1 < len(runs) and runs[i + 1][0] == code:
+            runs[i][1] += runs[i + 1][1]
+            del runs[i + 1]
+        if i > 0 and runs[i - 1][0] == code:
+            start -= runs[i - 1][1]
+            runs[i - 1][1] += runs[i][1]
+            del runs[i]
+            i -= 1
+        self._run, self._run_start = i, start
+
+    def runs(self):
+        """Get (symbol, count) runs of used cells from the leftmost one"""
+        return [(self.symbols[code], count) for code, count in self._runs]
+
+    def snapshot(self):
+        """Get snapshot of the cells in O(runs), see restore"""
+        return tuple(map(tuple, self._runs)), self._first
+
+    def restore(self, snapshot):
+        """Restore cells from snapshot of this tape"""
+        runs, self._first = snapshot
+        self._runs = [list(run) for run in runs]
+        self._len = sum(count for _, count in self._runs)
+        self._run = 0
+        self._run_start = self._first
+
+    def fork(self):
+        """Get a copy of the tape in O(runs)"""
+        tape = type(self).__new__(type(self))
+        tape.default = self.default
+        tape.symbols = list(self.symbols)
+        tape.codes = dict(self.codes)
+        tape.restore(self.snapshot())
+        return tape
+
+    def _get_center(self):
+        return -self._first
+
+    def _set_center(self, center):
+        shift = -center - self._first
+        self._first += shift
+        self._run_start += shift
+
+    center = property(_get_center, _set_center)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for code, count in self._runs:
+            yield from itertools.repeat(self.symbols[code], count)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        return self.read(self._first + index)
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        self.write(self._first + index, value)
+
+    def __eq__(self, other):
+        if isinstance(other, RunTape) and self.symbols == other.symbols:
+            return self._runs == other._runs
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'RunTape({})'.format(list(self))
+
+    __str__ = __repr__
+
+
+class PagedTape:
+    """Bidirectionally growable tape of pages of symbol codes
+    shared with its forks until they are written
+
+    Has the same interface as Tape. Pages, which were never
+    written, are not stored and are read as default cells.
+
+    Attributes:
+        symbols: interned symbols, code of the symbol is its index
+        codes: symbol to code mapping
+        default: default value of empty cell, its code is always 0
+        center: position of the zero cell among used cells
+        page_size: amount of cells in a page
+        _typecode: array typecode of all of the pages
+        _pages: page number to array of codes mapping, page n holds
+        cells with indexes from n * page_size
+        _owned: numbers of pages, which are not shared and
+        could be written in place
+        _first: index of the leftmost used cell
+        _last: index of the rightmost used cell
+    """
+
+    def __init__(self, vals=(), default='', page_size=PAGE_SIZE):
+        self.default = default
+        self.symbols = [default]
+        self.codes = {default: 0}
+        self.page_size = page_size
+        self._typecode = TYPECODES[0][0]
+        self.reset(vals)
+
+    def reset(self, vals=()):
+        """Replace cells of the tape by vals, keeping interned symbols"""
+        self._pages = {}
+        self._owned = set()
+        self._first = 0
+        self._last = 0
+        for index, val in enumerate(vals):
+            self.write(index, val)
+
+    def intern(self, symbol):
+        """Get code of the symbol, adding it if it is new"""
+        code = self.codes.get(symbol)
+        if code is None:
+            code = self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            for typecode, limit in TYPECODES:
+                if code <= limit:
+                    break
+            else:
+                raise OverflowError('too many symbols on the tape')
+            if typecode != self._typecode:
+                self._typecode = typecode
+                self._pages = {n: array(typecode, page) for n, page in self._pages.items()}
+                self._owned = set(self._pages)
+        return code
+
+    def locate(self, index):
+        """Make cell with index used
+        Returns:
+            position of the cell among used cells"""
+        if index < self._first:
+            self._first = index
+        elif index > self._last:
+            self._last = index
+        return index - self._first
+
+    def read(self, index):
+        return self.symbols[self.read_code(index)]
+
+    def write(self, index, value):
+        self.write_code(index, self.intern(value))
+
+    def read_code(self, index):
+        self.locate(index)
+        n, offset = divmod(index, self.page_size)
+        page = self._pages.get(n)
+        return 0 if page is None else page[offset]
+
+    def write_code(self, index, code):
+        self.locate(index)
+        n, offset = divmod(index, self.page_size)
+        if n not in self._owned:
+            page = self._pages.get(n)
+            if page is None:
+                if not code:
+                    return
+                page = array(self._typecode, bytes(self.page_size * array(self._typecode).itemsize))
+            else:
+                page = page[:]
+            self._pages[n] = page
+            self._owned.add(n)
+        self._pages[n][offset] = code
+
+    def shared_pages(self):
+        """Get amount of stored pages shared with forks or snapshots"""
+        return len(self._pages) - len(self._owned)
+
+    def snapshot(self):
+        """Get snapshot of the cells in O(pages), pages are shared
+        with the snapshot until they are written, see restore"""
+        self._owned = set()
+        return dict(self._pages), self._first, self._last
+
+    def restore(self, snapshot):
+        """Restore cells from snapshot of this tape"""
+        pages, self._first, self._last = snapshot
+        self._pages = dict(pages)
+        self._owned = set()
+
+    def fork(self):
+        """Get a copy of the tape in O(pages), which shares
+        pages with this tape until they are written"""
+        tape = type(self).__new__(type(self))
+        tape.default = self.default
+        tape.symbols = list(self.symbols)
+        tape.codes = dict(self.codes)
+        tape.page_size = self.page_size
+        tape._typecode = self._typecode
+        tape.restore(self.snapshot())
+        return tape
+
+    def _get_center(self):
+        return -self._first
+
+    def _set_center(self, center):
+        shift = -center - self._first
+        if shift % self.page_size:
+            # cells move across pages, so the pages are rebuilt
+            vals = list(self)
+            self.reset()
+            self._first = self._last = -center
+            for index, val in enumerate(vals, -center):
+                self.write(index, val)
+            return
+
+        pages = shift // self.page_size
+        self._pages = {n + pages: page for n, page in self._pages.items()}
+        self._owned = {n + pages for n in self._owned}
+        self._first += shift
+        self._last += shift
+
+    center = property(_get_center, _set_center)
+
+    def __len__(self):
+        return self._last - self._first + 1
+
+    def __iter__(self):
+        symbols = self.symbols
+        size = self.page_size
+        first, last = divmod(self._first, size), divmod(self._last, size)
+        for n in range(first[0], last[0] + 1):
+            start = first[1] if n == first[0] else 0
+            stop = last[1] + 1 if n == last[0] else size
+            page = self._pages.get(n)
+            if page is None:
+                yield from itertools.repeat(symbols[0], stop - start)
+            else:
+                yield from map(symbols.__getitem__, page[start:stop])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        return self.read(self._first + index)
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('tape index out of range')
+        self.write(self._first + index, value)
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return 'PagedTape({})'.format(list(self))
+
+    __str__ = __repr__
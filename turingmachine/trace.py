@@ -0,0 +1,373 @@
+"""
+Module providing binary traces of TuringMachine runs
+
+Trace recorder takes place of the log of the machine(see ExecutionLog)
+while it is recorded, so rule id of every move is appended to an
+array in every run mode. Run is made in batches of keyframe_every
+steps, full configuration of the machine is written as a keyframe
+after every batch, and rule ids of the batch are packed into the
+narrowest typecode and compressed. Replay seeks to a step by
+restoring the nearest keyframe before it and replaying recorded
+rule ids forward, so any step is reached in at most keyframe_every moves.
+
+Layout(all numbers are little-endian):
+    header: magic b'TMTR', version
+    records: tag, length of the payload and the payload, one of:
+    b'R' rules: (val, condition, next_val, next_condition, move) strings
+    of rules added since the previous rules record, in order of rule ids
+    b'K' keyframe: steps, index, first used cell, stopped flag, symbols,
+    condition, typecode and amount of used cells followed by the cells
+    b'S' steps: typecode and amount of rule ids followed by zlib
+    compressed rule ids of moves made after the previous keyframe
+
+Usage:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'tm.trace')
+    >>> tm = machine.TuringMachine.from_str('1,1,1:::q1:1 q1 -> 0 q1 R,B q1 -> 1 STOP')
+    >>> record(tm, path, keyframe_every=2)
+    RunResult(status=<RunStatus.halted: 1>, steps=4)
+    >>> with Trace(path) as trace:
+    ...     trace.keyframes
+    ...     print(trace.log(1, 3), end='')
+    ...     tm = trace.seek(3)
+    [0, 2, 4]
+    1 q1 -> 0 q1 R
+    1 q1 -> 0 q1 R
+    >>> tm.tape, tm.index, tm.steps
+    (Tape(['0', '0', '0', '']), 3, 3)
+"""
+
+import io
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+
+from turingmachine import machine
+from turingmachine.checkpoint import _write_array, _read_array, _write_strings, _read_strings
+from turingmachine.tape import Tape, StreamTape
+
+MAGIC = b'TMTR'
+VERSION = 1
+
+HEADER = struct.Struct('<4sB')
+RECORD = struct.Struct('<cQ')
+KEYFRAME = struct.Struct('<QqqB')
+CELLS = struct.Struct('<cQ')
+
+RULES = b'R'
+KEYFRAME_TAG = b'K'
+STEPS = b'S'
+
+# amount of steps between keyframes
+KEYFRAME_EVERY = 1 << 20
+
+# zlib compression level of rule ids, fast levels keep recording cheap
+COMPRESS_LEVEL = 1
+
+# typecodes of packed rule ids and the largest id they hold
+ID_TYPECODES = (('B', 0xFF), ('H', 0xFFFF), ('I', 0xFFFFFFFF))
+
+
+class TraceError(machine.TuringMachineError):
+    """Raise when trace file could not be read or replayed"""
+
+    def __init__(self, path, reason):
+        super().__init__(f"Wrong trace file '{path}': {reason}")
+
+
+class TraceRecorder:
+    """Recorder of a trace of a TuringMachine, which takes place
+    of its log and writes records into a binary file
+
+    Attributes:
+        enabled: always True, so moves are passed to the recorder
+        size: size of the log replaced by the recorder
+        append: appends rule id of a move
+        _ids: rule ids of moves made after the last keyframe, rules
+        should not be added in the middle of a batch
+        _rules: amount of rules already written
+    """
+
+    enabled = True
+
+    def __init__(self, tm, file):
+        self.tm = tm
+        self.file = file
+        self.size = tm._log.size
+        self._rules = 0
+        self._keyframe = None
+        self._batch()
+        file.write(HEADER.pack(MAGIC, VERSION))
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+    def _write(self, tag, payload):
+        self.file.write(RECORD.pack(tag, len(payload)))
+        self.file.write(payload)
+
+    def _write_rules(self):
+        table = self.tm.rule_table()[self._rules:]
+        if table:
+            payload = io.BytesIO()
+            _write_strings(payload, [str(item) for rule in table for item in rule])
+            self._write(RULES, payload.getvalue())
+            self._rules += len(table)
+
+    def _batch(self):
+        """Start array of rule ids of the next batch in the narrowest
+        typecode to hold ids of all of the rules"""
+        top = len(self.tm._rule_keys) - 1
+        typecode = next(typecode for typecode, limit in ID_TYPECODES if top <= limit)
+        self._ids = array(typecode)
+        self.append = self._ids.append
+
+    def extend(self, rule_ids):
+        if isinstance(rule_ids, bytes) and self._ids.typecode == 'B':
+            self._ids.frombytes(rule_ids)
+        else:
+            self._ids.extend(rule_ids)
+
+    def _write_steps(self):
+        ids = self._ids
+        if ids:
+            data = io.BytesIO()
+            _write_array(data, ids)
+            self._write(STEPS, CELLS.pack(ids.typecode.encode(), len(ids)) + zlib.compress(data.getvalue(), COMPRESS_LEVEL))
+        self._batch()
+
+    def keyframe(self):
+        """Write rule ids of moves made after the last keyframe
+        and the current configuration of the machine as a keyframe"""
+        tm = self.tm
+        if self._keyframe == tm.steps:
+            return
+        self._write_rules()
+        self._write_steps()
+
+        tape = tm.tape
+        if isinstance(tape, Tape):
+            cells, first = tape.snapshot()
+        else:
+            cells, first = array('I', map(tape.intern, tape)), -tape.center
+        payload = io.BytesIO()
+        payload.write(KEYFRAME.pack(tm.steps, tm.index, first, tm.stopped))
+        _write_strings(payload, tape.symbols)
+        _write_strings(payload, [tm.condition])
+        payload.write(CELLS.pack(cells.typecode.encode(), len(cells)))
+        _write_array(payload, cells)
+        self._write(KEYFRAME_TAG, payload.getvalue())
+        self._keyframe = tm.steps
+
+
+def record(
+        tm, path, max_steps=None,
+        max_seconds=None, mode='compiled',
+        keyframe_every=KEYFRAME_EVERY, block_size=None
+        ):
+    """Run tm recording its trace into the file at path, log of tm
+    is replaced by the recorder during the run. Configuration of tm
+    is written as a keyframe before the run, every keyframe_every steps,
+    after the run and when the run is stopped by an exception.
+    Arguments:
+        max_steps: maximum amount of steps to make
+        max_seconds: maximum wall-clock time of the run
+        mode, block_size: see TuringMachine.run
+    Returns:
+        RunResult"""
+    if isinstance(tm.tape, StreamTape):
+        raise machine.TuringMachineError('traces of StreamTape are not supported')
+    tm.rule_table()
+
+    start = tm.steps
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    log = tm._log
+    with open(path, 'wb') as file:
+        recorder = TraceRecorder(tm, file)
+        tm._log = recorder
+        try:
+            recorder.keyframe()
+            while True:
+                amount = keyframe_every
+                if max_steps is not None:
+                    amount = min(amount, max_steps - (tm.steps - start))
+                seconds = None if deadline is None else max(deadline - time.monotonic(), 0)
+                result = tm.run(max_steps=amount, max_seconds=seconds, mode=mode, block_size=block_size)
+                recorder.keyframe()
+                if result.status is not machine.RunStatus.max_steps or tm.steps - start == max_steps:
+                    break
+        finally:
+            recorder.keyframe()
+            tm._log = log
+
+    return machine.RunResult(result.status, tm.steps - start)
+
+
+class Trace:
+    """Trace recorded by record, opened for replay
+
+    Attributes:
+        path: path of the trace file
+        keyframes: steps of every keyframe
+        rules: (val, condition, next_val, next_condition, move) rules
+        in order of rule ids
+        _offsets: offset of payload of every keyframe
+        _steps: offset and length of payload of rule ids
+        following every keyframe, or None
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.keyframes = []
+        self.rules = []
+        self._offsets = []
+        self._steps = []
+        try:
+            self._scan()
+        except BaseException:
+            self.file.close()
+            raise
+
+    def _scan(self):
+        """Read rules and find offsets of keyframes and rule ids,
+        a truncated last record is ignored"""
+        file = self.file
+        try:
+            magic, version = HEADER.unpack(file.read(HEADER.size))
+        except struct.error:
+            raise TraceError(self.path, 'file is too short')
+        if magic != MAGIC:
+            raise TraceError(self.path, 'not a trace')
+        if version != VERSION:
+            raise TraceError(self.path, f'unsupported version {version}')
+
+        size = file.seek(0, io.SEEK_END)
+        offset = HEADER.size
+        while offset + RECORD.size <= size:
+            file.seek(offset)
+            tag, length = RECORD.unpack(file.read(RECORD.size))
+            offset += RECORD.size
+            if offset + length > size:
+                break
+            if tag == RULES:
+                strings = _read_strings(io.BytesIO(file.read(length)))
+                self.rules.extend(tuple(strings[i:i + 5]) for i in range(0, len(strings), 5))
+            elif tag == KEYFRAME_TAG:
+                self.keyframes.append(KEYFRAME.unpack(file.read(KEYFRAME.size))[0])
+                self._offsets.append(offset)
+                self._steps.append(None)
+            elif tag == STEPS and self.keyframes:
+                self._steps[-1] = offset, length
+            else:
+                raise TraceError(self.path, f'unknown record {tag!r}')
+            offset += length
+
+        if not self.keyframes:
+            raise TraceError(self.path, 'there are no keyframes')
+
+    @property
+    def steps(self):
+        """Steps of the last recorded configuration"""
+        return self.keyframes[-1]
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _block(self, i):
+        """Get rule ids of moves made after keyframe i"""
+        if self._steps[i] is None:
+            return array('I')
+        offset, length = self._steps[i]
+        self.file.seek(offset)
+        try:
+            typecode, amount = CELLS.unpack(self.file.read(CELLS.size))
+            data = zlib.decompress(self.file.read(length - CELLS.size))
+            return _read_array(io.BytesIO(data), typecode.decode(), amount)
+        except (struct.error, zlib.error, EOFError, ValueError) as e:
+            raise TraceError(self.path, f'file is damaged({e})')
+
+    def _check(self, steps):
+        if not self.keyframes[0] <= steps <= self.steps:
+            raise IndexError(f'step {steps} is out of recorded steps [{self.keyframes[0]}, {self.steps}]')
+
+    def rule_ids(self, start, stop):
+        """Get rule ids of moves made after start steps till stop steps"""
+        self._check(start)
+        self._check(stop)
+        ids = array('I')
+        i = bisect_right(self.keyframes, start) - 1
+        while i < len(self.keyframes) - 1 and self.keyframes[i] < stop:
+            first = self.keyframes[i]
+            block = self._block(i)
+            ids.fromlist(block[max(start - first, 0):stop - first].tolist())
+            i += 1
+        return ids
+
+    def log(self, start, stop, log_func=None):
+        """Get log of moves made after start steps till stop steps,
+        rendered by log_func or default_log of the machine"""
+        tm = self._keyframe_machine(0, machine.TuringMachine, log_func)
+        lines = []
+        for rule_id in self.rule_ids(start, stop):
+            key = tm._rule_keys[rule_id]
+            lines.append(tm.log_func(*key, *tm._rules[key]) + '\n')
+        return ''.join(lines)
+
+    def _keyframe_machine(self, i, cls, log_func):
+        self.file.seek(self._offsets[i])
+        try:
+            steps, index, first, stopped = KEYFRAME.unpack(self.file.read(KEYFRAME.size))
+            symbols = _read_strings(self.file)
+            condition = _read_strings(self.file)[0]
+            typecode, amount = CELLS.unpack(self.file.read(CELLS.size))
+            cells = _read_array(self.file, typecode.decode(), amount)
+        except (struct.error, EOFError, IndexError, UnicodeDecodeError) as e:
+            raise TraceError(self.path, f'file is damaged({e})')
+
+        tm = cls([], condition, index=index, default=symbols[0], log_func=log_func, log_size=0)
+        for symbol in symbols:
+            tm.tape.intern(symbol)
+        for rule in self.rules:
+            tm.set_rule(*rule)
+        tm.tape.restore((cells, first))
+        tm.steps = steps
+        tm.stopped = bool(stopped)
+        return tm
+
+    def seek(self, steps, cls=machine.TuringMachine, log_func=None):
+        """Get machine in the configuration recorded after steps,
+        it is restored from the nearest keyframe and recorded moves
+        are replayed forward
+        Returns:
+            new object of cls"""
+        self._check(steps)
+        i = bisect_right(self.keyframes, steps) - 1
+        tm = self._keyframe_machine(i, cls, log_func)
+        ids = self._block(i)[:steps - self.keyframes[i]] if steps > self.keyframes[i] else ()
+        for rule_id in ids:
+            key = tm._rule_keys[rule_id]
+            if key != (tm.current, tm.condition):
+                raise TraceError(self.path, f'move {tm.steps + 1} does not match the configuration')
+            next_val, next_cond, move = tm._rules[key]
+            tm.condition = next_cond
+            tm.steps += 1
+            try:
+                tm._moves[move](next_val)
+            except machine.TuringMachineStop:
+                tm.stopped = True
+        return tm